@@ -0,0 +1,266 @@
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, cast, delete, func, insert, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import SessionLocal
+
+# 0: finalize_sale folds each cart into the rollups in its own transaction. Every sale then
+#     also writes the few per-day segment rows its parts fall into, which concurrent carts
+#     queue on (PostgreSQL) or serialize with anyway (SQLite).
+# >0: finalize_sale only writes the log, and every worker rebuilds today's and yesterday's
+#     rollups from the log this often (for when the extra upserts on the sale path aren't wanted,
+#     e.g. under heavy checkout concurrency).
+SALES_ROLLUP_INTERVAL = float(os.getenv("SALES_ROLLUP_INTERVAL_SECONDS", "0"))
+
+log = logging.getLogger(__name__)
+
+_KEY = ("day", "part_number", "channel")
+_MONTH_KEY = ("month", "part_number", "channel")
+_SEGMENT_KEY = ("day", "channel", "part_type", "car_make")
+_SUMS = ("qty", "revenue_bdt", "cost_bdt", "lines")
+
+
+def _insert(db: Session, table):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Sales rollups do not support the {dialect} dialect")
+    return insert(table)
+
+
+def _next_month(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _month(db: Session, day):
+    """SQL for the first day of `day`'s month."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(day, "start of month")
+    return cast(func.date_trunc("month", day), Date)
+
+
+def _merge(lines: list[dict], key: tuple, columns: tuple) -> list[dict]:
+    """Sum lines sharing a key, ordered by key: every cart then locks the rows it upserts in the
+    same order, so two carts touching the same rollup rows queue instead of deadlocking."""
+    merged: dict[tuple, dict] = {}
+    for line in lines:
+        k = tuple(line[c] for c in key)
+        row = merged.get(k)
+        if row is None:
+            merged[k] = {c: line[c] for c in columns}
+        else:
+            for c in _SUMS:
+                row[c] += line[c]
+    return [merged[k] for k in sorted(merged)]
+
+
+def _upsert(db: Session, table, key: tuple, rows: list[dict], replace=()):
+    stmt = _insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={**{c: table.c[c] + stmt.excluded[c] for c in _SUMS}, **{c: stmt.excluded[c] for c in replace}},
+    )
+    db.execute(stmt, rows)
+
+
+def apply_sales(db: Session, lines: list[dict]):
+    """Add just-logged sale lines to the rollup tables (one upsert each). Caller commits.
+
+    Each line carries day, part_number, channel, part_type, car_make, qty, revenue_bdt, cost_bdt.
+    """
+    if not lines:
+        return
+    lines = [
+        {**l, "month": l["day"].replace(day=1), "lines": 1, "part_type": l["part_type"] or "",
+         "car_make": l["car_make"] or ""}
+        for l in lines
+    ]
+    for table, key in ((models.SalesDaily, _KEY), (models.SalesMonthly, _MONTH_KEY)):
+        per_part = _merge(lines, key, key + ("part_type", "car_make") + _SUMS)
+        for row in per_part:
+            row["part_type"] = row["part_type"] or None
+            row["car_make"] = row["car_make"] or None
+        _upsert(db, table.__table__, key, per_part, replace=("part_type", "car_make"))
+    _upsert(db, models.SalesDailySegment.__table__, _SEGMENT_KEY,
+            _merge(lines, _SEGMENT_KEY, _SEGMENT_KEY + _SUMS))
+
+
+def rebuild_rollups(db: Session, date_from: date, date_to: date):
+    """Recompute the rollup tables for date_from..date_to (inclusive) from sales_log. Caller commits.
+
+    sales_monthly is rebuilt for every month the range touches, from sales_daily.
+
+    Margins use the parts' current landed cost, so rebuilt history can differ slightly
+    from rollups written at sale time.
+    """
+    sl, inv, sd = models.SalesLog, models.Inventory, models.SalesDaily
+    day = func.date(sl.date)
+    agg = (
+        select(
+            day, sl.part_number, sl.channel,
+            func.max(inv.part_type), func.max(inv.car_make),
+            func.sum(sl.qty), func.sum(sl.subtotal_bdt),
+            func.sum(sl.qty * func.coalesce(inv.landed_cost_bdt, 0.0)), func.count(),
+        )
+        .select_from(sl)
+        .outerjoin(inv, inv.part_number == sl.part_number)
+        .where(
+            sl.date >= datetime.combine(date_from, datetime.min.time()),
+            sl.date < datetime.combine(date_to + timedelta(days=1), datetime.min.time()),
+        )
+        .group_by(day, sl.part_number, sl.channel)
+    )
+    db.execute(delete(sd).where(sd.day >= date_from, sd.day <= date_to))
+    db.execute(insert(sd).from_select(list(_KEY + ("part_type", "car_make") + _SUMS), agg))
+
+    seg = models.SalesDailySegment
+    part_type, car_make = func.coalesce(sd.part_type, ""), func.coalesce(sd.car_make, "")
+    db.execute(delete(seg).where(seg.day >= date_from, seg.day <= date_to))
+    db.execute(insert(seg).from_select(
+        list(_SEGMENT_KEY + _SUMS),
+        select(sd.day, sd.channel, part_type, car_make, *(func.sum(getattr(sd, c)) for c in _SUMS))
+        .where(sd.day >= date_from, sd.day <= date_to)
+        .group_by(sd.day, sd.channel, part_type, car_make),
+    ))
+
+    sm = models.SalesMonthly
+    first, end = date_from.replace(day=1), _next_month(date_to)
+    month = _month(db, sd.day)
+    db.execute(delete(sm).where(sm.month >= first, sm.month < end))
+    db.execute(insert(sm).from_select(
+        list(_MONTH_KEY + ("part_type", "car_make") + _SUMS),
+        select(month, sd.part_number, sd.channel, func.max(sd.part_type), func.max(sd.car_make),
+               *(func.sum(getattr(sd, c)) for c in _SUMS))
+        .where(sd.day >= first, sd.day < end)
+        .group_by(month, sd.part_number, sd.channel),
+    ))
+
+
+# ---------- Periodic rollup ----------
+def refresh_recent_rollups():
+    today = datetime.utcnow().date()
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db, today - timedelta(days=1), today)
+        db.commit()
+    except IntegrityError:
+        # another worker rebuilt the same days concurrently; its result stands
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _rollup_loop():
+    while True:
+        time.sleep(SALES_ROLLUP_INTERVAL)
+        try:
+            refresh_recent_rollups()
+        except Exception:
+            log.exception("sales rollup refresh failed")
+
+
+def start_rollup_job():
+    if SALES_ROLLUP_INTERVAL > 0:
+        threading.Thread(target=_rollup_loop, name="sales-rollup", daemon=True).start()
+
+
+# ---------- Reports ----------
+def _totals(qty, revenue, cost) -> dict:
+    revenue, cost = round(revenue or 0.0, 2), round(cost or 0.0, 2)
+    return {"qty": qty or 0, "revenue_bdt": revenue, "cost_bdt": cost, "margin_bdt": round(revenue - cost, 2)}
+
+
+def _part_sales(date_from: date, date_to: date):
+    """Per part and channel sales rows covering date_from..date_to (inclusive).
+
+    Whole calendar months come from sales_monthly and only the partial months at either
+    end from sales_daily, so a long range reads at most one row per part, channel and
+    month instead of one per day it sold on.
+    """
+    sd, sm = models.SalesDaily, models.SalesMonthly
+    columns = ("part_number", "channel", "part_type", "car_make") + _SUMS
+
+    def daily(lo, hi):
+        return select(*(getattr(sd, c) for c in columns)).where(sd.day >= lo, sd.day < hi)
+
+    first = date_from if date_from.day == 1 else _next_month(date_from)
+    end = date_to + timedelta(days=1)
+    if end.day != 1:
+        end = end.replace(day=1)
+    if first >= end:
+        return daily(date_from, date_to + timedelta(days=1)).subquery()
+    return union_all(
+        daily(date_from, first),
+        select(*(getattr(sm, c) for c in columns)).where(sm.month >= first, sm.month < end),
+        daily(end, date_to + timedelta(days=1)),
+    ).subquery()
+
+
+def revenue_report(db: Session, date_from: date, date_to: date, group_by: str = "day") -> list[dict]:
+    # everything but a per-part breakdown comes from the segment table: days x channels x types x makes rows
+    if group_by == "part_number":
+        t = _part_sales(date_from, date_to)
+        q = select(t.c.part_number, func.sum(t.c.qty), func.sum(t.c.revenue_bdt), func.sum(t.c.cost_bdt))
+        rows = db.execute(q.group_by(t.c.part_number).order_by(t.c.part_number))
+    else:
+        t = models.SalesDailySegment
+        key = getattr(t, group_by)
+        rows = db.execute(
+            select(key, func.sum(t.qty), func.sum(t.revenue_bdt), func.sum(t.cost_bdt))
+            .where(t.day >= date_from, t.day <= date_to)
+            .group_by(key)
+            .order_by(key)
+        )
+    return [{"key": str(k) if k not in (None, "") else None, **_totals(q, r, c)} for k, q, r, c in rows]
+
+
+def top_sellers(db: Session, date_from: date, date_to: date, by: str = "qty", limit: int = 20,
+                channel: str | None = None, part_type: str | None = None, car_make: str | None = None) -> list[dict]:
+    """Best sellers over date_from..date_to; reads one row per part, channel and month sold in (see _part_sales)."""
+    t = _part_sales(date_from, date_to).c
+    qty, revenue, cost = func.sum(t.qty), func.sum(t.revenue_bdt), func.sum(t.cost_bdt)
+    order = {"qty": qty, "revenue": revenue, "margin": revenue - cost}[by]
+    q = select(t.part_number, func.max(t.part_type), func.max(t.car_make), qty, revenue, cost)
+    if channel:
+        q = q.where(t.channel == channel)
+    if part_type:
+        q = q.where(t.part_type == part_type)
+    if car_make:
+        q = q.where(t.car_make == car_make)
+    rows = db.execute(q.group_by(t.part_number).order_by(order.desc(), t.part_number.asc()).limit(limit))
+    return [
+        {"part_number": pn, "part_type": pt, "car_make": cm, **_totals(q_, r, c)}
+        for pn, pt, cm, q_, r, c in rows
+    ]
+
+
+def slow_movers(db: Session, days: int = 90, limit: int = 50) -> list[dict]:
+    """In-stock parts that sold least over the last `days` days; ties go to the most capital tied up."""
+    inv = models.Inventory
+    today = datetime.utcnow().date()
+    t = _part_sales(today - timedelta(days=days - 1), today).c
+    sold = select(t.part_number, func.sum(t.qty).label("qty")).group_by(t.part_number).subquery()
+    qty_sold = func.coalesce(sold.c.qty, 0)
+    stock_value = inv.available_qty * func.coalesce(inv.landed_cost_bdt, 0.0)
+    rows = db.execute(
+        select(inv.part_number, inv.part_type, inv.car_make, inv.available_qty, inv.landed_cost_bdt, stock_value, qty_sold)
+        .outerjoin(sold, sold.c.part_number == inv.part_number)
+        .where(inv.available_qty > 0)
+        .order_by(qty_sold.asc(), stock_value.desc(), inv.part_number.asc())
+        .limit(limit)
+    )
+    return [
+        {"part_number": pn, "part_type": pt, "car_make": cm, "available_qty": avail, "landed_cost_bdt": landed,
+         "stock_value_bdt": round(value or 0.0, 2), "qty_sold": sold_qty}
+        for pn, pt, cm, avail, landed, value, sold_qty in rows
+    ]
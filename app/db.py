@@ -1,16 +1,77 @@
 import os
-from sqlalchemy import create_engine
+from time import perf_counter
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from .dbconfig import engine_options
+from .metrics import counting_cursor, record_query
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./local.db")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(DATABASE_URL, **engine_options(make_url(DATABASE_URL)))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+def async_url(url: str):
+    """Same database through the asyncio driver: asyncpg on Postgres, aiosqlite on SQLite."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend == "sqlite":
+        return u.set(drivername="sqlite+aiosqlite")
+    if backend in ("postgresql", "postgres"):
+        query = dict(u.query)
+        # libpq's sslmode=require is spelled ssl=require for asyncpg
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        return u.set(drivername="postgresql+asyncpg", query=query)
+    raise RuntimeError(f"No async driver configured for {backend}")
+
+
+# read paths run on the event loop through this engine; writes still use SessionLocal
+_async_url = async_url(DATABASE_URL)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url, is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+# per-statement timing for app.metrics (query counts, DB time, slow-query log). The start
+# time lives on the statement's execution context, so one that raises (and never reaches
+# after_cursor_execute) leaves nothing behind for the next statement to pick up; the few
+# internal executes without a context use a single slot on the connection instead.
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = perf_counter()
+    else:
+        conn.info["query_start"] = perf_counter()
+
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        started = getattr(context, "_query_start", None)
+    else:
+        started = conn.info.pop("query_start", None)
+    # reads count the rows they fetch (rowcount is -1 for SELECT on several drivers); writes,
+    # including INSERT .. RETURNING, count the rows they touched
+    reads = context is not None and cursor.description is not None and context.cursor is cursor and not (
+        context.isinsert or context.isupdate or context.isdelete
+    )
+    if reads:
+        context.cursor = counting_cursor(cursor)
+    if started is not None:
+        record_query(statement, perf_counter() - started, -1 if reads else cursor.rowcount)
+
+for _e in (engine, async_engine.sync_engine):
+    event.listen(_e, "before_cursor_execute", _start_timer)
+    event.listen(_e, "after_cursor_execute", _stop_timer)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,135 @@
+import math
+import os
+from time import perf_counter
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+# Engine/pool settings, all from the environment.
+#
+# DB_POOL_MODE=transaction is for running behind PgBouncer in transaction pooling mode:
+# the app keeps no pool of its own (NullPool) and asyncpg's prepared-statement caches are off.
+#
+# DB_MAX_CONNECTIONS is the connection budget this service may use on the server (the Render
+# Postgres plan limit minus headroom for migrations/psql). When set, it is divided across the
+# gunicorn workers (WEB_CONCURRENCY) and the two engines each worker holds (sync + async),
+# and overrides DB_POOL_SIZE / DB_MAX_OVERFLOW.
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") not in ("0", "false", "False")
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+_ENGINES_PER_WORKER = 2
+
+
+class _CheckoutTimer:
+    """Records how long pool.connect() takes: queue wait, overflow connects and pre-ping."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def connect(self):
+        started = perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds += waited
+            if waited > self.max_wait_seconds:
+                self.max_wait_seconds = waited
+
+
+class TimedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_sizing() -> tuple[int, int]:
+    """(pool_size, max_overflow) for each engine in this worker."""
+    if DB_MAX_CONNECTIONS:
+        per_engine = max(1, DB_MAX_CONNECTIONS // (max(1, WEB_CONCURRENCY) * _ENGINES_PER_WORKER))
+        # keep a third of the budget as overflow so idle workers don't pin connections
+        size = max(1, math.ceil(per_engine * 2 / 3))
+        return size, per_engine - size
+    return DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+
+def engine_options(url: URL, is_async: bool = False) -> dict:
+    """Keyword arguments for create_engine / create_async_engine."""
+    backend = url.get_backend_name()
+    connect_args: dict = {}
+    opts: dict = {"pool_pre_ping": DB_POOL_PRE_PING, "connect_args": connect_args}
+
+    if backend == "postgresql":
+        # statement_timeout as a startup parameter; PgBouncer rejects these, so in transaction
+        # mode set it on the database role instead (ALTER ROLE ... SET statement_timeout)
+        if DB_STATEMENT_TIMEOUT_MS and DB_POOL_MODE != "transaction":
+            if is_async:
+                connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+        if DB_POOL_MODE == "transaction" and is_async:
+            # no statement caches, and unique names for the statements asyncpg still prepares,
+            # since consecutive transactions may land on different server connections
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+    if DB_POOL_MODE == "transaction":
+        # every checkout is a fresh connection to the pooler, so there is nothing to pre-ping
+        opts.update(poolclass=NullPool, pool_pre_ping=False)
+        return opts
+    if DB_POOL_MODE != "queue":
+        raise RuntimeError(f"DB_POOL_MODE must be queue or transaction, not {DB_POOL_MODE!r}")
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # in-memory SQLite keeps its default single-connection pool
+        return opts
+
+    size, overflow = pool_sizing()
+    opts.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=size,
+        max_overflow=overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return opts
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    out = {"pool_class": type(pool).__name__, "mode": DB_POOL_MODE}
+    if isinstance(pool, QueuePool):
+        out.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, _CheckoutTimer):
+        out.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            wait_ms_avg=round(pool.wait_seconds / pool.checkouts * 1000, 3) if pool.checkouts else None,
+            wait_ms_max=round(pool.max_wait_seconds * 1000, 3),
+        )
+    return out
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from .db import SessionLocal
+
+# rows fetched per round trip from the server-side cursor and written per response chunk
+EXPORT_BATCH_SIZE = 1000
+
+_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _json_default(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    raise TypeError(f"{type(v).__name__} is not JSON serializable")
+
+
+def _csv_value(v):
+    return v.isoformat() if isinstance(v, (datetime, date)) else v
+
+
+def iter_export(stmt: Select, fmt: str):
+    """Yield the result of `stmt` as CSV or NDJSON byte chunks.
+
+    The generator owns its session (request-scoped ones are closed before a streamed
+    body is sent) and reads through yield_per, which uses a server-side cursor on
+    PostgreSQL, so only one batch of rows is held in memory at a time.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        cols = list(result.keys())
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(cols)
+            for batch in result.partitions():
+                writer.writerows([_csv_value(v) for v in row] for row in batch)
+                yield buf.getvalue().encode()
+                buf.seek(0)
+                buf.truncate()
+            if buf.tell():
+                yield buf.getvalue().encode()
+        else:
+            for batch in result.partitions():
+                yield "".join(json.dumps(dict(zip(cols, row)), default=_json_default) + "\n" for row in batch).encode()
+    finally:
+        db.close()
+
+
+def export_response(stmt: Select, fmt: str, name: str) -> StreamingResponse:
+    if fmt not in _MEDIA_TYPES:
+        raise HTTPException(400, "format must be csv or ndjson")
+    ext = "csv" if fmt == "csv" else "ndjson"
+    return StreamingResponse(
+        iter_export(stmt, fmt),
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{ext}"'},
+    )
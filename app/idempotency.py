@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, Response
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import SessionLocal
+
+# how long a key's stored response is replayed; after that the key can be reused
+IDEMPOTENCY_TTL = timedelta(seconds=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")))
+# seconds between sweeps of expired keys; 0 disables them (expired keys are still ignored and replaced on use)
+IDEMPOTENCY_SWEEP_INTERVAL = float(os.getenv("IDEMPOTENCY_SWEEP_INTERVAL_SECONDS", "3600"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+log = logging.getLogger(__name__)
+_keys = models.IdempotencyKey.__table__
+
+
+def request_hash(*parts: str) -> str:
+    """Fingerprint of what was asked for, so a key can't be reused for a different request."""
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def _stored(db: Session, key: str, fingerprint: str, now: datetime) -> Response | None:
+    row = db.execute(select(_keys).where(_keys.c.key == key)).first()
+    if row is None:
+        return None
+    if row.expires_at <= now:
+        db.execute(delete(_keys).where(_keys.c.key == key))
+        return None
+    if row.request_hash != fingerprint:
+        raise HTTPException(422, "Idempotency-Key was already used for a different request")
+    if row.status_code is None:
+        raise HTTPException(409, "A request with this Idempotency-Key is still in progress")
+    return Response(row.response, status_code=row.status_code, media_type="application/json",
+                    headers={REPLAYED_HEADER: "true"})
+
+
+def replay_or_claim(db: Session, scope: str, client_key: str, fingerprint: str) -> Response | None:
+    """The stored response if this key was already handled, otherwise None with the key claimed.
+
+    A claim is an uncommitted row: a concurrent request with the same key blocks on it and,
+    once the first commits, gets its response instead of running again. If the first request
+    fails its rollback drops the claim and the next one runs normally. The caller stores its
+    response with remember() and commits it with the rest of the request's writes.
+    """
+    if len(client_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(400, f"Idempotency-Key longer than {IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+    key = f"{scope} {client_key}"
+    now = datetime.utcnow()
+    stored = _stored(db, key, fingerprint, now)
+    if stored is not None:
+        return stored
+    try:
+        db.execute(insert(_keys).values(key=key, request_hash=fingerprint, expires_at=now + IDEMPOTENCY_TTL))
+    except IntegrityError:
+        db.rollback()
+        stored = _stored(db, key, fingerprint, now)
+        if stored is None:
+            raise HTTPException(409, "A request with this Idempotency-Key is still in progress")
+        return stored
+    return None
+
+
+def remember(db: Session, scope: str, client_key: str, body: bytes, status_code: int = 200):
+    """Store the response for a claimed key. Caller commits."""
+    db.execute(
+        update(_keys).where(_keys.c.key == f"{scope} {client_key}").values(status_code=status_code, response=body)
+    )
+
+
+# ---------- Expiry ----------
+def sweep_expired(db: Session, batch: int = 5000) -> int:
+    """Delete expired keys in index-ordered batches, committing each. Returns the number deleted."""
+    deleted = 0
+    while True:
+        doomed = select(_keys.c.key).where(_keys.c.expires_at <= datetime.utcnow()).order_by(_keys.c.expires_at).limit(batch)
+        n = db.execute(delete(_keys).where(_keys.c.key.in_(doomed))).rowcount
+        db.commit()
+        deleted += n
+        if n < batch:
+            return deleted
+
+
+def _sweep_loop():
+    while True:
+        time.sleep(IDEMPOTENCY_SWEEP_INTERVAL)
+        db = SessionLocal()
+        try:
+            sweep_expired(db)
+        except Exception:
+            db.rollback()
+            log.exception("idempotency key sweep failed")
+        finally:
+            db.close()
+
+
+def start_idempotency_sweeper():
+    if IDEMPOTENCY_SWEEP_INTERVAL > 0:
+        threading.Thread(target=_sweep_loop, name="idempotency-sweep", daemon=True).start()
@@ -0,0 +1,168 @@
+import csv
+import io
+import json
+from datetime import datetime
+from time import perf_counter
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .ledger import record_movements
+from .search import sync_part_models
+from .utils.formulas import compute_costs, multipliers_for
+
+# rows per upsert statement / commit
+IMPORT_CHUNK_SIZE = 2000
+# error entries kept in the report; the counts stay exact past this
+IMPORT_MAX_ERRORS = 1000
+
+_COST_INPUTS = {"purchase_cost_yen", "weight_kg"}
+_PRICED = ("exchange_rate_used", "shipping_per_kg_used", "purchase_cost_bdt", "shipping_cost_bdt",
+           "landed_cost_bdt", "suggested_wholesale_bdt", "suggested_retail_bdt")
+
+
+def _csv_records(text):
+    reader = csv.DictReader(text)
+    for rec in reader:
+        # empty cells mean "not provided" so model defaults / existing values apply
+        yield reader.line_num, {k: v for k, v in rec.items() if k and v not in (None, "")}
+
+
+def _jsonl_records(text):
+    for line_no, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+            continue
+        yield line_no, rec if isinstance(rec, dict) else ValueError("Expected a JSON object")
+
+
+def _upsert(db: Session, rows: list[dict], fields: frozenset):
+    """INSERT ... ON CONFLICT(part_number) DO UPDATE for rows sharing the same set of supplied fields."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Bulk import does not support the {dialect} dialect")
+
+    table = models.Inventory.__table__
+    stmt = insert(table)
+    cols = set(fields) - {"part_number"} | {"updated_at"}
+    if fields & _COST_INPUTS:
+        cols |= set(_PRICED)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["part_number"],
+        set_={**{c: stmt.excluded[c] for c in cols}, "version": table.c.version + 1},
+    )
+    db.execute(stmt, rows)
+
+
+def import_inventory(db: Session, fh, fmt: str, s, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """Validate, price and upsert a CSV/JSONL stream chunk by chunk, committing each chunk.
+
+    Rows are read one at a time from `fh` (a binary file object) so memory is bounded by
+    chunk_size. Updates only touch the columns supplied for that row; pricing is
+    refreshed when purchase_cost_yen and weight_kg are supplied together.
+    """
+    started = perf_counter()
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="" if fmt == "csv" else None)
+    records = _csv_records(text) if fmt == "csv" else _jsonl_records(text)
+
+    total = ok = failed = 0
+    errors: list[dict] = []
+    pending: dict[str, tuple] = {}  # part_number -> (fields, row); last occurrence in a chunk wins
+
+    def fail(row_no, part_number, detail):
+        nonlocal failed
+        failed += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append({"row": row_no, "part_number": part_number, "errors": detail})
+
+    def price(row, part_type):
+        return compute_costs(row["purchase_cost_yen"], row["weight_kg"], rate, ship,
+                             *multipliers_for(s.price_multipliers, part_type))
+
+    def flush():
+        # repriced updates that don't restate part_type take the markup of the part's stored type
+        retype = [pn for pn, (fields, _) in pending.items() if fields & _COST_INPUTS and "part_type" not in fields]
+        if retype and s.price_multipliers:
+            inv = models.Inventory
+            stored = dict(db.execute(select(inv.part_number, inv.part_type).where(inv.part_number.in_(retype))).all())
+            for pn, part_type in stored.items():
+                pending[pn][1].update(price(pending[pn][1], part_type))
+
+        # rows that set available_qty go into the stock ledger as the difference to what's stored
+        counted = [pn for pn, (fields, _) in pending.items() if "available_qty" in fields]
+        if counted:
+            inv = models.Inventory
+            before = dict(db.execute(
+                select(inv.part_number, inv.available_qty)
+                .where(inv.part_number.in_(counted))
+                .order_by(inv.part_number.asc())
+                .with_for_update()
+            ).all())
+            record_movements(db, [
+                {"part_number": pn, "delta": pending[pn][1]["available_qty"] - (before.get(pn) or 0), "source": "import"}
+                for pn in counted
+            ])
+
+        groups: dict[frozenset, list] = {}
+        for fields, row in pending.values():
+            groups.setdefault(fields, []).append(row)
+        for fields, rows in groups.items():
+            _upsert(db, rows, fields)
+            if "applicable_models" in fields:
+                sync_part_models(db, [r["part_number"] for r in rows])
+        db.commit()
+        pending.clear()
+
+    rate, ship = s.exchange_rate_yen_to_bdt, s.shipping_cost_per_kg_bdt
+    for row_no, rec in records:
+        total += 1
+        if isinstance(rec, Exception):
+            fail(row_no, None, [str(rec)])
+            continue
+        try:
+            item = schemas.InventoryCreate.model_validate(rec)
+        except ValidationError as e:
+            fail(row_no, rec.get("part_number"), [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()])
+            continue
+        fields = frozenset(item.model_fields_set)
+        if len(fields & _COST_INPUTS) == 1:
+            fail(row_no, item.part_number, ["purchase_cost_yen and weight_kg must be given together"])
+            continue
+
+        now = datetime.utcnow()
+        row = item.model_dump()
+        row.update(
+            price(row, item.part_type),
+            exchange_rate_used=rate,
+            shipping_per_kg_used=ship,
+            sold_wholesale_qty=0,
+            sold_retail_qty=0,
+            created_at=now,
+            updated_at=now,
+        )
+        pending[item.part_number] = (fields, row)
+        ok += 1
+        if len(pending) >= chunk_size:
+            flush()
+    if pending:
+        flush()
+
+    return {
+        "rows_total": total,
+        "rows_ok": ok,
+        "rows_failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+        "elapsed_ms": round((perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import SessionLocal
+
+# seconds between automatic stock snapshots; 0 disables them (POST /stock/snapshots still works)
+STOCK_SNAPSHOT_INTERVAL = float(os.getenv("STOCK_SNAPSHOT_INTERVAL_SECONDS", "86400"))
+# snapshots stop this far behind "now" so movements from transactions still in flight
+# (stamped before they commit) aren't missed
+STOCK_SNAPSHOT_LAG = timedelta(seconds=int(os.getenv("STOCK_SNAPSHOT_LAG_SECONDS", "300")))
+
+log = logging.getLogger(__name__)
+
+
+def record_movements(db: Session, movements: list[dict], now: datetime | None = None):
+    """Append stock movements (part_number, delta, source, optional ref/note). Caller commits,
+    together with the stock change they describe."""
+    rows = [
+        {"at": now or datetime.utcnow(), "ref": None, "note": None, **m}
+        for m in movements if m["delta"]
+    ]
+    if rows:
+        db.execute(insert(models.StockMovement.__table__), rows)
+
+
+# ---------- Reconstruction ----------
+def _nearest_snapshot(db: Session, at: datetime):
+    """The snapshot closest in time to `at` on either side, or None if there are none."""
+    snap = models.StockSnapshot
+    before = db.scalars(select(snap).where(snap.taken_at <= at).order_by(snap.taken_at.desc()).limit(1)).first()
+    after = db.scalars(select(snap).where(snap.taken_at > at).order_by(snap.taken_at.asc()).limit(1)).first()
+    if before is None or after is None:
+        return before or after
+    return before if at - before.taken_at <= after.taken_at - at else after
+
+
+def _stock_query(db: Session, at: datetime, part_number: str | None = None):
+    """(select of part_number, qty as of `at`, snapshot used, movements in the replayed range).
+
+    Starts from the nearest snapshot and adds (or, for a later snapshot, subtracts) only
+    the movements between it and `at`; with no snapshots the whole ledger up to `at` is summed.
+    """
+    mv, line = models.StockMovement, models.StockSnapshotLine
+    base = _nearest_snapshot(db, at)
+    if base is None:
+        window, sign = (mv.at <= at,), 1
+    elif base.taken_at <= at:
+        window, sign = (mv.at > base.taken_at, mv.at <= at), 1
+    else:
+        window, sign = (mv.at > at, mv.at <= base.taken_at), -1
+    if part_number is not None:
+        window += (mv.part_number == part_number,)
+
+    parts = [select(mv.part_number.label("part_number"), (mv.delta * sign).label("qty")).where(*window)]
+    if base is not None:
+        q = select(line.part_number.label("part_number"), line.qty.label("qty")).where(line.snapshot_id == base.id)
+        if part_number is not None:
+            q = q.where(line.part_number == part_number)
+        parts.append(q)
+    combined = union_all(*parts).subquery()
+    stmt = (
+        select(combined.c.part_number, func.sum(combined.c.qty).label("qty"))
+        .group_by(combined.c.part_number)
+        .having(func.sum(combined.c.qty) != 0)
+    )
+    replayed = db.scalar(select(func.count()).select_from(mv).where(*window))
+    return stmt, base, replayed
+
+
+def stock_on(db: Session, at: datetime, part_number: str | None = None) -> dict:
+    stmt, base, replayed = _stock_query(db, at, part_number)
+    rows = db.execute(stmt.order_by(stmt.selected_columns.part_number)).all()
+    return {
+        "at": at,
+        "snapshot_at": base.taken_at if base else None,
+        "movements_replayed": replayed,
+        "parts": [{"part_number": pn, "qty": qty} for pn, qty in rows],
+    }
+
+
+def take_snapshot(db: Session, at: datetime | None = None) -> models.StockSnapshot:
+    """Materialize stock as of `at` (default: now minus STOCK_SNAPSHOT_LAG). Caller commits.
+
+    Raises ValueError for an `at` later than now minus STOCK_SNAPSHOT_LAG: movements still in
+    flight could commit behind it, and reconstructions would keep trusting the snapshot.
+    """
+    latest = datetime.utcnow() - STOCK_SNAPSHOT_LAG
+    if at is None:
+        at = latest
+    else:
+        if at.tzinfo is not None:
+            at = at.astimezone(timezone.utc).replace(tzinfo=None)
+        if at > latest:
+            raise ValueError(f"at must be at least {int(STOCK_SNAPSHOT_LAG.total_seconds())}s in the past")
+    stmt, _, _ = _stock_query(db, at)
+    snap = models.StockSnapshot(taken_at=at, created_at=datetime.utcnow())
+    db.add(snap)
+    db.flush()
+    q = stmt.subquery()
+    db.execute(insert(models.StockSnapshotLine).from_select(
+        ["snapshot_id", "part_number", "qty"],
+        select(literal(snap.id), q.c.part_number, q.c.qty),
+    ))
+    line = models.StockSnapshotLine
+    snap.parts, snap.units = db.execute(
+        select(func.count(), func.coalesce(func.sum(line.qty), 0)).where(line.snapshot_id == snap.id)
+    ).one()
+    return snap
+
+
+def part_history(db: Session, part_number: str, limit: int = 100, before_id: int | None = None) -> list:
+    """Newest-first movements of one part; page with before_id = the last id seen."""
+    mv = models.StockMovement
+    q = select(mv).where(mv.part_number == part_number)
+    if before_id is not None:
+        q = q.where(mv.id < before_id)
+    return db.scalars(q.order_by(mv.id.desc()).limit(limit)).all()
+
+
+# ---------- Periodic snapshots ----------
+def _snapshot_loop():
+    while True:
+        time.sleep(STOCK_SNAPSHOT_INTERVAL)
+        db = SessionLocal()
+        try:
+            # several workers wake up on the same schedule; one snapshot per interval is enough
+            latest = db.scalar(select(func.max(models.StockSnapshot.created_at)))
+            if latest is None or datetime.utcnow() - latest >= timedelta(seconds=STOCK_SNAPSHOT_INTERVAL / 2):
+                take_snapshot(db)
+                db.commit()
+        except Exception:
+            db.rollback()
+            log.exception("stock snapshot failed")
+        finally:
+            db.close()
+
+
+def start_snapshot_job():
+    if STOCK_SNAPSHOT_INTERVAL > 0:
+        threading.Thread(target=_snapshot_loop, name="stock-snapshot", daemon=True).start()
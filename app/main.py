@@ -1,13 +1,83 @@
-from fastapi import FastAPI, Depends, HTTPException
+# first import: its clock covers everything below (GET /startup)
+from .startup import prefill_async_pool, prefill_pool, startup_timings
+
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Annotated
+from uuid import uuid4
+
+import orjson
+from fastapi import FastAPI, Depends, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from datetime import datetime
-
-from .db import Base, engine, get_db
+from fastapi.responses import PlainTextResponse
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, configure_mappers
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import date, datetime, timedelta
+from time import perf_counter
+
+from .analytics import (
+    SALES_ROLLUP_INTERVAL, apply_sales, rebuild_rollups, revenue_report, slow_movers, start_rollup_job, top_sellers,
+)
+from .db import SessionLocal, async_engine, engine, get_async_db, get_db
+from .dbconfig import pool_stats
+from .settings_cache import settings_cache
 from . import models, schemas
-from .utils.formulas import compute_costs
-
-app = FastAPI(title="Inventory Management API", version="1.0.0")
+from .utils.formulas import compute_costs, multipliers_for
+from .export import export_response
+from .idempotency import REPLAYED_HEADER, remember, replay_or_claim, request_hash, start_idempotency_sweeper
+from .importer import import_inventory
+from .ledger import part_history, record_movements, start_snapshot_job, stock_on, take_snapshot
+from .pricing import price_arrays, what_if
+from .metrics import RequestStats, current_request, record_request, render_prometheus
+from .response_cache import (
+    INVENTORY, INVENTORY_PAGES, SUPPLIERS, etag_response, part_tag, response_cache,
+)
+from .receiving import receive_lines
+from .reorder import DEFAULT_COVER_DAYS, DEFAULT_LEAD_TIME_DAYS, DEFAULT_SAFETY_DAYS, reorder_cache
+from .queries import after_cursor, encode_cursor, inventory_columns, inventory_filters
+from .recalc import (
+    active_recalc_job, create_recalc_job, job_progress, recalc_inventory, resume_recalc_jobs, start_recalc_job,
+)
+from .search import detect_search_indexes, search_parts, sync_part_models
+from .stock import take_stock
+
+def _prime_settings():
+    db = SessionLocal()
+    try:
+        settings_cache.get(db)
+    finally:
+        db.close()
+
+def _start_background_jobs():
+    # pick up recalculations orphaned by a worker restart
+    resume_recalc_jobs()
+    start_rollup_job()
+    start_snapshot_job()
+    start_idempotency_sweeper()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema is managed by Alembic: `python -m app.migrate` runs once per deploy, before the workers start.
+    # Nothing here runs at import time, so gunicorn --preload can import the app once and fork.
+    t = startup_timings
+    t.begin()
+    await asyncio.gather(t.step("pool", prefill_pool, engine), t.step("async_pool", prefill_async_pool, async_engine))
+    await t.step("mappers", configure_mappers)
+    await t.step("search_indexes", detect_search_indexes, engine)
+    await t.step("settings_cache", _prime_settings)
+    await t.step("background_jobs", _start_background_jobs)
+    t.done()
+    yield
+    await async_engine.dispose()
+    engine.dispose()
+
+app = FastAPI(title="Inventory Management API", version="1.0.0", lifespan=lifespan)
 
 # CORS (adjust origins for your domain)
 app.add_middleware(
@@ -16,19 +86,62 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", REPLAYED_HEADER],
 )
 
-# Create tables on startup (simple for v1; you can switch to Alembic later)
-Base.metadata.create_all(bind=engine)
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    stats = RequestStats()
+    token = current_request.set(stats)
+    started = perf_counter()
+
+    def record(status: int):
+        route = request.scope.get("route")
+        record_request(request.method, route.path if route else "unmatched", status, perf_counter() - started, stats)
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        record(500)
+        raise
+    finally:
+        current_request.reset(token)
+
+    # recorded once the body has been sent: streamed exports fetch their rows while streaming
+    body = response.body_iterator
+
+    async def recorded_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            record(response.status_code)
+
+    response.body_iterator = recorded_body()
+    return response
 
 @app.get("/")
 def root():
     return {"ok": True, "service": "inventory-app", "version": "1.0.0"}
 
+@app.get("/startup", response_model=dict)
+def startup_stats():
+    return startup_timings.as_dict()
+
+@app.get("/db/pool", response_model=dict)
+def db_pool_stats():
+    # per worker: compare checked_out/overflow/wait against DB_MAX_CONNECTIONS when tuning
+    return {"sync": pool_stats(engine), "async": pool_stats(async_engine.sync_engine)}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text format; counters are per worker process (label-less, so scrape each worker or sum)
+    return render_prometheus()
+
 # ---------- Settings ----------
 @app.get("/settings", response_model=schemas.SettingsOut)
 def get_settings(db: Session = Depends(get_db)):
-    s = db.query(models.Settings).first()
+    s = settings_cache.get(db)
     if not s:
         s = models.Settings(
             exchange_rate_yen_to_bdt=0.0,
@@ -37,6 +150,7 @@ def get_settings(db: Session = Depends(get_db)):
             part_subtypes={},
             car_makes=[],
             manufacturers=[],
+            price_multipliers={},
             last_recalc=None,
         )
         db.add(s)
@@ -63,37 +177,88 @@ def update_settings(payload: schemas.SettingsUpdate, db: Session = Depends(get_d
         s.car_makes = payload.car_makes
     if payload.manufacturers is not None:
         s.manufacturers = payload.manufacturers
+    if payload.price_multipliers is not None:
+        s.price_multipliers = {t: m.model_dump() for t, m in payload.price_multipliers.items()}
+    s.version = (s.version or 0) + 1
 
     db.commit()
+    settings_cache.invalidate()
     db.refresh(s)
     return s
 
+@app.get("/settings/cache", response_model=dict)
+def settings_cache_stats():
+    return settings_cache.stats()
+
+@app.get("/cache/responses", response_model=dict)
+def response_cache_stats():
+    return response_cache.stats()
+
 @app.post("/settings/recalc", response_model=dict)
 def recalc_all(db: Session = Depends(get_db)):
-    s = db.query(models.Settings).first()
+    s = settings_cache.get(db, fresh=True)
     if not s:
         raise HTTPException(400, "Settings not configured")
 
-    inv = db.query(models.Inventory).all()
-    for row in inv:
-        c = compute_costs(
-            purchase_cost_yen=row.purchase_cost_yen or 0.0,
-            weight_kg=row.weight_kg or 0.0,
-            exchange_rate=s.exchange_rate_yen_to_bdt or 0.0,
-            shipping_per_kg=s.shipping_cost_per_kg_bdt or 0.0,
-        )
-        row.exchange_rate_used = s.exchange_rate_yen_to_bdt
-        row.shipping_per_kg_used = s.shipping_cost_per_kg_bdt
-        row.purchase_cost_bdt = c["purchase_cost_bdt"]
-        row.shipping_cost_bdt = c["shipping_cost_bdt"]
-        row.landed_cost_bdt = c["landed_cost_bdt"]
-        row.suggested_wholesale_bdt = c["suggested_wholesale_bdt"]
-        row.suggested_retail_bdt = c["suggested_retail_bdt"]
-        row.updated_at = datetime.utcnow()
-
-    s.last_recalc = datetime.utcnow()
+    result = recalc_inventory(db, s)
+    db.execute(
+        update(models.Settings)
+        .where(models.Settings.id == s.id)
+        .values(last_recalc=datetime.utcnow(), version=models.Settings.version + 1)
+    )
     db.commit()
-    return {"recalculated": len(inv)}
+    settings_cache.invalidate()
+    response_cache.invalidate(INVENTORY)
+    return result
+
+@app.post("/settings/recalc/jobs", response_model=schemas.RecalcJobOut, status_code=202)
+def start_recalc(db: Session = Depends(get_db)):
+    s = settings_cache.get(db, fresh=True)
+    if not s:
+        raise HTTPException(400, "Settings not configured")
+    if active_recalc_job(db):
+        raise HTTPException(409, "A recalculation is already running")
+
+    try:
+        job = create_recalc_job(db, s)
+    except IntegrityError:
+        # a concurrent request queued one between the check and the insert (ux_recalc_jobs_active)
+        db.rollback()
+        raise HTTPException(409, "A recalculation is already running")
+    start_recalc_job(job.id)
+    return job_progress(job)
+
+@app.post("/pricing/what-if", response_model=schemas.WhatIfOut)
+def pricing_what_if(payload: schemas.WhatIfIn, db: Session = Depends(get_db)):
+    # prices the whole catalogue twice in memory; nothing is written
+    s = settings_cache.get(db)
+    if not s:
+        raise HTTPException(400, "Settings not configured")
+    multipliers = None
+    if payload.price_multipliers is not None:
+        multipliers = {t: m.model_dump() for t, m in payload.price_multipliers.items()}
+    return what_if(db, s, payload.exchange_rate_yen_to_bdt, payload.shipping_cost_per_kg_bdt, multipliers)
+
+@app.get("/settings/recalc/jobs/{job_id}", response_model=schemas.RecalcJobOut)
+def get_recalc_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.get(models.RecalcJob, job_id)
+    if not job:
+        raise HTTPException(404, "Not found")
+    return job_progress(job)
+
+# cached endpoints serialize once and store the JSON bytes
+_InventoryItem = TypeAdapter(schemas.InventoryOut)
+_SupplierList = TypeAdapter(list[schemas.SupplierOut])
+_SalesLogList = TypeAdapter(list[schemas.SalesLogOut])
+_InTransitItem = TypeAdapter(schemas.InTransitOut)
+
+def _dump_json(adapter: TypeAdapter, obj) -> bytes:
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+def _dump_rows(keys: list[str], rows) -> bytes:
+    # list pages: Core rows straight to JSON, no ORM instances and no per-row validation.
+    # zip() stops at len(keys), dropping any trailing bookkeeping columns.
+    return orjson.dumps([dict(zip(keys, row)) for row in rows])
 
 # ---------- Suppliers ----------
 @app.post("/suppliers", response_model=schemas.SupplierOut)
@@ -101,15 +266,22 @@ def create_supplier(payload: schemas.SupplierCreate, db: Session = Depends(get_d
     sup = models.Supplier(**payload.model_dump())
     db.add(sup)
     db.commit()
+    response_cache.invalidate(SUPPLIERS)
     db.refresh(sup)
     return sup
 
 @app.get("/suppliers", response_model=list[schemas.SupplierOut])
-def list_suppliers(active_only: bool | None = None, db: Session = Depends(get_db)):
-    q = db.query(models.Supplier)
-    if active_only is True:
-        q = q.filter(models.Supplier.active.is_(True))
-    return q.order_by(models.Supplier.name.asc()).all()
+async def list_suppliers(request: Request, active_only: bool | None = None, db: AsyncSession = Depends(get_async_db)):
+    key = ("suppliers", active_only is True)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation
+        q = select(models.Supplier)
+        if active_only is True:
+            q = q.where(models.Supplier.active.is_(True))
+        rows = (await db.scalars(q.order_by(models.Supplier.name.asc()))).all()
+        entry = response_cache.put(key, _dump_json(_SupplierList, rows), (SUPPLIERS,), generation=generation)
+    return etag_response(request, entry)
 
 # ---------- Inventory ----------
 @app.post("/inventory", response_model=schemas.InventoryOut)
@@ -118,13 +290,14 @@ def add_part(payload: schemas.InventoryCreate, db: Session = Depends(get_db)):
     if exists:
         raise HTTPException(409, "Part number already exists")
 
-    s = db.query(models.Settings).first()
+    s = settings_cache.get(db)
     if not s:
         raise HTTPException(400, "Settings not configured")
 
     costs = compute_costs(
         payload.purchase_cost_yen, payload.weight_kg,
-        s.exchange_rate_yen_to_bdt, s.shipping_cost_per_kg_bdt
+        s.exchange_rate_yen_to_bdt, s.shipping_cost_per_kg_bdt,
+        *multipliers_for(s.price_multipliers, payload.part_type),
     )
 
     row = models.Inventory(
@@ -140,12 +313,65 @@ def add_part(payload: schemas.InventoryCreate, db: Session = Depends(get_db)):
         updated_at=datetime.utcnow(),
     )
     db.add(row)
+    db.flush()
+    record_movements(db, [{"part_number": row.part_number, "delta": row.available_qty or 0,
+                           "source": "adjustment", "note": "created"}])
+    if row.applicable_models:
+        sync_part_models(db, [row.part_number])
     db.commit()
+    response_cache.invalidate(INVENTORY_PAGES, part_tag(row.part_number))
     db.refresh(row)
     return row
 
+# uploads larger than this spill from memory to a temp file while they are read
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+@app.post("/inventory/import", response_model=schemas.ImportReport)
+async def bulk_import(request: Request, format: str | None = None, db: Session = Depends(get_db)):
+    # raw body upload: text/csv (header row) or application/x-ndjson (one InventoryCreate object per line)
+    fmt = format or ("jsonl" if "json" in request.headers.get("content-type", "") else "csv")
+    if fmt not in ("csv", "jsonl"):
+        raise HTTPException(400, "format must be csv or jsonl")
+
+    s = await run_in_threadpool(settings_cache.get, db)
+    if not s:
+        raise HTTPException(400, "Settings not configured")
+
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        report = await run_in_threadpool(import_inventory, db, spool, fmt, s)
+    response_cache.invalidate(INVENTORY)
+    return report
+
+async def _inventory_page(db: AsyncSession, q, page: int, page_size: int, cursor: str | None):
+    """(rows, next_cursor) for offset paging (cursor=None) or keyset paging.
+
+    Rows are Core rows ending with (part_number, id) for the cursor and cache tags.
+    """
+    q = q.add_columns(models.Inventory.part_number.label("cursor_part_number"), models.Inventory.id.label("cursor_id"))
+    if cursor is None:
+        q = q.order_by(models.Inventory.part_number.asc())
+        offset = (page - 1) * page_size
+        return (await db.execute(q.offset(offset).limit(page_size))).all(), None
+
+    # keyset mode: pass cursor= (empty) for the first page, then the X-Next-Cursor header value
+    if cursor:
+        try:
+            q = q.where(after_cursor(cursor))
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
+    q = q.order_by(models.Inventory.part_number.asc(), models.Inventory.id.asc()).limit(page_size + 1)
+    rows = (await db.execute(q)).all()
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1][-2], rows[-1][-1])
+    return rows, None
+
 @app.get("/inventory", response_model=list[schemas.InventoryOut])
-def search_inventory(
+async def search_inventory(
+    request: Request,
     part_number: str | None = None,
     applicable_models: str | None = None,
     status: str | None = None,
@@ -155,191 +381,407 @@ def search_inventory(
     manufacturer: str | None = None,
     page: int = 1,
     page_size: int = 50,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    q = db.query(models.Inventory)
-    if part_number:
-        q = q.filter(models.Inventory.part_number.ilike(f"%{part_number}%"))
-    if applicable_models:
-        q = q.filter(models.Inventory.applicable_models.ilike(f"%{applicable_models}%"))
-    if status:
-        q = q.filter(models.Inventory.status == status)
-    if part_type:
-        q = q.filter(models.Inventory.part_type == part_type)
-    if part_subtype:
-        q = q.filter(models.Inventory.part_subtype == part_subtype)
-    if car_make:
-        q = q.filter(models.Inventory.car_make == car_make)
-    if manufacturer:
-        q = q.filter(models.Inventory.manufacturer == manufacturer)
-
-    q = q.order_by(models.Inventory.part_number.asc())
-    offset = (page - 1) * page_size
-    return q.offset(offset).limit(page_size).all()
+    # fields=part_number,available_qty,... returns only those InventoryOut keys
+    try:
+        columns = inventory_columns(fields)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    keys = [c.key for c in columns]
+    filters = inventory_filters(
+        part_number, applicable_models, status, part_type, part_subtype, car_make, manufacturer,
+    )
+    if filters:
+        rows, next_cursor = await _inventory_page(db, select(*columns).where(*filters), page, page_size, cursor)
+        return Response(content=_dump_rows(keys, rows), media_type="application/json",
+                        headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+    # the unfiltered browse pages are what the POS clients poll; serve them from the response cache
+    key = ("inventory", page, page_size, cursor, tuple(keys))
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation
+        rows, next_cursor = await _inventory_page(db, select(*columns), page, page_size, cursor)
+        entry = response_cache.put(
+            key, _dump_rows(keys, rows),
+            (INVENTORY, INVENTORY_PAGES, *(part_tag(r[-2]) for r in rows)),
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None,
+            generation=generation,
+        )
+    return etag_response(request, entry)
+
+@app.get("/inventory/search", response_model=list[schemas.InventorySearchHit])
+async def search_parts_ranked(q: str, limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+    # ranked substring/fuzzy match over part_number and applicable_models
+    limit = max(1, min(limit, 200))
+    hits = await db.run_sync(search_parts, q, limit)
+    return [
+        schemas.InventorySearchHit.model_validate(row).model_copy(update={"score": score})
+        for row, score in hits
+    ]
 
 @app.get("/inventory/{part_number}", response_model=schemas.InventoryOut)
-def get_part(part_number: str, db: Session = Depends(get_db)):
-    row = db.query(models.Inventory).filter_by(part_number=part_number).first()
-    if not row:
-        raise HTTPException(404, "Not found")
-    return row
+async def get_part(request: Request, part_number: str, db: AsyncSession = Depends(get_async_db)):
+    key = ("part", part_number)
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation
+        row = await db.scalar(select(models.Inventory).where(models.Inventory.part_number == part_number).limit(1))
+        if not row:
+            raise HTTPException(404, "Not found")
+        entry = response_cache.put(key, _dump_json(_InventoryItem, row), (INVENTORY, part_tag(part_number)),
+                                   generation=generation)
+    return etag_response(request, entry)
 
 @app.put("/inventory/{part_number}", response_model=schemas.InventoryOut)
 def update_part(part_number: str, payload: schemas.InventoryUpdate, db: Session = Depends(get_db)):
     row = db.query(models.Inventory).filter_by(part_number=part_number).first()
     if not row:
         raise HTTPException(404, "Not found")
-    data = payload.model_dump(exclude_none=True)
+    if payload.version is not None and payload.version != row.version:
+        raise HTTPException(409, "Part was modified since it was read")
+    data = payload.model_dump(exclude_none=True, exclude={"version"})
+    if "available_qty" in data:
+        # the version check below guarantees nothing moved the stock since it was loaded
+        record_movements(db, [{"part_number": part_number, "delta": data["available_qty"] - (row.available_qty or 0),
+                               "source": "adjustment"}])
     for k, v in data.items():
         setattr(row, k, v)
     row.updated_at = datetime.utcnow()
+    try:
+        # the UPDATE is conditional on the version loaded above (Inventory's version_id_col)
+        db.flush()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(409, "Part was modified since it was read")
+    if "applicable_models" in data:
+        sync_part_models(db, [part_number])
     db.commit()
+    response_cache.invalidate(part_tag(part_number))
     db.refresh(row)
     return row
 
 # ---------- Sales ----------
 @app.post("/sales/finalize", response_model=list[schemas.SalesLogOut])
-def finalize_sale(payload: schemas.SalesCartIn, db: Session = Depends(get_db)):
-    logs: list[models.SalesLog] = []
+def finalize_sale(
+    payload: schemas.SalesCartIn,
+    db: Session = Depends(get_db),
+    idempotency_key: Annotated[str | None, Header()] = None,
+):
+    if not payload.items:
+        return []
 
-    # stock checks first
+    # validate and merge duplicate part numbers before touching the database
+    per_part: dict[str, dict] = {}
+    lines: dict[tuple, int] = {}
     for item in payload.items:
-        inv = db.query(models.Inventory).filter_by(part_number=item.part_number).with_for_update().first()
-        if not inv:
-            raise HTTPException(404, f"Part {item.part_number} not found")
         if item.quantity <= 0 or item.price_each_bdt <= 0:
             raise HTTPException(400, f"Invalid qty/price for {item.part_number}")
-        if inv.available_qty < item.quantity:
-            raise HTTPException(400, f"Insufficient stock for {item.part_number}")
-
-    # apply changes
-    for item in payload.items:
-        inv = db.query(models.Inventory).filter_by(part_number=item.part_number).with_for_update().first()
-        inv.available_qty -= item.quantity
-        if item.channel == "Wholesale":
-            inv.sold_wholesale_qty = (inv.sold_wholesale_qty or 0) + item.quantity
-        else:
-            inv.sold_retail_qty = (inv.sold_retail_qty or 0) + item.quantity
-        if inv.available_qty == 0:
-            inv.status = "Out of stock"
-        inv.updated_at = datetime.utcnow()
-
-        log = models.SalesLog(
-            date=datetime.utcnow(),
-            part_number=item.part_number,
-            channel=item.channel,
-            qty=item.quantity,
-            price_each_bdt=item.price_each_bdt,
-            subtotal_bdt=item.quantity * item.price_each_bdt,
-            notes=payload.note or "",
-        )
-        db.add(log)
-        logs.append(log)
+        agg = per_part.setdefault(item.part_number, {"qty": 0, "wholesale": 0, "retail": 0})
+        agg["qty"] += item.quantity
+        agg["wholesale" if item.channel == "Wholesale" else "retail"] += item.quantity
+        key = (item.part_number, item.channel, item.price_each_bdt)
+        lines[key] = lines.get(key, 0) + item.quantity
+
+    # a retried cart gets the first attempt's response back without touching Inventory
+    if idempotency_key:
+        scope = "sales/finalize"
+        replay = replay_or_claim(db, scope, idempotency_key, request_hash(payload.model_dump_json()))
+        if replay is not None:
+            return replay
+
+    # one conditional decrement per part; no row is locked before the write
+    now = datetime.utcnow()
+    take_stock(db, per_part, now)
+
+    log_table = models.SalesLog.__table__
+    logs = db.execute(
+        insert(log_table).returning(*log_table.c),
+        [
+            {
+                "date": now,
+                "part_number": pn,
+                "channel": channel,
+                "qty": qty,
+                "price_each_bdt": price,
+                "subtotal_bdt": qty * price,
+                "notes": payload.note or "",
+            }
+            for (pn, channel, price), qty in lines.items()
+        ],
+    ).mappings().all()
+    record_movements(db, [
+        {"part_number": l["part_number"], "delta": -l["qty"], "source": "sale", "ref": str(l["id"])} for l in logs
+    ], now)
+
+    if not SALES_ROLLUP_INTERVAL:
+        inv = {
+            r.part_number: r
+            for r in db.execute(
+                select(
+                    models.Inventory.part_number, models.Inventory.part_type, models.Inventory.car_make,
+                    models.Inventory.landed_cost_bdt,
+                ).where(models.Inventory.part_number.in_(per_part))
+            )
+        }
+        apply_sales(db, [
+            {
+                "day": now.date(),
+                "part_number": pn,
+                "channel": channel,
+                "part_type": inv[pn].part_type,
+                "car_make": inv[pn].car_make,
+                "qty": qty,
+                "revenue_bdt": qty * price,
+                "cost_bdt": qty * (inv[pn].landed_cost_bdt or 0.0),
+            }
+            for (pn, channel, price), qty in lines.items()
+        ])
+
+    body = _SalesLogList.dump_json(_SalesLogList.validate_python(sorted(logs, key=lambda l: l["id"])))
+    if idempotency_key:
+        remember(db, scope, idempotency_key, body)
+    db.commit()
+    response_cache.invalidate(*(part_tag(pn) for pn in per_part))
+    return Response(body, media_type="application/json")
+
+# ---------- Stock ledger ----------
+@app.get("/inventory/{part_number}/movements", response_model=list[schemas.StockMovementOut])
+def part_movements(part_number: str, limit: int = 100, before_id: int | None = None, db: Session = Depends(get_db)):
+    return part_history(db, part_number, max(1, min(limit, 1000)), before_id)
+
+@app.get("/stock/as-of", response_model=schemas.StockAsOfOut)
+def stock_as_of(at: datetime, part_number: str | None = None, db: Session = Depends(get_db)):
+    # nearest snapshot +/- the movements between it and `at`; the whole catalogue unless part_number is given
+    return Response(content=orjson.dumps(stock_on(db, at, part_number)), media_type="application/json")
+
+@app.post("/stock/snapshots", response_model=schemas.StockSnapshotOut)
+def create_stock_snapshot(at: datetime | None = None, db: Session = Depends(get_db)):
+    try:
+        snap = take_snapshot(db, at)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    db.commit()
+    db.refresh(snap)
+    return snap
+
+@app.get("/stock/snapshots", response_model=list[schemas.StockSnapshotOut])
+def list_stock_snapshots(limit: int = 20, db: Session = Depends(get_db)):
+    return (
+        db.query(models.StockSnapshot)
+        .order_by(models.StockSnapshot.taken_at.desc())
+        .limit(max(1, min(limit, 500)))
+        .all()
+    )
 
+# ---------- Analytics ----------
+# all reports read the rollups, never sales_log: per-day segments for revenue, and per-part rows
+# (whole months from sales_monthly, partial ones from sales_daily) for part-level reports, whose
+# cost grows with the parts sold per month in the range rather than with the number of sales
+def _date_range(date_from: date | None, date_to: date | None) -> tuple[date, date]:
+    date_to = date_to or datetime.utcnow().date()
+    return date_from or date_to - timedelta(days=29), date_to
+
+@app.get("/analytics/revenue", response_model=list[schemas.SalesTotalsOut])
+def analytics_revenue(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    group_by: str = "day",
+    db: Session = Depends(get_db),
+):
+    if group_by not in ("day", "channel", "part_type", "car_make", "part_number"):
+        raise HTTPException(400, "group_by must be day, channel, part_type, car_make or part_number")
+    return revenue_report(db, *_date_range(date_from, date_to), group_by)
+
+@app.get("/analytics/top-sellers", response_model=list[schemas.TopSellerOut])
+def analytics_top_sellers(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    by: str = "qty",
+    limit: int = 20,
+    channel: str | None = None,
+    part_type: str | None = None,
+    car_make: str | None = None,
+    db: Session = Depends(get_db),
+):
+    if by not in ("qty", "revenue", "margin"):
+        raise HTTPException(400, "by must be qty, revenue or margin")
+    return top_sellers(db, *_date_range(date_from, date_to), by, max(1, min(limit, 500)), channel, part_type, car_make)
+
+@app.get("/analytics/slow-movers", response_model=list[schemas.SlowMoverOut])
+def analytics_slow_movers(days: int = 90, limit: int = 50, db: Session = Depends(get_db)):
+    return slow_movers(db, max(1, days), max(1, min(limit, 500)))
+
+@app.post("/analytics/rebuild", response_model=dict)
+def analytics_rebuild(date_from: date, date_to: date, db: Session = Depends(get_db)):
+    # backfill / repair the rollups for a range from sales_log
+    if date_to < date_from:
+        raise HTTPException(400, "date_to is before date_from")
+    rebuild_rollups(db, date_from, date_to)
     db.commit()
-    for l in logs:
-        db.refresh(l)
-    return logs
+    reorder_cache.clear()
+    return {"ok": True, "date_from": date_from, "date_to": date_to}
+
+# ---------- Exports ----------
+@app.get("/export/inventory")
+def export_inventory(
+    format: str = "csv",
+    part_number: str | None = None,
+    applicable_models: str | None = None,
+    status: str | None = None,
+    part_type: str | None = None,
+    part_subtype: str | None = None,
+    car_make: str | None = None,
+    manufacturer: str | None = None,
+):
+    stmt = (
+        select(models.Inventory.__table__)
+        .where(*inventory_filters(
+            part_number, applicable_models, status, part_type, part_subtype, car_make, manufacturer,
+        ))
+        .order_by(models.Inventory.part_number.asc())
+    )
+    return export_response(stmt, format, "inventory")
+
+@app.get("/export/sales")
+def export_sales(
+    format: str = "csv",
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    part_number: str | None = None,
+    channel: str | None = None,
+):
+    stmt = select(models.SalesLog.__table__)
+    if date_from:
+        stmt = stmt.where(models.SalesLog.date >= date_from)
+    if date_to:
+        stmt = stmt.where(models.SalesLog.date < date_to)
+    if part_number:
+        stmt = stmt.where(models.SalesLog.part_number == part_number)
+    if channel:
+        stmt = stmt.where(models.SalesLog.channel == channel)
+    # date order lets a date_from/date_to range walk ix_sales_log_date
+    return export_response(stmt.order_by(models.SalesLog.date.asc(), models.SalesLog.id.asc()), format, "sales_log")
+
+@app.get("/export/intransit")
+def export_intransit(
+    format: str = "csv",
+    status: str | None = None,
+    po_id: str | None = None,
+    supplier_id: str | None = None,
+):
+    stmt = select(models.InTransit.__table__)
+    if status:
+        stmt = stmt.where(models.InTransit.status == status)
+    if po_id:
+        stmt = stmt.where(models.InTransit.po_id == po_id)
+    if supplier_id:
+        stmt = stmt.where(models.InTransit.supplier_id == supplier_id)
+    return export_response(stmt.order_by(models.InTransit.id.asc()), format, "intransit")
+
+# ---------- Reordering ----------
+@app.get("/reorder", response_model=schemas.ReorderOut)
+def reorder_suggestions(
+    lead_time_days: int = DEFAULT_LEAD_TIME_DAYS,
+    safety_days: int = DEFAULT_SAFETY_DAYS,
+    cover_days: int = DEFAULT_COVER_DAYS,
+    db: Session = Depends(get_db),
+):
+    if not (0 <= lead_time_days <= 365 and 0 <= safety_days <= 365 and 1 <= cover_days <= 365):
+        raise HTTPException(400, "lead_time_days and safety_days must be 0-365, cover_days 1-365")
+    # rebuilt only when the data it was built from changes (see ReorderCache)
+    plan = reorder_cache.get(db, lead_time_days=lead_time_days, safety_days=safety_days, cover_days=cover_days)
+    return Response(orjson.dumps(plan), media_type="application/json")
+
+@app.get("/reorder/cache", response_model=dict)
+def reorder_cache_stats():
+    return reorder_cache.stats()
 
 # ---------- Purchases / In-Transit ----------
 @app.post("/po", response_model=schemas.POCreated)
 def create_po(payload: schemas.POIn, db: Session = Depends(get_db)):
-    from uuid import uuid4
     po_id = f"PO-{datetime.utcnow().strftime('%Y%m%d')}-{str(uuid4())[:8]}"
 
-    s = db.query(models.Settings).first()
+    s = settings_cache.get(db)
     if not s:
         raise HTTPException(400, "Settings not configured")
 
-    rows = []
+    # one columnar pricing pass and one multi-row INSERT; nothing is read back
+    lines = payload.lines
+    landed = price_arrays(
+        [l.purchase_cost_yen for l in lines], [l.weight_kg for l in lines],
+        s.exchange_rate_yen_to_bdt, s.shipping_cost_per_kg_bdt, 1.0, 1.0,
+    )["landed_cost_bdt"].tolist()
+    now = datetime.utcnow()
+    rows = [
+        {
+            "po_id": po_id,
+            "order_date": now,
+            "supplier_id": payload.supplier_id,
+            "supplier_name": payload.supplier_name,
+            **line.model_dump(),
+            "exchange_rate_used": s.exchange_rate_yen_to_bdt,
+            "shipping_per_kg_used": s.shipping_cost_per_kg_bdt,
+            "landed_cost_bdt": cost,
+            "status": "Shipping",
+            "qty_received": 0,
+        }
+        for line, cost in zip(lines, landed)
+    ]
+    if rows:
+        db.execute(insert(models.InTransit.__table__), rows)
+    db.commit()
+    return schemas.POCreated(po_id=po_id, lines=len(rows))
+
+@app.post("/intransit/receive", response_model=schemas.ReceiveBatchOut)
+def receive_batch(payload: schemas.ReceiveBatchIn, db: Session = Depends(get_db)):
+    # either a whole PO (all open lines in full) or explicit (row_id, qty) lines
+    if (payload.po_id is None) == (not payload.lines):
+        raise HTTPException(400, "Provide either po_id or lines")
+    requested: dict[int, int] = {}
     for line in payload.lines:
-        costs = compute_costs(
-            line.purchase_cost_yen, line.weight_kg,
-            s.exchange_rate_yen_to_bdt, s.shipping_cost_per_kg_bdt
-        )
-        it = models.InTransit(
-            po_id=po_id,
-            order_date=datetime.utcnow(),
-            supplier_id=payload.supplier_id,
-            supplier_name=payload.supplier_name,
-            part_number=line.part_number,
-            quality=line.quality,
-            part_type=line.part_type,
-            part_subtype=line.part_subtype,
-            car_make=line.car_make,
-            manufacturer=line.manufacturer,
-            qty_ordered=line.qty_ordered,
-            purchase_cost_yen=line.purchase_cost_yen,
-            weight_kg=line.weight_kg,
-            exchange_rate_used=s.exchange_rate_yen_to_bdt,
-            shipping_per_kg_used=s.shipping_cost_per_kg_bdt,
-            landed_cost_bdt=costs["landed_cost_bdt"],
-            status="Shipping",
-            qty_received=0,
-            notes=line.notes,
-            photo_path=line.photo_path,
-        )
-        db.add(it)
-        rows.append(it)
+        requested[line.row_id] = requested.get(line.row_id, 0) + line.qty
 
+    report = receive_lines(db, requested or None, payload.po_id)
+    if payload.po_id is not None and not report["results"]:
+        raise HTTPException(404, "No open lines for this PO")
     db.commit()
-    for r in rows:
-        db.refresh(r)
-    return schemas.POCreated(po_id=po_id, lines=len(rows))
+    received = {r["part_number"] for r in report["results"] if "error" not in r}
+    if received:
+        response_cache.invalidate(*map(part_tag, received), *((INVENTORY_PAGES,) if report["parts_created"] else ()))
+    return report
 
 @app.post("/intransit/{row_id}/receive", response_model=schemas.InTransitOut)
-def receive(row_id: int, qty_received: int, db: Session = Depends(get_db)):
+def receive(
+    row_id: int,
+    qty_received: int,
+    db: Session = Depends(get_db),
+    idempotency_key: Annotated[str | None, Header()] = None,
+):
     if qty_received < 0:
         raise HTTPException(400, "qty_received cannot be negative")
 
-    row = db.query(models.InTransit).filter_by(id=row_id).with_for_update().first()
-    if not row:
-        raise HTTPException(404, "Not found")
-    if row.status != "Shipping":
-        raise HTTPException(400, "Row not in Shipping state")
-    if qty_received + (row.qty_received or 0) > row.qty_ordered:
-        raise HTTPException(400, "Cannot receive more than ordered")
-
-    # ensure inventory exists or create
-    inv = db.query(models.Inventory).filter_by(part_number=row.part_number).with_for_update().first()
-    if not inv:
-        inv = models.Inventory(
-            part_number=row.part_number,
-            quality=row.quality,
-            part_type=row.part_type,
-            part_subtype=row.part_subtype,
-            car_make=row.car_make,
-            manufacturer=row.manufacturer,
-            applicable_models="",
-            purchase_cost_yen=row.purchase_cost_yen,
-            weight_kg=row.weight_kg,
-            exchange_rate_used=row.exchange_rate_used,
-            shipping_per_kg_used=row.shipping_per_kg_used,
-            purchase_cost_bdt=None,
-            shipping_cost_bdt=None,
-            landed_cost_bdt=row.landed_cost_bdt,
-            suggested_wholesale_bdt=None,
-            suggested_retail_bdt=None,
-            wholesale_actual_bdt=None,
-            retail_actual_bdt=None,
-            available_qty=0,
-            sold_wholesale_qty=0,
-            sold_retail_qty=0,
-            status="In stock",
-            photo_path=row.photo_path,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
-        )
-        db.add(inv)
-
-    inv.available_qty = (inv.available_qty or 0) + qty_received
-    inv.status = "In stock" if inv.available_qty > 0 else inv.status
-    inv.updated_at = datetime.utcnow()
-
-    row.qty_received = (row.qty_received or 0) + qty_received
-    if row.qty_received == row.qty_ordered:
-        row.status = "Received"
-
+    if idempotency_key:
+        scope = "intransit/receive"
+        replay = replay_or_claim(db, scope, idempotency_key, request_hash(str(row_id), str(qty_received)))
+        if replay is not None:
+            return replay
+
+    # same path as a one-line batch: the line is locked, the part's stock is a single increment
+    result = receive_lines(db, {row_id: qty_received})
+    error = result["results"][0].get("error")
+    if error:
+        raise HTTPException(404 if error == "Not found" else 400, error)
+    row = db.get(models.InTransit, row_id, populate_existing=True)
+    body = _dump_json(_InTransitItem, row)
+    if idempotency_key:
+        remember(db, scope, idempotency_key, body)
     db.commit()
-    db.refresh(row)
-    return row
+    created = result["parts_created"]
+    response_cache.invalidate(part_tag(row.part_number), *((INVENTORY_PAGES,) if created else ()))
+    return Response(body, media_type="application/json")
+
+startup_timings.imported()
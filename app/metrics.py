@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+from contextvars import ContextVar
+
+# log statements slower than this many milliseconds to the "app.sql.slow" logger; 0 disables
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+
+slow_log = logging.getLogger("app.sql.slow")
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+# set by the HTTP middleware; handlers run in the threadpool with a copy of this context,
+# so the engine hooks below add to the same object
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class _CountingCursor:
+    """DBAPI cursor proxy: rows fetched through it count toward one request's stats."""
+    __slots__ = ("_cursor", "_stats")
+
+    def __init__(self, cursor, stats: RequestStats):
+        self._cursor, self._stats = cursor, stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def counting_cursor(cursor):
+    """`cursor`, wrapped so the rows read from it count toward the current request (if any).
+
+    Drivers report rowcount -1 for SELECTs (pysqlite, server-side cursors), and streamed
+    results are fetched long after the statement ran, so reads are counted as they're fetched.
+    """
+    stats = current_request.get()
+    return cursor if stats is None else _CountingCursor(cursor, stats)
+
+
+class Histogram:
+    def __init__(self, name: str, help_: str, labels: tuple, buckets: tuple):
+        self.name, self.help, self.labels, self.buckets = name, help_, labels, buckets
+        self._series: dict[tuple, list] = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            s = self._series.get(label_values)
+            if s is None:
+                s = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for values, s in sorted(series.items()):
+            base = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, values))
+            sep = "," if base else ""
+            for b, c in zip(self.buckets, s):
+                out.append(f'{self.name}_bucket{{{base}{sep}le="{b}"}} {c}')
+            out.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {s[-1]}')
+            out.append(f"{self.name}_sum{{{base}}} {s[-2]:.6f}")
+            out.append(f"{self.name}_count{{{base}}} {s[-1]}")
+        return out
+
+
+class Counter:
+    def __init__(self, name: str, help_: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help_, labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for label_values, v in sorted(values.items()):
+            base = ",".join(f'{k}="{lv}"' for k, lv in zip(self.labels, label_values))
+            out.append(f"{self.name}{{{base}}} {v:g}" if base else f"{self.name} {v:g}")
+        return out
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Wall time per request.",
+                            ("method", "route"), _LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram("db_queries_per_request", "SQL statements executed per request.",
+                            ("method", "route"), _COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram("db_time_per_request_seconds", "Time spent in SQL statements per request.",
+                               ("method", "route"), _LATENCY_BUCKETS)
+REQUEST_ROWS = Histogram("db_rows_per_request", "Rows fetched by reads plus rows written (rowcount) per request.",
+                         ("method", "route"), _COUNT_BUCKETS)
+QUERIES = Counter("db_queries_total", "SQL statements executed, including background jobs.")
+SLOW_QUERIES = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+
+_ALL = [REQUESTS, REQUEST_SECONDS, REQUEST_QUERIES, REQUEST_DB_SECONDS, REQUEST_ROWS, QUERIES, SLOW_QUERIES]
+
+
+def record_query(statement: str, seconds: float, rowcount: int):
+    """Called from the engine hooks in app.db after every statement; rowcount is -1 for reads,
+    whose rows are counted by counting_cursor as they're fetched."""
+    QUERIES.inc()
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+        if rowcount > 0:
+            stats.rows += rowcount
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        slow_log.warning("slow query %.1fms rows=%s: %s", seconds * 1000, rowcount, " ".join(statement.split())[:500])
+
+
+def record_request(method: str, route: str, status: int, seconds: float, stats: RequestStats):
+    REQUESTS.inc(method, route, status)
+    REQUEST_SECONDS.observe(seconds, method, route)
+    REQUEST_QUERIES.observe(stats.queries, method, route)
+    REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
+    REQUEST_ROWS.observe(stats.rows, method, route)
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in _ALL:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,46 @@
+"""Bring the database schema up to date: `python -m app.migrate`.
+
+Runs once per deploy (see render.yaml) instead of in every worker at import time.
+Databases created by the old Base.metadata.create_all call have tables but no
+alembic_version row; they are stamped at the baseline revision before upgrading.
+"""
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, pool
+
+from .db import DATABASE_URL
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = "0001"
+
+
+def alembic_config(url: str = DATABASE_URL) -> Config:
+    cfg = Config(os.path.join(ROOT, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    cfg.attributes["url"] = url
+    return cfg
+
+
+def upgrade(url: str = DATABASE_URL, revision: str = "head", configure_logging: bool = True):
+    cfg = alembic_config(url)
+    cfg.attributes["configure_logging"] = configure_logging
+    engine = create_engine(url, poolclass=pool.NullPool)
+    try:
+        insp = inspect(engine)
+        if insp.has_table("inventory") and not insp.has_table("alembic_version"):
+            command.stamp(cfg, BASELINE)
+    finally:
+        engine.dispose()
+    command.upgrade(cfg, revision)
+
+
+def downgrade(url: str = DATABASE_URL, revision: str = "base", configure_logging: bool = True):
+    cfg = alembic_config(url)
+    cfg.attributes["configure_logging"] = configure_logging
+    command.downgrade(cfg, revision)
+
+
+if __name__ == "__main__":
+    upgrade()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, JSON, Index, LargeBinary, text
 from .db import Base
 
 class Settings(Base):
@@ -10,7 +10,9 @@ class Settings(Base):
     part_subtypes = Column(JSON, default=dict)  # {type: [subtypes]}
     car_makes = Column(JSON, default=list)
     manufacturers = Column(JSON, default=list)
+    price_multipliers = Column(JSON, default=dict)  # {part_type: {"wholesale": x, "retail": y}}; missing -> 2.5 / 3.5
     last_recalc = Column(DateTime, nullable=True)
+    version = Column(Integer, default=1)  # bumped on every write; settings_cache revalidates against it
 
 class Supplier(Base):
     __tablename__ = "suppliers"
@@ -49,6 +51,29 @@ class Inventory(Base):
     status = Column(String, default="In stock")
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
+    # bumped by every write; ORM updates are conditional on it, Core stock updates bump it themselves
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+    # matched to the GET /inventory filter combinations; part_number last so pages come out of the index in order
+    __table_args__ = (
+        Index("ix_inventory_type_subtype_pn", "part_type", "part_subtype", "part_number"),
+        Index("ix_inventory_make_type_pn", "car_make", "part_type", "part_number"),
+        Index("ix_inventory_manufacturer_pn", "manufacturer", "part_number"),
+        Index("ix_inventory_status_pn", "status", "part_number"),
+        Index("ix_inventory_out_of_stock", "part_number",
+              postgresql_where=text("status = 'Out of stock'"), sqlite_where=text("status = 'Out of stock'")),
+        # max(updated_at) is part of the reorder cache's data version
+        Index("ix_inventory_updated_at", "updated_at"),
+    )
+
+class InventoryModel(Base):
+    # one row per (part, normalized model) parsed from Inventory.applicable_models; kept by app.search
+    __tablename__ = "inventory_models"
+    id = Column(Integer, primary_key=True, index=True)
+    inventory_id = Column(Integer, index=True)
+    model = Column(String, index=True)
 
 class SalesLog(Base):
     __tablename__ = "sales_log"
@@ -61,6 +86,11 @@ class SalesLog(Base):
     subtotal_bdt = Column(Float)
     notes = Column(String, nullable=True)
 
+    __table_args__ = (
+        Index("ix_sales_log_date", "date"),
+        Index("ix_sales_log_part_number_date", "part_number", "date"),
+    )
+
 class InTransit(Base):
     __tablename__ = "intransit"
     id = Column(Integer, primary_key=True, index=True)
@@ -84,3 +114,123 @@ class InTransit(Base):
     qty_received = Column(Integer, default=0)
     notes = Column(String, nullable=True)
     photo_path = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_intransit_supplier_id", "supplier_id"),
+        # receiving screens only list open lines
+        Index("ix_intransit_shipping", "part_number",
+              postgresql_where=text("status = 'Shipping'"), sqlite_where=text("status = 'Shipping'")),
+        Index("ix_intransit_status_id", "status", "id"),
+    )
+
+class RecalcJob(Base):
+    __tablename__ = "recalc_jobs"
+    id = Column(String, primary_key=True)  # uuid hex
+    status = Column(String, default="queued", index=True)  # queued / running / done / failed
+    exchange_rate_yen_to_bdt = Column(Float)  # rates frozen at enqueue so a resumed job stays consistent
+    shipping_cost_per_kg_bdt = Column(Float)
+    price_multipliers = Column(JSON, nullable=True)
+    rows_total = Column(Integer, default=0)
+    rows_done = Column(Integer, default=0)
+    last_id = Column(Integer, default=0)  # checkpoint: every inventory id <= last_id is repriced
+    owner = Column(String, nullable=True)  # host:pid holding the lease
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # at most one queued/running job: every active row indexes the same value
+        Index("ux_recalc_jobs_active", text("(status IN ('queued', 'running'))"), unique=True,
+              postgresql_where=text("status IN ('queued', 'running')"),
+              sqlite_where=text("status IN ('queued', 'running')")),
+    )
+
+class SalesDaily(Base):
+    # daily sales rollup per part and channel; kept by app.analytics
+    __tablename__ = "sales_daily"
+    day = Column(Date, primary_key=True)  # UTC date of SalesLog.date
+    part_number = Column(String, primary_key=True)
+    channel = Column(String, primary_key=True)
+    part_type = Column(String, nullable=True)  # copied from Inventory when the sale is rolled up
+    car_make = Column(String, nullable=True)
+    qty = Column(Integer, default=0)
+    revenue_bdt = Column(Float, default=0.0)
+    cost_bdt = Column(Float, default=0.0)  # qty * Inventory.landed_cost_bdt at the time
+    lines = Column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_sales_daily_part_number_day", "part_number", "day"),
+    )
+
+class SalesDailySegment(Base):
+    # the same rollup summed over parts: per day, channel, part_type and car_make (small enough for dashboards)
+    __tablename__ = "sales_daily_segments"
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    channel = Column(String, nullable=False)
+    part_type = Column(String, nullable=False, default="")  # "" for parts without a type, so the key is unique
+    car_make = Column(String, nullable=False, default="")
+    qty = Column(Integer, default=0)
+    revenue_bdt = Column(Float, default=0.0)
+    cost_bdt = Column(Float, default=0.0)
+    lines = Column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ux_sales_daily_segments_key", "day", "channel", "part_type", "car_make", unique=True),
+    )
+
+class SalesMonthly(Base):
+    # sales_daily summed per calendar month; long-range per-part reports read whole months from here
+    __tablename__ = "sales_monthly"
+    month = Column(Date, primary_key=True)  # first day of the month
+    part_number = Column(String, primary_key=True)
+    channel = Column(String, primary_key=True)
+    part_type = Column(String, nullable=True)
+    car_make = Column(String, nullable=True)
+    qty = Column(Integer, default=0)
+    revenue_bdt = Column(Float, default=0.0)
+    cost_bdt = Column(Float, default=0.0)
+    lines = Column(Integer, default=0)
+
+class StockMovement(Base):
+    # append-only: every change to Inventory.available_qty, written in the same transaction as the change
+    __tablename__ = "stock_movements"
+    id = Column(Integer, primary_key=True)
+    at = Column(DateTime, nullable=False)
+    part_number = Column(String, nullable=False)
+    delta = Column(Integer, nullable=False)
+    source = Column(String, nullable=False)  # opening / sale / receipt / adjustment / import
+    ref = Column(String, nullable=True)  # sales_log.id for sales, intransit.id for receipts
+    note = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_stock_movements_part_number_id", "part_number", "id"),
+        Index("ix_stock_movements_at", "at"),
+    )
+
+class StockSnapshot(Base):
+    # stock of every part as of taken_at, derived from the previous snapshot plus the movements since
+    __tablename__ = "stock_snapshots"
+    id = Column(Integer, primary_key=True)
+    taken_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime)
+    parts = Column(Integer, default=0)
+    units = Column(Integer, default=0)
+
+class StockSnapshotLine(Base):
+    # parts with zero stock are left out
+    __tablename__ = "stock_snapshot_lines"
+    snapshot_id = Column(Integer, primary_key=True)
+    part_number = Column(String, primary_key=True)
+    qty = Column(Integer, nullable=False)
+
+class IdempotencyKey(Base):
+    # one row per Idempotency-Key seen on a write endpoint; swept once expired
+    __tablename__ = "idempotency_keys"
+    key = Column(String, primary_key=True)  # "<endpoint> <client key>"
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)  # null until the first request's transaction commits
+    response = Column(LargeBinary, nullable=True)  # the JSON body as sent
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,147 @@
+from time import perf_counter
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .utils.formulas import multipliers_for
+
+# rows fetched per round trip when loading the catalogue into arrays
+PRICING_LOAD_BATCH = 50_000
+
+_TOTALS = ("landed_value_bdt", "suggested_wholesale_value_bdt", "suggested_retail_value_bdt",
+           "wholesale_margin_bdt", "retail_margin_bdt")
+
+
+def round_cents(a: np.ndarray) -> np.ndarray:
+    """Round to 2 decimals exactly like Python's round(x, 2).
+
+    np.round scales by 100 first, which can land a value that is just below a half cent
+    exactly on it (or the reverse); those few near-ties are redone with round().
+    """
+    out = np.round(a, 2)
+    scaled = a * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= np.abs(scaled) * 1e-12 + 1e-9
+    if near_tie.any():
+        idx = np.flatnonzero(near_tie)
+        out[idx] = [round(float(v), 2) for v in a[idx]]
+    return out
+
+
+def price_arrays(yen, kg, exchange_rate: float, shipping_per_kg: float, wholesale_mult, retail_mult) -> dict:
+    """compute_costs over whole columns in one vectorized pass; same arithmetic, same cents.
+
+    yen/kg are float arrays with NaN for NULL; the multipliers are scalars or per-row arrays.
+    """
+    purchase = np.nan_to_num(np.asarray(yen, dtype=np.float64)) * (exchange_rate or 0.0)
+    shipping = np.nan_to_num(np.asarray(kg, dtype=np.float64)) * (shipping_per_kg or 0.0)
+    landed = purchase + shipping
+    return {
+        "purchase_cost_bdt": round_cents(purchase),
+        "shipping_cost_bdt": round_cents(shipping),
+        "landed_cost_bdt": round_cents(landed),
+        "suggested_wholesale_bdt": round_cents(landed * wholesale_mult),
+        "suggested_retail_bdt": round_cents(landed * retail_mult),
+    }
+
+
+def encode_types(part_types) -> tuple[list[str], np.ndarray]:
+    """Dictionary-encode a part_type column: (distinct types, each row's index into them). None -> ""."""
+    index: dict[str, int] = {}
+    idx = np.fromiter((index.setdefault(t or "", len(index)) for t in part_types), dtype=np.intp, count=len(part_types))
+    return list(index), idx
+
+
+def type_multipliers(price_multipliers: dict | None, types: list[str], type_idx: np.ndarray):
+    """Per-row (wholesale, retail) multiplier arrays from each row's index into `types`."""
+    pairs = np.array([multipliers_for(price_multipliers, t) for t in types], dtype=np.float64).reshape(-1, 2)
+    return pairs[type_idx, 0], pairs[type_idx, 1]
+
+
+# ---------- Catalogue what-if ----------
+class Catalogue:
+    """Column arrays of the inventory needed for pricing; part_type is dictionary-encoded."""
+
+    def __init__(self, part_types, yen, kg, qty):
+        self.types, self.type_idx = encode_types(part_types)
+        self.yen = np.array(yen, dtype=np.float64)
+        self.kg = np.array(kg, dtype=np.float64)
+        self.qty = np.clip(np.nan_to_num(np.array(qty, dtype=np.float64)), 0, None)
+
+    def __len__(self):
+        return len(self.yen)
+
+
+def load_catalogue(db: Session, batch: int = PRICING_LOAD_BATCH) -> Catalogue:
+    inv = models.Inventory
+    cols = ([], [], [], [])
+    result = db.execute(
+        select(inv.part_type, inv.purchase_cost_yen, inv.weight_kg, inv.available_qty)
+        .execution_options(yield_per=batch)
+    )
+    for rows in result.partitions():
+        for col, values in zip(cols, zip(*rows)):
+            col.extend(values)
+    # float64 conversion turns NULLs into NaN, which price_arrays zeroes like compute_costs does
+    return Catalogue(*cols)
+
+
+def scenario(cat: Catalogue, exchange_rate: float, shipping_per_kg: float, price_multipliers: dict | None) -> dict:
+    """Stock-weighted value of the catalogue priced at these rates: totals and per part_type."""
+    ws, rt = type_multipliers(price_multipliers, cat.types, cat.type_idx)
+    p = price_arrays(cat.yen, cat.kg, exchange_rate, shipping_per_kg, ws, rt)
+    landed = p["landed_cost_bdt"] * cat.qty
+    wholesale = p["suggested_wholesale_bdt"] * cat.qty
+    retail = p["suggested_retail_bdt"] * cat.qty
+
+    def totals(l, w, r):
+        return dict(zip(_TOTALS, (l, w, r, w - l, r - l)))
+
+    n = len(cat.types)
+    per_type = [np.bincount(cat.type_idx, weights=v, minlength=n) for v in (landed, wholesale, retail)]
+    return {
+        "totals": totals(landed.sum(), wholesale.sum(), retail.sum()),
+        "by_part_type": {t or None: totals(*(v[i] for v in per_type)) for i, t in enumerate(cat.types)},
+    }
+
+
+def _rounded(t: dict) -> dict:
+    return {k: round(float(v), 2) for k, v in t.items()}
+
+
+def _delta(a: dict, b: dict) -> dict:
+    return {k: round(float(b[k]) - float(a[k]), 2) for k in _TOTALS}
+
+
+def what_if(db: Session, s, exchange_rate: float | None = None, shipping_per_kg: float | None = None,
+            price_multipliers: dict | None = None) -> dict:
+    """Compare the catalogue priced at the current settings with a hypothetical set. Read-only."""
+    started = perf_counter()
+    cat = load_catalogue(db)
+    loaded = perf_counter()
+    current = scenario(cat, s.exchange_rate_yen_to_bdt, s.shipping_cost_per_kg_bdt, s.price_multipliers)
+    proposed = scenario(
+        cat,
+        s.exchange_rate_yen_to_bdt if exchange_rate is None else exchange_rate,
+        s.shipping_cost_per_kg_bdt if shipping_per_kg is None else shipping_per_kg,
+        s.price_multipliers if price_multipliers is None else price_multipliers,
+    )
+    return {
+        "rows": len(cat),
+        "units": int(cat.qty.sum()),
+        "current": _rounded(current["totals"]),
+        "proposed": _rounded(proposed["totals"]),
+        "delta": _delta(current["totals"], proposed["totals"]),
+        "by_part_type": [
+            {
+                "part_type": t,
+                "current": _rounded(current["by_part_type"][t]),
+                "proposed": _rounded(proposed["by_part_type"][t]),
+                "delta": _delta(current["by_part_type"][t], proposed["by_part_type"][t]),
+            }
+            for t in current["by_part_type"]
+        ],
+        "load_ms": round((loaded - started) * 1000, 1),
+        "compute_ms": round((perf_counter() - loaded) * 1000, 1),
+    }
@@ -0,0 +1,79 @@
+import base64
+import json
+
+from sqlalchemy import tuple_
+
+from . import models, schemas
+from .search import substring_clause
+
+# columns GET /inventory can return, in InventoryOut order
+INVENTORY_FIELDS = tuple(schemas.InventoryOut.model_fields)
+
+
+def inventory_filters(
+    part_number: str | None = None,
+    applicable_models: str | None = None,
+    status: str | None = None,
+    part_type: str | None = None,
+    part_subtype: str | None = None,
+    car_make: str | None = None,
+    manufacturer: str | None = None,
+) -> list:
+    """WHERE clauses shared by GET /inventory and the inventory export."""
+    clauses = []
+    if part_number:
+        clauses.append(substring_clause(models.Inventory.part_number, part_number))
+    if applicable_models:
+        clauses.append(substring_clause(models.Inventory.applicable_models, applicable_models))
+    if status:
+        clauses.append(models.Inventory.status == status)
+    if part_type:
+        clauses.append(models.Inventory.part_type == part_type)
+    if part_subtype:
+        clauses.append(models.Inventory.part_subtype == part_subtype)
+    if car_make:
+        clauses.append(models.Inventory.car_make == car_make)
+    if manufacturer:
+        clauses.append(models.Inventory.manufacturer == manufacturer)
+    return clauses
+
+
+def inventory_columns(fields: str | None = None) -> list:
+    """Inventory columns for a comma-separated `fields` projection (None/empty: all of InventoryOut).
+
+    Raises ValueError naming any field that isn't part of InventoryOut.
+    """
+    if not fields:
+        names = INVENTORY_FIELDS
+    else:
+        names = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [n for n in names if n not in INVENTORY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return [models.Inventory.__table__.c[n] for n in names]
+
+
+# ---------- Keyset pagination ----------
+def encode_cursor(part_number: str, row_id: int) -> str:
+    raw = json.dumps([part_number, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """Raises ValueError for anything that isn't a cursor we issued."""
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (TypeError, ValueError):  # bad base64 / UTF-8 / JSON
+        raise ValueError("malformed cursor") from None
+    if not isinstance(value, list) or len(value) != 2:
+        raise ValueError("malformed cursor")
+    part_number, row_id = value
+    if not isinstance(part_number, str) or not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise ValueError("malformed cursor")
+    return part_number, row_id
+
+
+def after_cursor(cursor: str):
+    """Clause selecting inventory rows strictly after `cursor` in (part_number, id) order."""
+    part_number, row_id = decode_cursor(cursor)
+    return tuple_(models.Inventory.part_number, models.Inventory.id) > tuple_(part_number, row_id)
@@ -0,0 +1,194 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from time import perf_counter
+from uuid import uuid4
+
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import SessionLocal
+from .response_cache import INVENTORY, response_cache
+from .pricing import encode_types, price_arrays, type_multipliers
+from .settings_cache import settings_cache
+
+# rows per bulk UPDATE; keeps memory flat regardless of catalogue size
+RECALC_CHUNK_SIZE = 2000
+# a running job whose heartbeat is older than this is considered orphaned and can be resumed
+RECALC_JOB_LEASE = timedelta(seconds=int(os.getenv("RECALC_JOB_LEASE_SECONDS", "120")))
+
+_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def recalc_chunk(db: Session, rate: float, ship: float, after_id: int = 0, limit: int = RECALC_CHUNK_SIZE,
+                 price_multipliers: dict | None = None):
+    """Reprice the next `limit` inventory rows with id > after_id.
+
+    Only the input columns are read (no ORM hydration), the chunk is priced in one
+    vectorized pass (price_arrays rounds to the same cents as compute_costs) and the
+    results are written back with one Core executemany UPDATE keyed by id.
+    Returns (rows_touched, last_id).
+    """
+    inv = models.Inventory
+    rows = db.execute(
+        select(inv.id, inv.part_type, inv.purchase_cost_yen, inv.weight_kg)
+        .where(inv.id > after_id)
+        .order_by(inv.id.asc())
+        .limit(limit)
+    ).all()
+    if not rows:
+        return 0, after_id
+
+    ids, part_types, yen, kg = zip(*rows)
+    prices = price_arrays(yen, kg, rate, ship, *type_multipliers(price_multipliers, *encode_types(part_types)))
+    columns = {name: values.tolist() for name, values in prices.items()}
+
+    now = datetime.utcnow()
+    params = [
+        {
+            "_id": rid,
+            "exchange_rate_used": rate,
+            "shipping_per_kg_used": ship,
+            **{name: values[i] for name, values in columns.items()},
+            "updated_at": now,
+        }
+        for i, rid in enumerate(ids)
+    ]
+    table = models.Inventory.__table__
+    db.execute(update(table).where(table.c.id == bindparam("_id")).values(version=table.c.version + 1), params)
+    return len(rows), rows[-1][0]
+
+
+def recalc_inventory(db: Session, s: models.Settings, chunk_size: int = RECALC_CHUNK_SIZE):
+    """Reprice the whole catalogue in id-ordered chunks. Caller commits."""
+    started = perf_counter()
+    total, last_id = 0, 0
+    while True:
+        n, last_id = recalc_chunk(db, s.exchange_rate_yen_to_bdt, s.shipping_cost_per_kg_bdt, last_id, chunk_size,
+                                  s.price_multipliers)
+        if not n:
+            break
+        total += n
+    return {"recalculated": total, "elapsed_ms": round((perf_counter() - started) * 1000, 1)}
+
+
+# ---------- Background jobs ----------
+def active_recalc_job(db: Session):
+    return (
+        db.query(models.RecalcJob)
+        .filter(models.RecalcJob.status.in_(("queued", "running")))
+        .order_by(models.RecalcJob.created_at.desc())
+        .first()
+    )
+
+
+def create_recalc_job(db: Session, s: models.Settings) -> models.RecalcJob:
+    job = models.RecalcJob(
+        id=uuid4().hex,
+        status="queued",
+        exchange_rate_yen_to_bdt=s.exchange_rate_yen_to_bdt,
+        shipping_cost_per_kg_bdt=s.shipping_cost_per_kg_bdt,
+        price_multipliers=s.price_multipliers,
+        rows_total=db.scalar(select(func.count(models.Inventory.id))) or 0,
+        rows_done=0,
+        last_id=0,
+        created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_recalc_job(db: Session, job_id: str) -> bool:
+    """Take the lease on a queued or orphaned job. Only one worker can win."""
+    now = datetime.utcnow()
+    res = db.execute(
+        update(models.RecalcJob)
+        .where(
+            models.RecalcJob.id == job_id,
+            models.RecalcJob.status.in_(("queued", "running")),
+            or_(models.RecalcJob.heartbeat_at.is_(None), models.RecalcJob.heartbeat_at < now - RECALC_JOB_LEASE),
+        )
+        .values(status="running", owner=_OWNER, heartbeat_at=now,
+                started_at=func.coalesce(models.RecalcJob.started_at, now))
+    )
+    db.commit()
+    return res.rowcount == 1
+
+
+def run_recalc_job(job_id: str, chunk_size: int = RECALC_CHUNK_SIZE):
+    """Process a job batch by batch, committing the checkpoint with each batch.
+
+    If another owner holds a live lease, check again once it would expire: the owner may
+    be a worker that died moments ago (e.g. restarted within the lease), and nothing else
+    would pick the job up. A live owner keeps heartbeating, so this just waits it out.
+    """
+    db = SessionLocal()
+    try:
+        while not claim_recalc_job(db, job_id):
+            job = db.get(models.RecalcJob, job_id, populate_existing=True)
+            if job is None or job.status not in ("queued", "running"):
+                return
+            expires = (job.heartbeat_at or datetime.utcnow()) + RECALC_JOB_LEASE
+            db.rollback()
+            time.sleep(max((expires - datetime.utcnow()).total_seconds(), 0) + 1)
+        job = db.get(models.RecalcJob, job_id)
+        try:
+            while True:
+                n, last_id = recalc_chunk(db, job.exchange_rate_yen_to_bdt, job.shipping_cost_per_kg_bdt,
+                                          job.last_id, chunk_size, job.price_multipliers)
+                if not n:
+                    break
+                job.last_id = last_id
+                job.rows_done += n
+                job.heartbeat_at = datetime.utcnow()
+                db.commit()
+
+            now = datetime.utcnow()
+            job.status = "done"
+            job.finished_at = now
+            job.heartbeat_at = now
+            s = db.query(models.Settings).first()
+            if s:
+                s.last_recalc = now
+                s.version = (s.version or 0) + 1
+            db.commit()
+            settings_cache.invalidate()
+            response_cache.invalidate(INVENTORY)
+        except Exception as e:
+            db.rollback()
+            job.status = "failed"
+            job.error = str(e)[:500]
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            raise
+    finally:
+        db.close()
+
+
+def start_recalc_job(job_id: str):
+    threading.Thread(target=run_recalc_job, args=(job_id,), name=f"recalc-{job_id[:8]}", daemon=True).start()
+
+
+def resume_recalc_jobs():
+    """Restart jobs left queued/running by a worker that died; claim_recalc_job skips live ones."""
+    db = SessionLocal()
+    try:
+        ids = db.scalars(
+            select(models.RecalcJob.id).where(models.RecalcJob.status.in_(("queued", "running")))
+        ).all()
+    finally:
+        db.close()
+    for job_id in ids:
+        start_recalc_job(job_id)
+
+
+def job_progress(job: models.RecalcJob) -> dict:
+    out = {c.name: getattr(job, c.name) for c in models.RecalcJob.__table__.columns}
+    if job.started_at and job.heartbeat_at and job.heartbeat_at > job.started_at:
+        out["throughput_rows_per_s"] = round(job.rows_done / (job.heartbeat_at - job.started_at).total_seconds(), 1)
+    return out
@@ -0,0 +1,108 @@
+from datetime import datetime
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .ledger import record_movements
+from .stock import add_stock
+
+# InTransit columns copied onto an Inventory row created by receiving
+_COPIED = ("quality", "part_type", "part_subtype", "car_make", "manufacturer", "purchase_cost_yen",
+           "weight_kg", "exchange_rate_used", "shipping_per_kg_used", "landed_cost_bdt", "photo_path")
+
+
+def receive_lines(db: Session, requested: dict[int, int] | None = None, po_id: str | None = None) -> dict:
+    """Receive many InTransit lines in one transaction. Caller commits.
+
+    `requested` maps row_id -> qty (duplicates already summed); with `po_id` instead, every
+    line of that PO still in Shipping is received in full. Lines that fail validation are
+    reported and skipped, the rest are applied. Only the InTransit lines are locked (in id
+    order); stock goes up through add_stock's increments without locking Inventory rows.
+    """
+    it = models.InTransit
+    q = select(
+        it.id, it.part_number, it.status, it.qty_ordered, it.qty_received, *(getattr(it, c) for c in _COPIED)
+    )
+    if po_id is not None:
+        q = q.where(it.po_id == po_id, it.status == "Shipping")
+    else:
+        q = q.where(it.id.in_(list(requested)))
+    rows = {r.id: r for r in db.execute(q.order_by(it.id.asc()).with_for_update())}
+    if po_id is not None:
+        requested = {rid: r.qty_ordered - (r.qty_received or 0) for rid, r in rows.items()}
+
+    results: dict[int, dict] = {}
+    accepted: dict[int, int] = {}
+    per_part: dict[str, int] = {}
+    for rid, qty in requested.items():
+        row = rows.get(rid)
+        res = results[rid] = {"row_id": rid, "qty": qty}
+        if row is None:
+            res["error"] = "Not found"
+            continue
+        res.update(part_number=row.part_number, qty_ordered=row.qty_ordered,
+                   qty_received=row.qty_received or 0, status=row.status)
+        if qty < 0:
+            res["error"] = "qty cannot be negative"
+        elif row.status != "Shipping":
+            res["error"] = "Row not in Shipping state"
+        elif qty + (row.qty_received or 0) > row.qty_ordered:
+            res["error"] = "Cannot receive more than ordered"
+        else:
+            accepted[rid] = qty
+            per_part[row.part_number] = per_part.get(row.part_number, 0) + qty
+
+    created = 0
+    now = datetime.utcnow()
+    if accepted:
+        inv = models.Inventory
+        existing = set(db.scalars(select(inv.part_number).where(inv.part_number.in_(list(per_part)))))
+
+        # parts seen for the first time: one multi-row INSERT, taking details from their lowest-id line
+        new_rows = {}
+        for rid in sorted(accepted):
+            row = rows[rid]
+            if row.part_number in existing or row.part_number in new_rows:
+                continue
+            qty = per_part[row.part_number]
+            new_rows[row.part_number] = {
+                "part_number": row.part_number,
+                **{c: getattr(row, c) for c in _COPIED},
+                "applicable_models": "",
+                "available_qty": qty,
+                "sold_wholesale_qty": 0,
+                "sold_retail_qty": 0,
+                "status": "In stock",
+                "created_at": now,
+                "updated_at": now,
+            }
+        if new_rows:
+            db.execute(insert(inv.__table__), list(new_rows.values()))
+            created = len(new_rows)
+        # existing parts: atomic increments, so sales of the same parts are never blocked
+        if existing:
+            add_stock(db, {pn: per_part[pn] for pn in existing}, now)
+
+        it_updates = []
+        for rid, qty in accepted.items():
+            row = rows[rid]
+            total = (row.qty_received or 0) + qty
+            status = "Received" if total == row.qty_ordered else row.status
+            it_updates.append({"_id": rid, "qty_received": total, "status": status})
+            results[rid].update(qty_received=total, status=status)
+        it_table = it.__table__
+        db.execute(update(it_table).where(it_table.c.id == bindparam("_id")), it_updates)
+        record_movements(db, [
+            {"part_number": rows[rid].part_number, "delta": qty, "source": "receipt", "ref": str(rid)}
+            for rid, qty in accepted.items()
+        ], now)
+
+    failed = sum(1 for r in results.values() if "error" in r)
+    return {
+        "lines_total": len(results),
+        "lines_ok": len(results) - failed,
+        "lines_failed": failed,
+        "parts_created": created,
+        "results": list(results.values()),
+    }
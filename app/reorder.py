@@ -0,0 +1,223 @@
+import math
+import threading
+from datetime import datetime, timedelta
+from time import perf_counter
+
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session, aliased
+
+from . import models
+
+# (days, weight): daily sales rate is the weighted mean of these windows' rates, so a recent
+# spike counts without forgetting steady sellers; every window ends today
+REORDER_WINDOWS = ((7, 0.5), (30, 0.3), (90, 0.2))
+DEFAULT_LEAD_TIME_DAYS = 21
+DEFAULT_SAFETY_DAYS = 7
+DEFAULT_COVER_DAYS = 30
+
+# copied from Inventory onto the draft PO lines
+_PO_FIELDS = ("quality", "part_type", "part_subtype", "car_make", "manufacturer")
+
+
+def _plan_query(today):
+    """One row per part sold in the longest window: stock, open PO quantity, last supplier, units per window."""
+    sd, it, inv = models.SalesDaily, models.InTransit, models.Inventory
+    longest = max(d for d, _ in REORDER_WINDOWS)
+    sold = (
+        select(
+            sd.part_number.label("part_number"),
+            *(func.sum(case((sd.day > today - timedelta(days=d), sd.qty), else_=0)).label(f"sold_{d}")
+              for d, _ in REORDER_WINDOWS),
+        )
+        .where(sd.day > today - timedelta(days=longest))
+        .group_by(sd.part_number)
+        .subquery()
+    )
+    orders = (
+        select(
+            it.part_number.label("part_number"),
+            func.max(it.id).label("last_id"),
+            func.sum(case((it.status == "Shipping", it.qty_ordered - func.coalesce(it.qty_received, 0)), else_=0))
+            .label("on_order"),
+        )
+        .group_by(it.part_number)
+        .subquery()
+    )
+    last = aliased(models.InTransit)
+    return (
+        select(
+            inv.part_number, inv.available_qty, inv.purchase_cost_yen, inv.weight_kg,
+            *(getattr(inv, f) for f in _PO_FIELDS),
+            orders.c.on_order, last.supplier_id, last.supplier_name,
+            *(sold.c[f"sold_{d}"] for d, _ in REORDER_WINDOWS),
+        )
+        .select_from(sold)
+        .join(inv, inv.part_number == sold.c.part_number)
+        .outerjoin(orders, orders.c.part_number == sold.c.part_number)
+        .outerjoin(last, last.id == orders.c.last_id)
+    )
+
+
+def reorder_plan(db: Session, lead_time_days: int = DEFAULT_LEAD_TIME_DAYS, safety_days: int = DEFAULT_SAFETY_DAYS,
+                 cover_days: int = DEFAULT_COVER_DAYS) -> dict:
+    """Parts to reorder, grouped by the supplier they were last ordered from.
+
+    A part is due when stock plus open PO lines (status Shipping) is below what it sells in
+    lead_time_days + safety_days; it is topped up to also cover cover_days after arrival.
+    Each supplier group carries a draft `po` that POST /po accepts as is.
+    """
+    started = perf_counter()
+    today = datetime.utcnow().date()
+    result = db.execute(_plan_query(today))
+    keys = list(result.keys())
+    rows = result.all()
+    load_ms = (perf_counter() - started) * 1000
+
+    started = perf_counter()
+    n = len(rows)
+    cols = dict(zip(keys, zip(*rows))) if rows else dict.fromkeys(keys, ())
+
+    def column(name):
+        return np.fromiter((v or 0 for v in cols[name]), dtype=np.float64, count=n)
+
+    sold = np.array([column(f"sold_{d}") for d, _ in REORDER_WINDOWS]).reshape(len(REORDER_WINDOWS), n)
+    days = np.array([d for d, _ in REORDER_WINDOWS], dtype=np.float64)[:, None]
+    weights = np.array([w for _, w in REORDER_WINDOWS], dtype=np.float64)
+    rate = weights @ (sold / days) / weights.sum()
+    available = column("available_qty")
+    on_order = column("on_order")
+    position = np.maximum(available, 0) + on_order
+    reorder_point = rate * (lead_time_days + safety_days)
+    target = reorder_point + rate * cover_days
+    due = (position < reorder_point) & (rate > 0)
+    with np.errstate(divide="ignore"):
+        cover = np.maximum(available, 0) / rate
+    suggested = np.ceil(target - position)
+    # most urgent first: fewest days of stock on hand, then fastest selling
+    order = np.lexsort((-rate, cover))
+    order = order[due[order]].tolist()
+    compute_ms = (perf_counter() - started) * 1000
+
+    groups: dict[str | None, dict] = {}
+    unassigned = []
+    for i in order:
+        r = rows[i]
+        line = {
+            "part_number": r.part_number,
+            "supplier_id": r.supplier_id,
+            "available_qty": int(available[i]),
+            "on_order_qty": int(on_order[i]),
+            "sold": {str(d): int(sold[k, i]) for k, (d, _) in enumerate(REORDER_WINDOWS)},
+            "daily_rate": round(float(rate[i]), 3),
+            "days_of_stock": round(float(cover[i]), 1),
+            "reorder_point": math.ceil(reorder_point[i]),
+            "suggested_qty": int(suggested[i]),
+        }
+        if r.supplier_id is None:
+            unassigned.append(line)
+            continue
+        g = groups.get(r.supplier_id)
+        if g is None:
+            g = groups[r.supplier_id] = {
+                "supplier_id": r.supplier_id,
+                "supplier_name": r.supplier_name or r.supplier_id,
+                "units": 0,
+                "purchase_cost_yen": 0.0,
+                "lines": [],
+                "po": {"supplier_id": r.supplier_id, "supplier_name": r.supplier_name or r.supplier_id, "lines": []},
+            }
+        g["lines"].append(line)
+        g["units"] += line["suggested_qty"]
+        g["purchase_cost_yen"] += line["suggested_qty"] * (r.purchase_cost_yen or 0.0)
+        g["po"]["lines"].append({
+            "part_number": r.part_number,
+            **{f: getattr(r, f) for f in _PO_FIELDS},
+            "qty_ordered": line["suggested_qty"],
+            "purchase_cost_yen": r.purchase_cost_yen or 0.0,
+            "weight_kg": r.weight_kg or 0.0,
+            "notes": "reorder draft",
+        })
+    for g in groups.values():
+        g["purchase_cost_yen"] = round(g["purchase_cost_yen"], 2)
+
+    return {
+        "generated_at": datetime.utcnow(),
+        "lead_time_days": lead_time_days,
+        "safety_days": safety_days,
+        "cover_days": cover_days,
+        "windows": [d for d, _ in REORDER_WINDOWS],
+        "parts_with_sales": n,
+        "parts_due": len(order),
+        # groups come out in the order of their most urgent part
+        "suppliers": list(groups.values()),
+        "unassigned": unassigned,
+        "load_ms": round(load_ms, 1),
+        "compute_ms": round(compute_ms, 1),
+    }
+
+
+class ReorderCache:
+    """Per-process reorder plans, reused until the data they were built from changes.
+
+    The data version is read in one round trip, so a change in any worker is seen on the
+    next request: every sale, receipt and stock edit appends to stock_movements, every new
+    PO line to intransit, every part write stamps Inventory.updated_at (costs, weights,
+    types) and settings writes bump Settings.version (index lookups each). Demand comes
+    from the sales_daily rollup, which with SALES_ROLLUP_INTERVAL_SECONDS > 0 is refreshed
+    after the sale's movement, so the line count rolled up for yesterday and today is part
+    of the version too. The date is in the key because the sales windows move at midnight.
+    POST /analytics/rebuild of older days clears this worker's cache.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._plans: dict[tuple, tuple] = {}  # params -> (data version, plan)
+
+    @staticmethod
+    def _version(db: Session, today) -> tuple:
+        sd = models.SalesDaily
+        latest = db.execute(select(
+            select(func.max(models.StockMovement.id)).scalar_subquery(),
+            select(func.max(models.InTransit.id)).scalar_subquery(),
+            select(func.max(models.Inventory.updated_at)).scalar_subquery(),
+            select(func.max(models.Settings.version)).scalar_subquery(),
+            select(func.sum(sd.lines)).where(sd.day >= today - timedelta(days=1)).scalar_subquery(),
+        )).one()
+        return (today, *latest)
+
+    def get(self, db: Session, **params) -> dict:
+        key = tuple(sorted(params.items()))
+        version = self._version(db, datetime.utcnow().date())
+        cached = self._plans.get(key)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return cached[1]
+
+        with self._lock:
+            self.misses += 1
+            plan = reorder_plan(db, **params)
+            self._plans.pop(key, None)
+            self._plans[key] = (version, plan)
+            while len(self._plans) > self.max_entries:
+                self._plans.pop(next(iter(self._plans)))
+            return plan
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "entries": len(self._plans),
+        }
+
+
+reorder_cache = ReorderCache()
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import NamedTuple
+
+from fastapi import Request, Response
+
+# entries older than this are reloaded; also bounds how long another worker can serve a row
+# this worker changed (invalidation is per process)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "5"))
+# 0 entries disables caching; ETag/304 handling still applies
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# tags shared by the endpoints and the writers that invalidate them
+INVENTORY = "inventory"              # every cached inventory response (recalc, import)
+INVENTORY_PAGES = "inventory:pages"  # filterless list pages (rows added)
+SUPPLIERS = "suppliers"
+
+
+def part_tag(part_number: str) -> str:
+    return f"part:{part_number}"
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+    headers: dict
+    tags: tuple
+    expires: float
+
+
+class ResponseCache:
+    """Per-process LRU of serialized JSON responses with a TTL, a byte budget and tag invalidation.
+
+    Writers call invalidate() with the tags they touched after committing. A load that
+    started before an invalidation is not stored (generation check), so a response read
+    just before a commit can't be cached after it.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes: int = RESPONSE_CACHE_MAX_BYTES, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self._by_tag: dict[str, set] = {}
+        self._bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, body: bytes, tags=(), headers=None, generation: int | None = None):
+        """Build the entry for `body`; it is stored unless an invalidation happened since `generation`."""
+        entry = CachedResponse(
+            etag='"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"',
+            body=body,
+            headers=headers or {},
+            tags=tuple(tags),
+            expires=monotonic() + self.ttl,
+        )
+        if not self.enabled or len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return entry
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            for tag in tags:
+                for key in list(self._by_tag.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._by_tag.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+        }
+
+
+def etag_response(request: Request, entry: CachedResponse) -> Response:
+    """200 with the cached body, or 304 when If-None-Match already names this ETag."""
+    headers = {**entry.headers, "ETag": entry.etag}
+    inm = request.headers.get("if-none-match")
+    if inm and (inm.strip() == "*" or entry.etag in (t.strip().removeprefix("W/") for t in inm.split(","))):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache()
@@ -1,7 +1,12 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
+from datetime import datetime
 
 # ----- Settings -----
+class PriceMultiplier(BaseModel):
+    wholesale: float = Field(2.5, gt=0)
+    retail: float = Field(3.5, gt=0)
+
 class SettingsOut(BaseModel):
     exchange_rate_yen_to_bdt: float
     shipping_cost_per_kg_bdt: float
@@ -9,7 +14,8 @@ class SettingsOut(BaseModel):
     part_subtypes: Dict[str, List[str]]
     car_makes: List[str]
     manufacturers: List[str]
-    last_recalc: Optional[str] = None
+    price_multipliers: Dict[str, PriceMultiplier] = {}
+    last_recalc: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -21,6 +27,22 @@ class SettingsUpdate(BaseModel):
     part_subtypes: Optional[Dict[str, List[str]]] = None
     car_makes: Optional[List[str]] = None
     manufacturers: Optional[List[str]] = None
+    price_multipliers: Optional[Dict[str, PriceMultiplier]] = None  # replaces the whole map
+
+class RecalcJobOut(BaseModel):
+    id: str
+    status: str
+    rows_total: int
+    rows_done: int
+    last_id: int
+    throughput_rows_per_s: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
 
 # ----- Suppliers -----
 class SupplierCreate(BaseModel):
@@ -69,6 +91,7 @@ class InventoryUpdate(BaseModel):
     retail_actual_bdt: Optional[float] = None
     available_qty: Optional[int] = None
     status: Optional[str] = None
+    version: Optional[int] = None  # the version the edit was based on; a stale one is rejected with 409
 
 class InventoryOut(InventoryBase):
     id: int
@@ -79,10 +102,27 @@ class InventoryOut(InventoryBase):
     landed_cost_bdt: float | None = None
     suggested_wholesale_bdt: float | None = None
     suggested_retail_bdt: float | None = None
+    version: int | None = None
 
     class Config:
         from_attributes = True
 
+class InventorySearchHit(InventoryOut):
+    score: float = 0.0
+
+class ImportRowError(BaseModel):
+    row: int
+    part_number: Optional[str] = None
+    errors: List[str]
+
+class ImportReport(BaseModel):
+    rows_total: int
+    rows_ok: int
+    rows_failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+    elapsed_ms: float
+
 # ----- Sales -----
 class SalesItemIn(BaseModel):
     part_number: str
@@ -96,7 +136,7 @@ class SalesCartIn(BaseModel):
 
 class SalesLogOut(BaseModel):
     id: int
-    date: str
+    date: datetime
     part_number: str
     channel: str
     qty: int
@@ -140,3 +180,149 @@ class InTransitOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class ReceiveLineIn(BaseModel):
+    row_id: int
+    qty: int
+
+class ReceiveBatchIn(BaseModel):
+    po_id: Optional[str] = None  # receive every open line of the PO in full
+    lines: List[ReceiveLineIn] = []
+
+class ReceiveLineResult(BaseModel):
+    row_id: int
+    part_number: Optional[str] = None
+    qty: int
+    qty_received: Optional[int] = None
+    qty_ordered: Optional[int] = None
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+class ReceiveBatchOut(BaseModel):
+    lines_total: int
+    lines_ok: int
+    lines_failed: int
+    parts_created: int
+    results: List[ReceiveLineResult]
+
+# ----- Analytics -----
+class SalesTotalsOut(BaseModel):
+    key: Optional[str]
+    qty: int
+    revenue_bdt: float
+    cost_bdt: float
+    margin_bdt: float
+
+class TopSellerOut(BaseModel):
+    part_number: str
+    part_type: Optional[str]
+    car_make: Optional[str]
+    qty: int
+    revenue_bdt: float
+    cost_bdt: float
+    margin_bdt: float
+
+class SlowMoverOut(BaseModel):
+    part_number: str
+    part_type: Optional[str]
+    car_make: Optional[str]
+    available_qty: int
+    landed_cost_bdt: Optional[float]
+    stock_value_bdt: float
+    qty_sold: int
+
+# ----- Pricing -----
+class WhatIfIn(BaseModel):
+    # anything left out keeps its current Settings value
+    exchange_rate_yen_to_bdt: Optional[float] = Field(None, ge=0)
+    shipping_cost_per_kg_bdt: Optional[float] = Field(None, ge=0)
+    price_multipliers: Optional[Dict[str, PriceMultiplier]] = None
+
+class PricingTotals(BaseModel):
+    landed_value_bdt: float
+    suggested_wholesale_value_bdt: float
+    suggested_retail_value_bdt: float
+    wholesale_margin_bdt: float
+    retail_margin_bdt: float
+
+class PartTypeWhatIf(BaseModel):
+    part_type: Optional[str]
+    current: PricingTotals
+    proposed: PricingTotals
+    delta: PricingTotals
+
+class WhatIfOut(BaseModel):
+    rows: int
+    units: int
+    current: PricingTotals
+    proposed: PricingTotals
+    delta: PricingTotals
+    by_part_type: List[PartTypeWhatIf]
+    load_ms: float
+    compute_ms: float
+
+# ----- Stock ledger -----
+class StockMovementOut(BaseModel):
+    id: int
+    at: datetime
+    part_number: str
+    delta: int
+    source: str
+    ref: Optional[str] = None
+    note: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class StockLevel(BaseModel):
+    part_number: str
+    qty: int
+
+class StockAsOfOut(BaseModel):
+    at: datetime
+    snapshot_at: Optional[datetime] = None
+    movements_replayed: int
+    parts: List[StockLevel]
+
+class StockSnapshotOut(BaseModel):
+    id: int
+    taken_at: datetime
+    created_at: Optional[datetime] = None
+    parts: int
+    units: int
+
+    class Config:
+        from_attributes = True
+
+# ----- Reordering -----
+class ReorderLine(BaseModel):
+    part_number: str
+    supplier_id: Optional[str] = None  # the supplier it was last ordered from
+    available_qty: int
+    on_order_qty: int  # open (Shipping) PO quantity not yet received
+    sold: Dict[str, int]  # units sold per window, keyed by its length in days
+    daily_rate: float
+    days_of_stock: float
+    reorder_point: int
+    suggested_qty: int
+
+class ReorderSupplier(BaseModel):
+    supplier_id: str
+    supplier_name: str
+    units: int
+    purchase_cost_yen: float
+    lines: List[ReorderLine]
+    po: POIn  # draft; POST /po accepts it unchanged
+
+class ReorderOut(BaseModel):
+    generated_at: datetime
+    lead_time_days: int
+    safety_days: int
+    cover_days: int
+    windows: List[int]
+    parts_with_sales: int
+    parts_due: int
+    suppliers: List[ReorderSupplier]
+    unassigned: List[ReorderLine]  # due, but never ordered so there is no supplier to suggest
+    load_ms: float
+    compute_ms: float
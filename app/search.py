@@ -0,0 +1,169 @@
+import difflib
+import re
+
+from sqlalchemy import column, delete, func, insert, or_, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from . import models
+
+# rows pulled from the indexes before ranking on SQLite
+SEARCH_CANDIDATES = 500
+# FTS5 trigram needs at least this many characters; shorter terms fall back to LIKE
+_MIN_TRIGRAM = 3
+
+# set by detect_search_indexes() once the SQLite FTS side table exists (migration 0002)
+_fts_enabled = False
+_inventory_fts = table("inventory_fts", column("rowid"), column("part_number"), column("applicable_models"))
+
+
+def detect_search_indexes(engine: Engine):
+    """Enable the FTS5 route on SQLite if the migration created the side table."""
+    global _fts_enabled
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        _fts_enabled = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'inventory_fts'")
+        ).first() is not None
+
+
+# ---------- applicable_models -> part lookup ----------
+def normalize_model(name: str) -> str:
+    return re.sub(r"\s+", " ", name).strip().lower()
+
+
+def tokenize_models(applicable_models: str | None) -> list[str]:
+    """'Corolla, Axio ,  Premio' -> ['corolla', 'axio', 'premio'] (deduplicated, order kept)."""
+    seen = {}
+    for part in (applicable_models or "").split(","):
+        m = normalize_model(part)
+        if m:
+            seen.setdefault(m, None)
+    return list(seen)
+
+
+def _write_model_rows(db: Session, rows):
+    params = [{"inventory_id": rid, "model": m} for rid, am in rows for m in tokenize_models(am)]
+    if params:
+        db.execute(insert(models.InventoryModel), params)
+
+
+def sync_part_models(db: Session, part_numbers):
+    """Refresh the lookup rows for the given parts after their applicable_models changed."""
+    rows = db.execute(
+        select(models.Inventory.id, models.Inventory.applicable_models)
+        .where(models.Inventory.part_number.in_(list(part_numbers)))
+    ).all()
+    if not rows:
+        return
+    db.execute(delete(models.InventoryModel).where(models.InventoryModel.inventory_id.in_([r[0] for r in rows])))
+    _write_model_rows(db, rows)
+
+
+def rebuild_model_index(db: Session, chunk_size: int = 5000):
+    db.execute(delete(models.InventoryModel))
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(models.Inventory.id, models.Inventory.applicable_models)
+            .where(models.Inventory.id > last_id, models.Inventory.applicable_models.isnot(None))
+            .order_by(models.Inventory.id.asc())
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        _write_model_rows(db, rows)
+        last_id = rows[-1][0]
+
+
+# ---------- Query helpers ----------
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def substring_clause(col, term: str):
+    """`col ILIKE '%term%'`, answered from the trigram index where one exists.
+
+    PostgreSQL's planner uses the pg_trgm GIN index for ILIKE directly; on SQLite the
+    match is routed through the FTS5 trigram side table.
+    """
+    if _fts_enabled and len(term) >= _MIN_TRIGRAM:
+        fts_col = _inventory_fts.c[col.key]
+        return models.Inventory.id.in_(select(_inventory_fts.c.rowid).where(fts_col.match(_fts_phrase(term))))
+    return col.ilike(f"%{term}%")
+
+
+def _model_ids(term: str):
+    return (
+        select(models.InventoryModel.inventory_id)
+        .where(models.InventoryModel.model == normalize_model(term))
+        .limit(SEARCH_CANDIDATES)
+    )
+
+
+def _score(term: str, part_number: str, applicable_models: str | None) -> float:
+    t, pn = term.lower(), (part_number or "").lower()
+    if pn == t:
+        return 1.0
+    tokens = tokenize_models(applicable_models)
+    best = 0.95 if pn.startswith(t) else 0.8 if t in pn else 0.0
+    if t in tokens:
+        best = max(best, 0.9)
+    elif any(tok.startswith(t) for tok in tokens):
+        best = max(best, 0.7)
+    elif t in (applicable_models or "").lower():
+        best = max(best, 0.5)
+    return best or difflib.SequenceMatcher(None, t, pn).ratio() * 0.5
+
+
+def search_parts(db: Session, q: str, limit: int = 20):
+    """Ranked (Inventory, score) pairs matching `q` against part_number and applicable_models."""
+    term = q.strip()
+    if not term:
+        return []
+    I = models.Inventory
+
+    if db.get_bind().dialect.name == "postgresql":
+        score = func.greatest(
+            func.similarity(I.part_number, term),
+            func.word_similarity(term, func.coalesce(I.applicable_models, "")),
+        )
+        stmt = (
+            select(I, score.label("score"))
+            .where(or_(
+                I.part_number.op("%")(term),  # trigram similarity: tolerates typos
+                I.part_number.ilike(f"%{term}%"),
+                I.applicable_models.ilike(f"%{term}%"),
+                I.id.in_(_model_ids(term)),
+            ))
+            .order_by(score.desc(), I.part_number.asc())
+            .limit(limit)
+        )
+        return [(row, round(float(s), 4)) for row, s in db.execute(stmt)]
+
+    if _fts_enabled and len(term) >= _MIN_TRIGRAM:
+        # gather ids from each index separately; an OR of IN-subqueries makes SQLite scan inventory
+        ids = set(db.scalars(_model_ids(term)))
+        for col in ("part_number", "applicable_models"):
+            ids.update(db.scalars(
+                select(_inventory_fts.c.rowid)
+                .where(_inventory_fts.c[col].match(_fts_phrase(term)))
+                .limit(SEARCH_CANDIDATES)
+            ))
+        candidates = db.scalars(select(I).where(I.id.in_(list(ids)[:SEARCH_CANDIDATES * 3]))).all() if ids else []
+    else:
+        candidates = db.scalars(
+            select(I)
+            .where(or_(
+                I.part_number.ilike(f"%{term}%"),
+                I.applicable_models.ilike(f"%{term}%"),
+                I.id.in_(_model_ids(term)),
+            ))
+            .limit(SEARCH_CANDIDATES)
+        ).all()
+    ranked = sorted(
+        ((row, round(_score(term, row.part_number, row.applicable_models), 4)) for row in candidates),
+        key=lambda p: (-p[1], p[0].part_number),
+    )
+    return ranked[:limit]
@@ -0,0 +1,74 @@
+import os
+import threading
+from time import monotonic
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+
+# max seconds a worker may serve a Settings snapshot before re-checking settings.version;
+# 0 disables the cache (every read loads the row)
+SETTINGS_CACHE_TTL = float(os.getenv("SETTINGS_CACHE_TTL_SECONDS", "5"))
+
+
+class SettingsCache:
+    """Per-process snapshot of the single Settings row.
+
+    Within `ttl` seconds of the last check the snapshot is returned without touching
+    the database. After that one indexed read of settings.version decides whether
+    the snapshot is still current, so a PUT /settings in another worker is seen
+    within `ttl` seconds. Writes in this worker call invalidate() for immediate effect.
+    """
+
+    def __init__(self, ttl: float = SETTINGS_CACHE_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def get(self, db: Session, fresh: bool = False):
+        """Return a read-only snapshot of Settings, or None if the row doesn't exist yet."""
+        snap = self._snapshot
+        if snap is not None and not fresh and monotonic() - self._checked_at < self.ttl:
+            self.hits += 1
+            return snap
+
+        with self._lock:
+            if snap is not None and self.ttl > 0:
+                self.revalidations += 1
+                version = db.scalar(select(models.Settings.version).where(models.Settings.id == snap.id))
+                if version == snap.version:
+                    self._checked_at = monotonic()
+                    self.hits += 1
+                    return snap
+
+            self.misses += 1
+            row = db.query(models.Settings).first()
+            if row is None:
+                self._snapshot = None
+                return None
+            snap = SimpleNamespace(**{c.name: getattr(row, c.name) for c in models.Settings.__table__.columns})
+            self._snapshot = snap
+            self._checked_at = monotonic()
+            return snap
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "ttl_seconds": self.ttl,
+        }
+
+
+settings_cache = SettingsCache()
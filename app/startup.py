@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+# app.main imports this module first, so the clock starts before the heavy imports
+_import_started = perf_counter()
+
+# connections opened per engine before the first request (capped at the pool size); 0 disables
+STARTUP_POOL_PREFILL = int(os.getenv("STARTUP_POOL_PREFILL", "2"))
+
+log = logging.getLogger(__name__)
+
+
+class StartupTimings:
+    """Import and warmup durations of this worker, served by GET /startup."""
+
+    def __init__(self):
+        self.import_ms: float | None = None
+        self.steps: dict[str, float] = {}
+        self.warmup_ms: float | None = None
+        self._warmup_started: float | None = None
+
+    def imported(self):
+        self.import_ms = round((perf_counter() - _import_started) * 1000, 1)
+
+    def begin(self):
+        self._warmup_started = perf_counter()
+
+    async def step(self, name: str, fn, *args):
+        """Run one warmup step (sync functions go to a thread) and record its duration."""
+        started = perf_counter()
+        if asyncio.iscoroutinefunction(fn):
+            await fn(*args)
+        else:
+            await asyncio.to_thread(fn, *args)
+        self.steps[name] = round((perf_counter() - started) * 1000, 1)
+
+    def done(self):
+        self.warmup_ms = round((perf_counter() - self._warmup_started) * 1000, 1)
+        log.info("startup: import %.0fms, warmup %.0fms %s", self.import_ms or 0, self.warmup_ms, self.steps)
+
+    def as_dict(self) -> dict:
+        return {"pid": os.getpid(), "import_ms": self.import_ms, "warmup_ms": self.warmup_ms, "steps": self.steps}
+
+
+startup_timings = StartupTimings()
+
+
+def _prefill_count(engine) -> int:
+    # only a QueuePool keeps connections around; NullPool/StaticPool have nothing to fill
+    size = getattr(engine.pool, "size", None)
+    return min(STARTUP_POOL_PREFILL, size()) if callable(size) else 0
+
+
+def prefill_pool(engine):
+    """Open connections in parallel and return them to the pool, so early requests don't pay for connects."""
+    n = _prefill_count(engine)
+    if n <= 0:
+        return
+    with ThreadPoolExecutor(n) as ex:
+        conns = list(ex.map(lambda _: engine.connect(), range(n)))
+    for conn in conns:
+        conn.close()
+
+
+async def prefill_async_pool(async_engine):
+    n = _prefill_count(async_engine.sync_engine)
+    if n <= 0:
+        return
+    conns = [async_engine.connect() for _ in range(n)]
+    await asyncio.gather(*(c.start() for c in conns))
+    await asyncio.gather(*(c.close() for c in conns))
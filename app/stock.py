@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+
+_inv = models.Inventory.__table__
+
+
+def _apply(db: Session, stmt, params: list[dict]) -> bool:
+    """Run a conditional UPDATE for every param set; True if each one matched exactly one row."""
+    if db.get_bind().dialect.supports_sane_multi_rowcount:
+        return db.execute(stmt, params).rowcount == len(params)
+    return all(db.execute(stmt, p).rowcount == 1 for p in params)
+
+
+def take_stock(db: Session, per_part: dict[str, dict], now: datetime | None = None):
+    """Sell from stock without row locks. Caller commits.
+
+    per_part maps part_number -> {"qty", "wholesale", "retail"}. Each part is one
+    `UPDATE ... SET available_qty = available_qty - :qty WHERE available_qty >= :qty`,
+    so concurrent carts for the same part never wait on each other and can't oversell.
+    If any part is missing or short, the transaction is rolled back and 404/400 raised
+    (409 if the shortfall was gone by the time it was looked up).
+    """
+    c = _inv.c
+    left = c.available_qty - bindparam("qty")
+    stmt = (
+        update(_inv)
+        .where(c.part_number == bindparam("pn"), c.available_qty >= bindparam("qty"))
+        .values(
+            available_qty=left,
+            sold_wholesale_qty=func.coalesce(c.sold_wholesale_qty, 0) + bindparam("wholesale"),
+            sold_retail_qty=func.coalesce(c.sold_retail_qty, 0) + bindparam("retail"),
+            status=case((left == 0, "Out of stock"), else_=c.status),
+            version=c.version + 1,
+            updated_at=now or datetime.utcnow(),
+        )
+    )
+    # part_number order, so two carts touching the same parts take row write locks in the same order
+    params = [{"pn": pn, **agg} for pn, agg in sorted(per_part.items())]
+    if _apply(db, stmt, params):
+        return
+
+    db.rollback()
+    stock = dict(db.execute(select(c.part_number, c.available_qty).where(c.part_number.in_(list(per_part)))).all())
+    for pn, agg in per_part.items():
+        if pn not in stock:
+            raise HTTPException(404, f"Part {pn} not found")
+        if (stock[pn] or 0) < agg["qty"]:
+            raise HTTPException(400, f"Insufficient stock for {pn}")
+    raise HTTPException(409, "Stock changed during the sale, please retry")
+
+
+def add_stock(db: Session, per_part: dict[str, int], now: datetime | None = None):
+    """Add received quantities to existing parts, one unconditional increment each. Caller commits."""
+    c = _inv.c
+    left = func.coalesce(c.available_qty, 0) + bindparam("qty")
+    stmt = (
+        update(_inv)
+        .where(c.part_number == bindparam("pn"))
+        .values(
+            available_qty=left,
+            status=case((left > 0, "In stock"), else_=c.status),
+            version=c.version + 1,
+            updated_at=now or datetime.utcnow(),
+        )
+    )
+    db.execute(stmt, [{"pn": pn, "qty": qty} for pn, qty in sorted(per_part.items())])
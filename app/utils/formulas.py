@@ -1,9 +1,24 @@
-def compute_costs(purchase_cost_yen: float, weight_kg: float, exchange_rate: float, shipping_per_kg: float):
+DEFAULT_WHOLESALE_MULTIPLIER = 2.5
+DEFAULT_RETAIL_MULTIPLIER = 3.5
+
+
+def multipliers_for(price_multipliers: dict | None, part_type: str | None) -> tuple[float, float]:
+    """(wholesale, retail) markup on landed cost for a part_type, from Settings.price_multipliers."""
+    m = (price_multipliers or {}).get(part_type or "") or {}
+    return (
+        m.get("wholesale", DEFAULT_WHOLESALE_MULTIPLIER),
+        m.get("retail", DEFAULT_RETAIL_MULTIPLIER),
+    )
+
+
+def compute_costs(purchase_cost_yen: float, weight_kg: float, exchange_rate: float, shipping_per_kg: float,
+                  wholesale_multiplier: float = DEFAULT_WHOLESALE_MULTIPLIER,
+                  retail_multiplier: float = DEFAULT_RETAIL_MULTIPLIER):
     purchase_cost_bdt = (purchase_cost_yen or 0.0) * (exchange_rate or 0.0)
     shipping_cost_bdt = (weight_kg or 0.0) * (shipping_per_kg or 0.0)
     landed = purchase_cost_bdt + shipping_cost_bdt
-    suggested_ws = landed * 2.5
-    suggested_rt = landed * 3.5
+    suggested_ws = landed * wholesale_multiplier
+    suggested_rt = landed * retail_multiplier
     return {
         "purchase_cost_bdt": round(purchase_cost_bdt, 2),
         "shipping_cost_bdt": round(shipping_cost_bdt, 2),
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Benchmarks build their own schema and data and never touch the app's default ./local.db.
+# BENCH_DATABASE_URL may point at a throwaway database (its schema is dropped and rebuilt);
+# otherwise a temporary SQLite file is used. The app under test shares the same database.
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
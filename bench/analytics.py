@@ -0,0 +1,64 @@
+"""Dashboard queries over raw sales_log vs the sales_daily / sales_monthly rollups.
+
+    python -m bench.analytics [sales_rows]
+
+Also times the migration-style full rebuild of the rollups from the log.
+"""
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app import models
+from app.analytics import rebuild_rollups, revenue_report, top_sellers
+from bench.common import make_session, seed_inventory, seed_sales, timed
+
+PARTS = 20_000
+
+
+def raw_top_sellers(db, date_from, date_to, limit=20):
+    sl = models.SalesLog
+    return db.execute(
+        select(sl.part_number, func.sum(sl.qty).label("qty"), func.sum(sl.subtotal_bdt))
+        .where(sl.date >= date_from, sl.date < date_to)
+        .group_by(sl.part_number)
+        .order_by(func.sum(sl.qty).desc())
+        .limit(limit)
+    ).all()
+
+
+def raw_revenue_by_day(db, date_from, date_to):
+    sl = models.SalesLog
+    day = func.date(sl.date)
+    return db.execute(
+        select(day, func.sum(sl.subtotal_bdt)).where(sl.date >= date_from, sl.date < date_to).group_by(day)
+    ).all()
+
+
+def main(n):
+    db = make_session()
+    seed_inventory(db, PARTS)
+    seed_sales(db, n, PARTS, days=365)
+    today = datetime.utcnow().date()
+    first = today - timedelta(days=366)
+
+    _, secs = timed(rebuild_rollups, db, first, today)
+    db.commit()
+    daily_rows = db.scalar(select(func.count()).select_from(models.SalesDaily))
+    monthly_rows = db.scalar(select(func.count()).select_from(models.SalesMonthly))
+    print(f"sales_log={n}  rebuild -> {daily_rows} daily / {monthly_rows} monthly rollup rows in {secs * 1000:.0f}ms")
+
+    for days in (30, 365):
+        d_from = today - timedelta(days=days - 1)
+        lo, hi = datetime.combine(d_from, datetime.min.time()), datetime.combine(today + timedelta(days=1), datetime.min.time())
+        _, raw_top = timed(raw_top_sellers, db, lo, hi)
+        _, roll_top = timed(top_sellers, db, d_from, today)
+        _, raw_rev = timed(raw_revenue_by_day, db, lo, hi)
+        _, roll_rev = timed(revenue_report, db, d_from, today)
+        print(f"{days:>3}d  top sellers raw={raw_top * 1000:7.1f}ms rollup={roll_top * 1000:7.1f}ms   "
+              f"revenue/day raw={raw_rev * 1000:7.1f}ms rollup={roll_rev * 1000:7.1f}ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,111 @@
+"""Requests/sec on the read endpoints: the previous sync handlers vs the async ones.
+
+    python -m bench.async_reads [rows] [concurrency] [seconds]
+
+Both apps are driven in-process over ASGI by `concurrency` client tasks. The sync
+baseline reproduces the pre-async handlers, so FastAPI runs each request on its
+threadpool; the async app serves them on the event loop through the aiosqlite/asyncpg
+engine.
+"""
+import asyncio
+import random
+import sys
+from time import perf_counter
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from bench.common import migrate_db, seed_inventory
+
+migrate_db()
+
+from app import models, schemas  # noqa: E402
+from app.db import SessionLocal, async_engine, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.queries import inventory_filters  # noqa: E402
+
+sync_app = FastAPI()
+
+
+@sync_app.get("/inventory/{part_number}", response_model=schemas.InventoryOut)
+def get_part(part_number: str, db: Session = Depends(get_db)):
+    row = db.query(models.Inventory).filter_by(part_number=part_number).first()
+    if not row:
+        raise HTTPException(404, "Not found")
+    return row
+
+
+@sync_app.get("/inventory", response_model=list[schemas.InventoryOut])
+def search_inventory(car_make: str | None = None, page: int = 1, page_size: int = 50, db: Session = Depends(get_db)):
+    q = db.query(models.Inventory).filter(*inventory_filters(None, None, None, None, None, car_make, None))
+    return q.order_by(models.Inventory.part_number.asc()).offset((page - 1) * page_size).limit(page_size).all()
+
+
+@sync_app.get("/suppliers", response_model=list[schemas.SupplierOut])
+def list_suppliers(db: Session = Depends(get_db)):
+    return db.query(models.Supplier).order_by(models.Supplier.name.asc()).all()
+
+
+def requests_for(n, rnd):
+    while True:
+        yield f"/inventory/PN-{rnd.randrange(n):07d}"
+        yield f"/inventory?car_make=Toyota&page={rnd.randint(1, 20)}&page_size=20"
+        yield "/suppliers"
+
+
+async def load(target, n, concurrency, seconds):
+    rnd = random.Random(7)
+    paths = requests_for(n, rnd)
+    done = errors = 0
+    latencies = []
+    deadline = perf_counter() + seconds
+    # 5xx (e.g. QueuePool timeouts once the threadpool saturates) are counted, not raised
+    transport = httpx.ASGITransport(app=target, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal done, errors
+            while perf_counter() < deadline:
+                t = perf_counter()
+                r = await client.get(next(paths))
+                latencies.append(perf_counter() - t)
+                if r.status_code == 200:
+                    done += 1
+                else:
+                    errors += 1
+
+        started = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = perf_counter() - started
+    latencies.sort()
+    p50, p95 = latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.95)] * 1000
+    return done / elapsed, p50, p95, errors
+
+
+async def run(n, concurrency, seconds):
+    try:
+        for label, target in (("sync (threadpool)", sync_app), ("async", app)):
+            rps, p50, p95, errors = await load(target, n, concurrency, seconds)
+            print(f"{label:<18} {rps:8.0f} req/s  p50={p50:8.2f}ms  p95={p95:8.2f}ms  errors={errors}  "
+                  f"(concurrency={concurrency})")
+    finally:
+        # aiosqlite connections run on non-daemon threads; without this the process hangs at exit
+        await async_engine.dispose()
+
+
+def main(n, concurrency, seconds):
+    db = SessionLocal()
+    if not db.query(models.Inventory).count():
+        seed_inventory(db, n)
+        db.execute(insert(models.Supplier), [
+            {"supplier_id": f"SUP-{i:08d}", "name": f"Supplier {i}", "active": True} for i in range(40)
+        ])
+        db.commit()
+    db.close()
+    asyncio.run(run(n, concurrency, seconds))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [50_000, 64, 10][len(args):]))
@@ -0,0 +1,165 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.migrate import downgrade, upgrade
+from app.search import detect_search_indexes
+
+PART_TYPES = ("Engine", "Brake", "Suspension", "Body", "Electrical", "Cooling")
+CAR_MAKES = ("Toyota", "Honda", "Nissan", "Mazda", "Mitsubishi", "Suzuki")
+MANUFACTURERS = ("Denso", "Aisin", "NGK", "KYB", "Tokico", "Genuine")
+MODELS = ("Corolla", "Axio", "Premio", "Allion", "Civic", "Fit", "Sunny", "X-Trail", "Demio", "Lancer", "Swift", "Vitz")
+
+def make_session(url: str | None = None):
+    """Fresh schema and a session on a new engine of the bench's own. Benches that drive the
+    app should seed through app.db.SessionLocal instead, so they measure the app's engine."""
+    url = url or os.environ["DATABASE_URL"]
+    eng = create_engine(url)
+    migrate_db(url, fresh=True)
+    detect_search_indexes(eng)
+    return sessionmaker(autocommit=False, autoflush=False, bind=eng)()
+
+
+def migrate_db(url: str | None = None, fresh: bool = False):
+    url = url or os.environ["DATABASE_URL"]
+    if fresh:
+        downgrade(url, configure_logging=False)
+    upgrade(url, configure_logging=False)
+
+
+def seed_settings(db, rate: float = 0.79, ship: float = 950.0):
+    s = models.Settings(
+        exchange_rate_yen_to_bdt=rate,
+        shipping_cost_per_kg_bdt=ship,
+        part_types=[], part_subtypes={}, car_makes=[], manufacturers=[],
+    )
+    db.add(s)
+    db.commit()
+    return s
+
+
+def seed_inventory(db, n: int, chunk: int = 5000, seed: int = 42):
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    for start in range(0, n, chunk):
+        db.execute(insert(models.Inventory), [
+            {
+                "part_number": f"PN-{i:07d}",
+                "part_type": rnd.choice(PART_TYPES),
+                "car_make": rnd.choice(CAR_MAKES),
+                "manufacturer": rnd.choice(MANUFACTURERS),
+                "applicable_models": ", ".join(
+                    f"{m} {m[:2].upper()}{rnd.randint(10, 99)}" for m in rnd.sample(MODELS, rnd.randint(1, 3))
+                ),
+                "purchase_cost_yen": round(rnd.uniform(100, 90000), 2),
+                "weight_kg": round(rnd.uniform(0.05, 40), 3),
+                "available_qty": rnd.randint(0, 50),
+                "sold_wholesale_qty": 0,
+                "sold_retail_qty": 0,
+                "status": "In stock",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(start, min(start + chunk, n))
+        ])
+    db.commit()
+
+
+def seed_suppliers(db, n: int):
+    db.execute(insert(models.Supplier), [
+        {"supplier_id": f"SUP-{i:08d}", "name": f"Supplier {i}", "contact": None, "notes": None, "active": True}
+        for i in range(n)
+    ])
+    db.commit()
+
+
+def seed_intransit(db, n: int, parts: int, chunk: int = 5000, seed: int = 43, suppliers: int = 40):
+    """n PO lines over existing PN-xxxxxxx parts and SUP-xxxxxxxx suppliers, ~80% still Shipping."""
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    for start in range(0, n, chunk):
+        db.execute(insert(models.InTransit), [
+            {
+                "po_id": f"PO-BENCH-{i // 50:06d}",
+                "order_date": now,
+                "supplier_id": f"SUP-{i % suppliers:08d}",
+                "supplier_name": f"Supplier {i % suppliers}",
+                "part_number": f"PN-{rnd.randrange(parts):07d}",
+                "qty_ordered": 20,
+                "purchase_cost_yen": 1000.0,
+                "weight_kg": 1.0,
+                "landed_cost_bdt": 1500.0,
+                "status": "Shipping" if rnd.random() < 0.8 else "Received",
+                "qty_received": 0,
+            }
+            for i in range(start, min(start + chunk, n))
+        ])
+    db.commit()
+
+
+def seed_sales(db, n: int, parts: int, days: int = 365, chunk: int = 5000, seed: int = 44):
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    for start in range(0, n, chunk):
+        rows = []
+        for _ in range(start, min(start + chunk, n)):
+            qty = rnd.randint(1, 4)
+            price = round(rnd.uniform(500, 20000), 2)
+            rows.append({
+                "date": now - timedelta(seconds=rnd.randrange(days * 86400)),
+                "part_number": f"PN-{rnd.randrange(parts):07d}",
+                "channel": rnd.choice(("Retail", "Wholesale")),
+                "qty": qty,
+                "price_each_bdt": price,
+                "subtotal_bdt": qty * price,
+                "notes": "",
+            })
+        db.execute(insert(models.SalesLog), rows)
+    db.commit()
+
+
+def seed_catalogue(db, parts: int, intransit_ratio: float = 0.2, sales_ratio: float = 1.0) -> dict:
+    """Settings plus a catalogue of `parts` parts with proportional suppliers, PO lines and a year of sales."""
+    sizes = {
+        "inventory": parts,
+        "suppliers": max(10, parts // 1000),
+        "intransit": int(parts * intransit_ratio),
+        "sales_log": int(parts * sales_ratio),
+    }
+    seed_settings(db)
+    seed_suppliers(db, sizes["suppliers"])
+    seed_inventory(db, parts)
+    seed_intransit(db, sizes["intransit"], parts, suppliers=sizes["suppliers"])
+    seed_sales(db, sizes["sales_log"], parts)
+    return sizes
+
+
+def timed(fn, *args, **kwargs):
+    from time import perf_counter
+    t = perf_counter()
+    out = fn(*args, **kwargs)
+    return out, perf_counter() - t
+
+
+class QueryCounter:
+    """Counts statements executed on an engine while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
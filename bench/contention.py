@@ -0,0 +1,174 @@
+"""Sales from many counters on the same few parts while someone does a stocktake.
+
+    python -m bench.contention [threads] [carts_per_thread]
+
+Runs the workload with the old lock-then-write stock path and stocktake edits that
+don't send a version, then with app.stock's conditional decrements and versioned
+edits; once with too little stock for the demand and once with plenty. Afterwards
+it checks every hot part against sales_log: stock must never go negative (no oversells) and must equal initial stock minus what was logged
+as sold (no lost updates). The stocktake writes back exactly what it read, so any
+difference is a sale it overwrote.
+
+Against SQLite, writers are serialized by the database file lock whichever path is
+used; point BENCH_DATABASE_URL at a scratch PostgreSQL database to see row-lock waits.
+"""
+import random
+import sys
+import threading
+from time import perf_counter, sleep
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import OperationalError
+
+from bench.common import migrate_db, seed_inventory
+
+migrate_db(fresh=True)
+
+import app.main as app_main  # noqa: E402
+from app import models, schemas  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.stock import take_stock  # noqa: E402
+
+HOT = [f"PN-{i:07d}" for i in range(4)]
+
+
+def legacy_take_stock(db, per_part, now=None):
+    """The pre-stock-module path: lock the cart's rows, check, then write computed values."""
+    inv = {
+        r.part_number: r
+        for r in db.execute(
+            select(models.Inventory.id, models.Inventory.part_number, models.Inventory.available_qty,
+                   models.Inventory.sold_wholesale_qty, models.Inventory.sold_retail_qty, models.Inventory.status)
+            .where(models.Inventory.part_number.in_(per_part))
+            .order_by(models.Inventory.part_number.asc())
+            .with_for_update()
+        )
+    }
+    for pn, agg in per_part.items():
+        if pn not in inv:
+            raise HTTPException(404, f"Part {pn} not found")
+        if (inv[pn].available_qty or 0) < agg["qty"]:
+            raise HTTPException(400, f"Insufficient stock for {pn}")
+    table = models.Inventory.__table__
+    db.execute(update(table).where(table.c.id == bindparam("_id")), [
+        {
+            "_id": inv[pn].id,
+            "available_qty": inv[pn].available_qty - agg["qty"],
+            "sold_wholesale_qty": (inv[pn].sold_wholesale_qty or 0) + agg["wholesale"],
+            "sold_retail_qty": (inv[pn].sold_retail_qty or 0) + agg["retail"],
+            "status": "Out of stock" if inv[pn].available_qty == agg["qty"] else inv[pn].status,
+            "updated_at": now,
+        }
+        for pn, agg in per_part.items()
+    ])
+
+
+def reset(initial):
+    db = SessionLocal()
+    db.query(models.SalesLog).delete()
+    db.query(models.SalesDaily).delete()
+    db.query(models.SalesDailySegment).delete()
+    db.query(models.SalesMonthly).delete()
+    db.query(models.Inventory).filter(models.Inventory.part_number.in_(HOT)).update(
+        {"available_qty": initial, "sold_wholesale_qty": 0, "sold_retail_qty": 0, "status": "In stock"},
+        synchronize_session=False,
+    )
+    db.commit()
+    db.close()
+
+
+def call(fn, *args):
+    db = SessionLocal()
+    try:
+        fn(*args, db)
+        return "ok"
+    except HTTPException as e:
+        db.rollback()
+        return e.status_code
+    except OperationalError:  # SQLite: database is locked
+        db.rollback()
+        return "locked"
+    finally:
+        db.close()
+
+
+def counter(seed, carts, tally):
+    rnd = random.Random(seed)
+    for _ in range(carts):
+        items = [
+            schemas.SalesItemIn(part_number=pn, channel=rnd.choice(("Retail", "Wholesale")),
+                                quantity=rnd.randint(1, 3), price_each_bdt=1000.0)
+            for pn in rnd.sample(HOT, rnd.randint(1, 2))
+        ]
+        out = call(app_main.finalize_sale, schemas.SalesCartIn(items=items))
+        tally[out] = tally.get(out, 0) + 1
+
+
+def stocktake(versioned, stop, tally):
+    rnd = random.Random(99)
+    while not stop.is_set():
+        pn = rnd.choice(HOT)
+        db = SessionLocal()
+        qty, version = db.execute(
+            select(models.Inventory.available_qty, models.Inventory.version).where(models.Inventory.part_number == pn)
+        ).one()
+        db.close()
+        sleep(0.002)  # the clerk looks at the shelf
+        payload = schemas.InventoryUpdate(available_qty=qty, version=version if versioned else None)
+        out = call(app_main.update_part, pn, payload)
+        tally[out] = tally.get(out, 0) + 1
+
+
+def run(label, take, versioned, threads, carts, initial):
+    reset(initial)
+    app_main.take_stock = take
+    tallies = [{} for _ in range(threads)]
+    edits: dict = {}
+    stop = threading.Event()
+    clerk = threading.Thread(target=stocktake, args=(versioned, stop, edits))
+    workers = [threading.Thread(target=counter, args=(i, carts, tallies[i])) for i in range(threads)]
+    t = perf_counter()
+    clerk.start()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = perf_counter() - t
+    stop.set()
+    clerk.join()
+
+    totals: dict = {}
+    for tally in tallies:
+        for k, v in tally.items():
+            totals[k] = totals.get(k, 0) + v
+    db = SessionLocal()
+    sold = dict(db.execute(
+        select(models.SalesLog.part_number, func.sum(models.SalesLog.qty)).group_by(models.SalesLog.part_number)
+    ).all())
+    stock = dict(db.execute(
+        select(models.Inventory.part_number, models.Inventory.available_qty).where(models.Inventory.part_number.in_(HOT))
+    ).all())
+    db.close()
+    oversold = sum(1 for pn in HOT if stock[pn] < 0 or sold.get(pn, 0) > initial)
+    lost = sum(abs(initial - sold.get(pn, 0) - stock[pn]) for pn in HOT)
+    print(f"{label:<12} stock={initial:<6} sales ok={totals.get('ok', 0):5} ({totals.get('ok', 0) / elapsed:6.0f}/s)  "
+          f"out of stock={totals.get(400, 0):4}  conflicts={totals.get(409, 0):3}  locked={totals.get('locked', 0):3}  "
+          f"stocktake ok={edits.get('ok', 0):4} rejected={edits.get(409, 0):4}  "
+          f"oversold parts={oversold}  units lost/gained={lost}")
+
+
+def main(threads, carts):
+    db = SessionLocal()
+    seed_inventory(db, 1000)
+    db.close()
+    # tight: demand is ~3x the stock, so the interesting part is who gets the last units;
+    # ample: nothing runs out, so sales/s is comparable between the two paths
+    for initial in (400, 100_000):
+        run("row locks", legacy_take_stock, False, threads, carts, initial)
+        run("conditional", take_stock, True, threads, carts, initial)
+    app_main.take_stock = take_stock
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16, int(sys.argv[2]) if len(sys.argv) > 2 else 100)
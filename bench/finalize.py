@@ -0,0 +1,77 @@
+"""Legacy per-line finalize_sale vs the batched single-lock implementation.
+
+    python -m bench.finalize [repeats]
+"""
+import random
+import sys
+from datetime import datetime
+from time import perf_counter
+
+from app import models, schemas
+from app.main import finalize_sale
+from bench.common import QueryCounter, make_session, seed_inventory, seed_settings
+
+CATALOGUE = 5000
+
+
+def legacy_finalize(payload, db):
+    logs = []
+    for item in payload.items:
+        inv = db.query(models.Inventory).filter_by(part_number=item.part_number).with_for_update().first()
+        if not inv or item.quantity <= 0 or item.price_each_bdt <= 0 or inv.available_qty < item.quantity:
+            raise ValueError(item.part_number)
+    for item in payload.items:
+        inv = db.query(models.Inventory).filter_by(part_number=item.part_number).with_for_update().first()
+        inv.available_qty -= item.quantity
+        if item.channel == "Wholesale":
+            inv.sold_wholesale_qty = (inv.sold_wholesale_qty or 0) + item.quantity
+        else:
+            inv.sold_retail_qty = (inv.sold_retail_qty or 0) + item.quantity
+        if inv.available_qty == 0:
+            inv.status = "Out of stock"
+        inv.updated_at = datetime.utcnow()
+        log = models.SalesLog(date=datetime.utcnow(), part_number=item.part_number, channel=item.channel,
+                              qty=item.quantity, price_each_bdt=item.price_each_bdt,
+                              subtotal_bdt=item.quantity * item.price_each_bdt, notes=payload.note or "")
+        db.add(log)
+        logs.append(log)
+    db.commit()
+    for log in logs:
+        db.refresh(log)
+    return logs
+
+
+def cart(rnd, lines):
+    return schemas.SalesCartIn(items=[
+        schemas.SalesItemIn(part_number=f"PN-{rnd.randrange(CATALOGUE):07d}",
+                            channel=rnd.choice(("Retail", "Wholesale")), quantity=1, price_each_bdt=100.0)
+        for _ in range(lines)
+    ])
+
+
+def measure(fn, db, carts):
+    with QueryCounter(db.get_bind()) as qc:
+        t = perf_counter()
+        for c in carts:
+            fn(c, db)
+        elapsed = perf_counter() - t
+    return elapsed / len(carts) * 1000, qc.count / len(carts)
+
+
+def main(repeats):
+    db = make_session()
+    seed_settings(db)
+    seed_inventory(db, CATALOGUE)
+    db.execute(models.Inventory.__table__.update().values(available_qty=1_000_000))
+    db.commit()
+    rnd = random.Random(7)
+    for lines in (1, 10, 100):
+        carts = [cart(rnd, lines) for _ in range(repeats)]
+        old_ms, old_q = measure(legacy_finalize, db, carts)
+        new_ms, new_q = measure(finalize_sale, db, carts)
+        print(f"lines={lines:>4}  legacy={old_ms:8.2f}ms/{old_q:6.1f}q  batched={new_ms:8.2f}ms/{new_q:5.1f}q  "
+              f"speedup={old_ms / new_ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,82 @@
+"""Retried sales with Idempotency-Key: correctness under duplicate sends, and what a retry costs.
+
+    python -m bench.idempotency [carts] [copies]
+
+Every cart is sent `copies` times at once from different threads with the same key,
+as a POS that times out and retries would. Afterwards each part must have been sold
+exactly once per cart. Then the same carts are sent once more (plain retries after the
+fact) and their latency is compared with the original finalize calls.
+"""
+import random
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+
+from bench.common import QueryCounter, migrate_db, seed_inventory
+
+migrate_db(fresh=True)
+
+from app import models  # noqa: E402
+from app.db import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+CATALOGUE = 2000
+
+
+def cart(rnd):
+    return {"items": [
+        {"part_number": f"PN-{rnd.randrange(CATALOGUE):07d}", "channel": "Retail", "quantity": rnd.randint(1, 3),
+         "price_each_bdt": 100.0}
+        for _ in range(rnd.randint(1, 6))
+    ]}
+
+
+def sold(db):
+    return db.scalar(select(func.coalesce(func.sum(models.Inventory.sold_retail_qty), 0)))
+
+
+def main(carts, copies):
+    db = SessionLocal()
+    seed_inventory(db, CATALOGUE)
+    db.execute(update(models.Inventory).values(available_qty=1_000_000, sold_retail_qty=0))
+    db.commit()
+
+    rnd = random.Random(3)
+    batch = [(str(uuid.uuid4()), cart(rnd)) for _ in range(carts)]
+    expected = sum(i["quantity"] for _, c in batch for i in c["items"])
+
+    with TestClient(app) as client:
+        def send(key, body):
+            t = perf_counter()
+            r = client.post("/sales/finalize", json=body, headers={"Idempotency-Key": key})
+            return r.status_code, r.headers.get("Idempotent-Replayed") == "true", perf_counter() - t
+
+        with ThreadPoolExecutor(copies) as ex:
+            burst = []
+            for key, body in batch:
+                burst.extend(ex.map(lambda _: send(key, body), range(copies)))
+        statuses = {}
+        for status, replayed, _ in burst:
+            k = f"{status}{' replayed' if replayed else ''}"
+            statuses[k] = statuses.get(k, 0) + 1
+        fresh = [secs for status, replayed, secs in burst if status == 200 and not replayed]
+
+        with QueryCounter(engine) as qc:
+            retries = [send(key, body) for key, body in batch]
+        assert all(status == 200 and replayed for status, replayed, _ in retries)
+
+    got = sold(db)
+    db.close()
+    print(f"carts={carts} x {copies} concurrent copies: responses {statuses}")
+    print(f"units sold {got}, expected {expected} -> {'OK' if got == expected else 'DOUBLE-SOLD' if got > expected else 'LOST'}")
+    avg = lambda xs: sum(xs) / len(xs) * 1000
+    print(f"first finalize avg {avg(fresh):6.2f}ms   replayed retry avg {avg([r[2] for r in retries]):6.2f}ms "
+          f"({qc.count / carts:.1f} statements each)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 3)
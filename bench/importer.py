@@ -0,0 +1,49 @@
+"""Bulk import throughput (rows/s) for CSV and JSONL, fresh inserts and re-import upserts.
+
+    python -m bench.importer [rows]
+"""
+import io
+import json
+import random
+import sys
+
+from app.importer import import_inventory
+from bench.common import make_session, seed_settings, timed
+
+
+def make_rows(n, seed=3):
+    rnd = random.Random(seed)
+    for i in range(n):
+        yield {
+            "part_number": f"IMP-{i:07d}",
+            "part_type": rnd.choice(("Engine", "Brake", "Suspension", "Body")),
+            "car_make": rnd.choice(("Toyota", "Honda", "Nissan", "Mazda")),
+            "purchase_cost_yen": round(rnd.uniform(100, 90000), 2),
+            "weight_kg": round(rnd.uniform(0.05, 40), 3),
+            "available_qty": rnd.randint(0, 50),
+        }
+
+
+def as_csv(n):
+    rows = list(make_rows(n))
+    lines = [",".join(rows[0])] + [",".join(str(v) for v in r.values()) for r in rows]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def as_jsonl(n):
+    return "".join(json.dumps(r) + "\n" for r in make_rows(n)).encode()
+
+
+def main(n):
+    for fmt, body in (("csv", as_csv(n)), ("jsonl", as_jsonl(n))):
+        db = make_session()
+        s = seed_settings(db)
+        for label in ("insert", "upsert"):
+            report, t = timed(import_inventory, db, io.BytesIO(body), fmt, s)
+            assert report["rows_failed"] == 0, report["errors"][:3]
+            print(f"{fmt:>5} {label}: rows={report['rows_ok']} {t:6.2f}s  {report['rows_ok'] / t:10.0f} rows/s")
+        db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,86 @@
+"""Stock-on-date from the ledger: full replay vs nearest snapshot + bounded range.
+
+    python -m bench.ledger [movements]
+
+Seeds a year of movements over a 20k-part catalogue, takes a snapshot per day, then
+rebuilds the whole catalogue's stock at random points in time both ways and checks
+they agree. Also times one part's history page.
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app import models
+from app.ledger import part_history, stock_on, take_snapshot
+from bench.common import make_session, timed
+
+PARTS = 20_000
+DAYS = 365
+
+
+def full_replay(db, at):
+    mv = models.StockMovement
+    rows = db.execute(
+        select(mv.part_number, func.sum(mv.delta))
+        .where(mv.at <= at)
+        .group_by(mv.part_number)
+        .having(func.sum(mv.delta) != 0)
+        .order_by(mv.part_number)
+    ).all()
+    return [{"part_number": pn, "qty": qty} for pn, qty in rows]
+
+
+def seed_movements(db, n, start, chunk=20_000):
+    rnd = random.Random(11)
+    db.execute(insert(models.StockMovement), [
+        {"at": start, "part_number": f"PN-{i:07d}", "delta": 500, "source": "opening"} for i in range(PARTS)
+    ])
+    for lo in range(0, n, chunk):
+        rows = []
+        for _ in range(lo, min(lo + chunk, n)):
+            sale = rnd.random() < 0.8
+            rows.append({
+                "at": start + timedelta(seconds=rnd.randrange(1, DAYS * 86400)),
+                "part_number": f"PN-{rnd.randrange(PARTS):07d}",
+                "delta": -rnd.randint(1, 3) if sale else rnd.randint(5, 20),
+                "source": "sale" if sale else "receipt",
+            })
+        db.execute(insert(models.StockMovement), rows)
+    db.commit()
+
+
+def main(n):
+    db = make_session()
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(days=DAYS)
+    seed_movements(db, n, start)
+
+    snap_secs = []
+    for day in range(1, DAYS + 1):
+        _, secs = timed(take_snapshot, db, start + timedelta(days=day))
+        db.commit()
+        snap_secs.append(secs)
+    print(f"movements={n + PARTS}  daily snapshot: avg {sum(snap_secs) / len(snap_secs) * 1000:.0f}ms "
+          f"(max {max(snap_secs) * 1000:.0f}ms)")
+
+    rnd = random.Random(12)
+    replay_t = snap_t = 0.0
+    points = 10
+    for _ in range(points):
+        at = start + timedelta(seconds=rnd.randrange(DAYS * 86400))
+        want, r_secs = timed(full_replay, db, at)
+        got, s_secs = timed(stock_on, db, at)
+        assert got["parts"] == want, at
+        replay_t += r_secs
+        snap_t += s_secs
+    print(f"stock on a date, whole catalogue: full replay {replay_t / points * 1000:7.1f}ms   "
+          f"snapshot + range {snap_t / points * 1000:7.1f}ms   (last replayed {got['movements_replayed']} movements)")
+
+    _, secs = timed(part_history, db, "PN-0000042", 100)
+    print(f"history of one part (100 newest): {secs * 1000:.2f}ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
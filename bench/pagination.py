@@ -0,0 +1,61 @@
+"""GET /inventory latency at increasing page depth: OFFSET paging vs keyset cursors.
+
+    python -m bench.pagination [rows]
+
+The response cache is turned off: every repeat after the first would otherwise be a hit
+and both modes would measure the cache instead of the query.
+"""
+import os
+import statistics
+import sys
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+
+from bench.common import migrate_db, seed_inventory
+
+migrate_db()
+os.environ["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+
+from app import models  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.queries import encode_cursor  # noqa: E402
+
+PAGE_SIZE = 50
+REPEATS = 20
+
+
+def median_ms(client, params):
+    lat = []
+    for _ in range(REPEATS):
+        t = perf_counter()
+        r = client.get("/inventory", params=params)
+        lat.append((perf_counter() - t) * 1000)
+        assert r.status_code == 200, r.text
+    return statistics.median(lat)
+
+
+def main(n):
+    db = SessionLocal()
+    if not db.query(models.Inventory).count():
+        seed_inventory(db, n)
+    with TestClient(app) as client:
+        last_page = n // PAGE_SIZE
+        for page in sorted({p for p in (1, 10, 100, 1000) if p < last_page} | {last_page}):
+            offset_ms = median_ms(client, {"page": page, "page_size": PAGE_SIZE})
+            cursor = ""
+            if page > 1:
+                prev = (
+                    db.query(models.Inventory.part_number, models.Inventory.id)
+                    .order_by(models.Inventory.part_number, models.Inventory.id)
+                    .offset((page - 1) * PAGE_SIZE - 1).first()
+                )
+                cursor = encode_cursor(*prev)
+            keyset_ms = median_ms(client, {"cursor": cursor, "page_size": PAGE_SIZE})
+            print(f"page={page:>6}  offset={offset_ms:7.2f}ms  keyset={keyset_ms:7.2f}ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
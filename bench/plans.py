@@ -0,0 +1,136 @@
+"""Query-plan regression check for the hot endpoints.
+
+Drives the real app through TestClient, captures every statement it sends, and runs
+EXPLAIN on each one. Exits 1 if any of them reads a large table with a sequential
+scan. Point BENCH_DATABASE_URL at a throwaway PostgreSQL database to check the
+production planner; the default is a temporary SQLite file.
+
+    python -m bench.plans [rows]
+"""
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from bench.common import make_session, seed_intransit, seed_inventory, seed_sales, seed_settings
+
+BIG_TABLES = {"inventory", "sales_log", "intransit", "inventory_models"}
+# full reads by design (exports of whole tables, catalogue-wide recalculation) are not listed here
+SCENARIOS = [
+    ("GET", "/inventory", {}),
+    ("GET", "/inventory", {"page": 40}),
+    ("GET", "/inventory", {"status": "Out of stock"}),
+    ("GET", "/inventory", {"part_type": "Brake"}),
+    ("GET", "/inventory", {"part_type": "Brake", "part_subtype": "Pads"}),
+    ("GET", "/inventory", {"car_make": "Honda"}),
+    ("GET", "/inventory", {"car_make": "Honda", "part_type": "Engine"}),
+    ("GET", "/inventory", {"manufacturer": "Denso"}),
+    ("GET", "/inventory", {"part_number": "00123"}),
+    ("GET", "/inventory", {"applicable_models": "CO42"}),
+    ("GET", "/inventory", {"cursor": ""}),
+    ("GET", "/inventory/PN-0000042", {}),
+    ("GET", "/inventory/search", {"q": "PN-00004"}),
+    ("POST", "/sales/finalize", {"json": {"items": [
+        {"part_number": "PN-0000007", "channel": "Retail", "quantity": 1, "price_each_bdt": 100},
+        {"part_number": "PN-0000003", "channel": "Wholesale", "quantity": 1, "price_each_bdt": 90},
+    ]}}),
+    ("POST", "/intransit/17/receive", {"params": {"qty_received": 1}}),
+    ("GET", "/export/sales", {"date_from": (datetime.utcnow() - timedelta(days=2)).isoformat()}),
+    ("GET", "/export/intransit", {"po_id": "PO-BENCH-000003"}),
+]
+
+
+def _sqlite_scans(conn, statement, params):
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params).all()
+    return [d for *_, d in rows if (m := re.match(r"SCAN (\w+)$", d)) and m.group(1) in BIG_TABLES]
+
+
+def _pg_scans(conn, statement, params):
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, params).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    found, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in BIG_TABLES:
+            found.append(f"Seq Scan on {node['Relation Name']}")
+        stack.extend(node.get("Plans", []))
+    return found
+
+
+def _for_sync_driver(statement, params, dialect):
+    """asyncpg numbers its parameters ($1, $2...); rewrite them for the sync driver's EXPLAIN."""
+    if dialect != "postgresql":
+        return statement, params
+    order = [int(i) - 1 for i in re.findall(r"\$(\d+)", statement)]
+    return re.sub(r"\$\d+", "%s", statement.replace("%", "%%")), tuple(params[i] for i in order)
+
+
+def main(n):
+    db = make_session()
+    engine = db.get_bind()
+    seed_settings(db)
+    seed_inventory(db, n)
+    seed_intransit(db, n // 5, n)
+    seed_sales(db, n * 2, n)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    # imported after migrating so it detects the search indexes
+    from app.db import async_engine, engine as app_engine
+    from app.main import app as fastapi_app
+
+    # the routes run on the app's engines, not the bench's: listen on both of those
+    app_engines = {app_engine: False, async_engine.sync_engine: True}
+    captured = []
+
+    def capture(is_async):
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+                params = parameters[0] if executemany else parameters
+                if is_async:
+                    statement, params = _for_sync_driver(statement, params, engine.dialect.name)
+                captured.append((statement, params))
+        return listener
+
+    listeners = {e: capture(is_async) for e, is_async in app_engines.items()}
+
+    explain = _pg_scans if engine.dialect.name == "postgresql" else _sqlite_scans
+    failures = 0
+    with TestClient(fastapi_app) as client:
+        for method, path, kwargs in SCENARIOS:
+            captured.clear()
+            for e, fn in listeners.items():
+                event.listen(e, "before_cursor_execute", fn)
+            try:
+                if method == "GET":
+                    r = client.get(path, params=kwargs)
+                else:
+                    r = client.request(method, path, **kwargs)
+            finally:
+                for e, fn in listeners.items():
+                    event.remove(e, "before_cursor_execute", fn)
+            label = f"{method} {path} {kwargs.get('params', kwargs) if method == 'GET' else ''}".strip()
+            if r.status_code >= 400:
+                print(f"ERROR {label}: HTTP {r.status_code} {r.text[:200]}")
+                failures += 1
+                continue
+            if not captured:
+                # every scenario reads or writes the database; nothing captured means the check isn't looking
+                print(f"ERROR {label}: no statements captured")
+                failures += 1
+                continue
+            with engine.connect() as conn:  # bench engine and app engine share the database
+                scans = [(stmt, s) for stmt, params in captured for s in explain(conn, stmt, params)]
+            status = "FAIL" if scans else "ok  "
+            print(f"{status} {label}  ({len(captured)} statements)")
+            for stmt, s in scans:
+                print(f"       {s}: {' '.join(stmt.split())[:160]}")
+            failures += bool(scans)
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000) else 0)
@@ -0,0 +1,78 @@
+"""POST /po: legacy per-line ORM objects + refresh loop vs the bulk insert path.
+
+    python -m bench.po [repeats]
+"""
+import random
+import sys
+from datetime import datetime
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+
+from app import models, schemas
+from app.main import app, create_po
+from app.utils.formulas import compute_costs
+from bench.common import QueryCounter, make_session, seed_settings
+
+
+def legacy_create_po(payload, db):
+    po_id = f"PO-LEGACY-{perf_counter()}"
+    s = db.query(models.Settings).first()
+    rows = []
+    for line in payload.lines:
+        costs = compute_costs(line.purchase_cost_yen, line.weight_kg, s.exchange_rate_yen_to_bdt, s.shipping_cost_per_kg_bdt)
+        it = models.InTransit(
+            po_id=po_id, order_date=datetime.utcnow(), supplier_id=payload.supplier_id,
+            supplier_name=payload.supplier_name, **line.model_dump(),
+            exchange_rate_used=s.exchange_rate_yen_to_bdt, shipping_per_kg_used=s.shipping_cost_per_kg_bdt,
+            landed_cost_bdt=costs["landed_cost_bdt"], status="Shipping", qty_received=0,
+        )
+        db.add(it)
+        rows.append(it)
+    db.commit()
+    for r in rows:
+        db.refresh(r)
+    return schemas.POCreated(po_id=po_id, lines=len(rows))
+
+
+def po(rnd, lines):
+    return schemas.POIn(supplier_id="SUP-00000001", supplier_name="Supplier 1", lines=[
+        schemas.POLineIn(part_number=f"PN-{rnd.randrange(100_000):07d}", part_type="Engine", car_make="Toyota",
+                         qty_ordered=rnd.randint(1, 50), purchase_cost_yen=round(rnd.uniform(500, 90000), 2),
+                         weight_kg=round(rnd.uniform(0.1, 40), 3))
+        for _ in range(lines)
+    ])
+
+
+def measure(fn, db, payloads):
+    with QueryCounter(db.get_bind()) as qc:
+        t = perf_counter()
+        for p in payloads:
+            fn(p, db)
+        elapsed = perf_counter() - t
+    return elapsed / len(payloads) * 1000, qc.count / len(payloads)
+
+
+def main(repeats):
+    db = make_session()
+    seed_settings(db)
+    rnd = random.Random(3)
+    for lines in (10, 100, 1000, 5000):
+        payloads = [po(rnd, lines) for _ in range(repeats)]
+        old_ms, old_q = measure(legacy_create_po, db, payloads)
+        new_ms, new_q = measure(create_po, db, payloads)
+        print(f"lines={lines:>5}  legacy={old_ms:8.1f}ms/{old_q:7.1f}q  bulk={new_ms:7.1f}ms/{new_q:4.1f}q  "
+              f"speedup={old_ms / new_ms:5.1f}x")
+    db.close()
+
+    # end to end, including request parsing and validation
+    body = po(rnd, 5000).model_dump()
+    with TestClient(app) as client:
+        t = perf_counter()
+        r = client.post("/po", json=body)
+        assert r.status_code == 200, r.text
+        print(f"POST /po with 5000 lines: {(perf_counter() - t) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
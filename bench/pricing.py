@@ -0,0 +1,70 @@
+"""Catalogue pricing: compute_costs row by row vs app.pricing's vectorized pass.
+
+    python -m bench.pricing [rows]
+
+Checks every output column against compute_costs to the cent (and counts how many
+values plain np.round would have got wrong), then times the what-if endpoint's
+load + two pricing passes on a seeded database of the same size.
+"""
+import random
+import sys
+
+import numpy as np
+
+from app.pricing import encode_types, price_arrays, type_multipliers, what_if
+from app.settings_cache import settings_cache
+from app.utils.formulas import compute_costs, multipliers_for
+from bench.common import PART_TYPES, make_session, seed_inventory, seed_settings, timed
+
+RATE, SHIP = 0.79, 950.0
+MULTIPLIERS = {"Engine": {"wholesale": 2.2, "retail": 3.1}, "Body": {"wholesale": 2.75, "retail": 3.85}}
+
+
+def python_pass(part_types, yen, kg):
+    return [compute_costs(y, k, RATE, SHIP, *multipliers_for(MULTIPLIERS, t)) for t, y, k in zip(part_types, yen, kg)]
+
+
+def numpy_pass(part_types, yen, kg):
+    return price_arrays(yen, kg, RATE, SHIP, *type_multipliers(MULTIPLIERS, *encode_types(part_types)))
+
+
+def main(n):
+    rnd = random.Random(7)
+    part_types = [rnd.choice(PART_TYPES + (None,)) for _ in range(n)]
+    yen = [round(rnd.uniform(100, 90000), 2) for _ in range(n)]
+    kg = [round(rnd.uniform(0.05, 40), 3) if rnd.random() > 0.01 else None for _ in range(n)]
+
+    expected, py_secs = timed(python_pass, part_types, yen, kg)
+    got, np_secs = timed(numpy_pass, part_types, yen, kg)
+    for col in got:
+        want = np.array([e[col] for e in expected])
+        mismatches = int((got[col] != want).sum())
+        naive = int((_unrounded(col, part_types, yen, kg) != want).sum())
+        print(f"  {col:<24} mismatches={mismatches}  (plain np.round would be off by a cent on {naive})")
+    print(f"rows={n}  compute_costs loop {py_secs * 1000:8.0f}ms   vectorized {np_secs * 1000:6.0f}ms   "
+          f"speedup={py_secs / np_secs:5.1f}x")
+
+    db = make_session()
+    seed_settings(db, RATE, SHIP).price_multipliers = MULTIPLIERS
+    db.commit()
+    seed_inventory(db, n)
+    s = settings_cache.get(db, fresh=True)
+    out, secs = timed(what_if, db, s, 0.85, None, {"Engine": {"wholesale": 2.4, "retail": 3.3}})
+    print(f"what-if over {out['rows']} rows: {secs * 1000:.0f}ms (load {out['load_ms']:.0f}ms, "
+          f"two pricing passes {out['compute_ms']:.0f}ms)  delta retail margin={out['delta']['retail_margin_bdt']}")
+    db.close()
+
+
+def _unrounded(col, part_types, yen, kg):
+    """The same column rounded with plain np.round, to show what round_cents corrects."""
+    y, k = np.nan_to_num(np.array(yen, dtype=np.float64)), np.nan_to_num(np.array(kg, dtype=np.float64))
+    ws, rt = type_multipliers(MULTIPLIERS, *encode_types(part_types))
+    purchase, shipping = y * RATE, k * SHIP
+    landed = purchase + shipping
+    raw = {"purchase_cost_bdt": purchase, "shipping_cost_bdt": shipping, "landed_cost_bdt": landed,
+           "suggested_wholesale_bdt": landed * ws, "suggested_retail_bdt": landed * rt}[col]
+    return np.round(raw, 2)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,46 @@
+"""Legacy per-row ORM recalc vs app.recalc chunked bulk UPDATE.
+
+    python -m bench.recalc [rows ...]
+"""
+import sys
+from datetime import datetime
+
+from app import models
+from app.recalc import recalc_inventory
+from app.utils.formulas import compute_costs
+from bench.common import make_session, seed_inventory, seed_settings, timed
+
+
+def legacy_recalc(db, s):
+    inv = db.query(models.Inventory).all()
+    for row in inv:
+        c = compute_costs(row.purchase_cost_yen or 0.0, row.weight_kg or 0.0,
+                          s.exchange_rate_yen_to_bdt or 0.0, s.shipping_cost_per_kg_bdt or 0.0)
+        row.exchange_rate_used = s.exchange_rate_yen_to_bdt
+        row.shipping_per_kg_used = s.shipping_cost_per_kg_bdt
+        for k, v in c.items():
+            setattr(row, k, v)
+        row.updated_at = datetime.utcnow()
+    db.commit()
+    return len(inv)
+
+
+def main(sizes):
+    for n in sizes:
+        db = make_session()
+        s = seed_settings(db)
+        seed_inventory(db, n)
+        _, t_legacy = timed(legacy_recalc, db, s)
+        db.expunge_all()
+        s.exchange_rate_yen_to_bdt = 0.81
+        db.add(s)
+        db.commit()
+        res, t_bulk = timed(recalc_inventory, db, s)
+        db.commit()
+        print(f"rows={n:>8}  legacy={t_legacy:7.2f}s  bulk={t_bulk:7.2f}s  "
+              f"speedup={t_legacy / t_bulk:5.1f}x  touched={res['recalculated']}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,75 @@
+"""Receiving a whole container: one call per line vs POST /intransit/receive.
+
+    python -m bench.receive [lines]
+
+Each PO has `lines` lines over a 5k-part catalogue; ~10% of them are parts not yet in
+inventory, so the batch path also exercises the bulk insert.
+"""
+import random
+import sys
+from datetime import datetime
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from bench.common import migrate_db, seed_inventory
+
+migrate_db()
+
+from app import models  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+
+CATALOGUE = 5000
+
+
+def make_po(db, po_id, lines, rnd):
+    now = datetime.utcnow()
+    db.execute(insert(models.InTransit), [
+        {
+            "po_id": po_id,
+            "order_date": now,
+            "supplier_id": "SUP-00000001",
+            "supplier_name": "Supplier 1",
+            "part_number": f"PN-{rnd.randrange(int(CATALOGUE * 1.1)):07d}",
+            "qty_ordered": 20,
+            "purchase_cost_yen": 1000.0,
+            "weight_kg": 1.0,
+            "landed_cost_bdt": 1500.0,
+            "status": "Shipping",
+            "qty_received": 0,
+        }
+        for _ in range(lines)
+    ])
+    db.commit()
+    return db.scalars(select(models.InTransit.id).where(models.InTransit.po_id == po_id)).all()
+
+
+def main(lines):
+    rnd = random.Random(5)
+    db = SessionLocal()
+    if not db.query(models.Inventory).count():
+        seed_inventory(db, CATALOGUE)
+    single_ids = make_po(db, "PO-BENCH-SINGLE", lines, rnd)
+    make_po(db, "PO-BENCH-BATCH", lines, rnd)
+    db.close()
+
+    with TestClient(app) as client:
+        t = perf_counter()
+        for rid in single_ids:
+            r = client.post(f"/intransit/{rid}/receive", params={"qty_received": 20})
+            assert r.status_code == 200, r.text
+        single = perf_counter() - t
+
+        t = perf_counter()
+        r = client.post("/intransit/receive", json={"po_id": "PO-BENCH-BATCH"})
+        batch = perf_counter() - t
+        assert r.status_code == 200 and r.json()["lines_failed"] == 0, r.text
+
+    print(f"lines={lines}  per-line calls {single * 1000:8.1f}ms ({lines / single:7.0f} lines/s)"
+          f"  batch {batch * 1000:7.1f}ms ({lines / batch:7.0f} lines/s)  parts created={r.json()['parts_created']}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,81 @@
+"""Reorder suggestions: per-part queries vs one aggregated pass, and a cached repeat.
+
+    python -m bench.reorder [parts] [sales]
+
+Seeds `parts` parts, `sales` sales_log rows over a year (rolled up into sales_daily) and
+open PO lines, then times the naive approach (a velocity and an on-order query per part,
+measured on a sample and scaled up), app.reorder.reorder_plan, and a repeat request
+served from the cache. Both approaches must pick the same parts.
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app import models
+from app.analytics import rebuild_rollups
+from app.reorder import (
+    DEFAULT_COVER_DAYS, DEFAULT_LEAD_TIME_DAYS, DEFAULT_SAFETY_DAYS, REORDER_WINDOWS, reorder_cache, reorder_plan,
+)
+from bench.common import make_session, seed_intransit, seed_inventory, seed_sales, timed
+
+SAMPLE = 2000
+
+
+def naive_due(db, part_numbers):
+    """What a per-part loop would compute: is each part due for a reorder?"""
+    sl, it, inv = models.SalesLog, models.InTransit, models.Inventory
+    now = datetime.utcnow()
+    today = now.date()
+    horizon = DEFAULT_LEAD_TIME_DAYS + DEFAULT_SAFETY_DAYS
+    due = set()
+    for pn in part_numbers:
+        rate = 0.0
+        for days, weight in REORDER_WINDOWS:
+            since = datetime.combine(today - timedelta(days=days - 1), datetime.min.time())
+            sold = db.scalar(select(func.coalesce(func.sum(sl.qty), 0)).where(sl.part_number == pn, sl.date >= since))
+            rate += weight * sold / days
+        rate /= sum(w for _, w in REORDER_WINDOWS)
+        on_order = db.scalar(
+            select(func.coalesce(func.sum(it.qty_ordered - it.qty_received), 0))
+            .where(it.part_number == pn, it.status == "Shipping")
+        )
+        available = db.scalar(select(inv.available_qty).where(inv.part_number == pn)) or 0
+        if rate > 0 and max(available, 0) + on_order < rate * horizon:
+            due.add(pn)
+    return due
+
+
+def main(parts, sales):
+    db = make_session()
+    seed_inventory(db, parts)
+    seed_sales(db, sales, parts, days=365)
+    seed_intransit(db, parts // 10, parts)
+    today = datetime.utcnow().date()
+    _, secs = timed(rebuild_rollups, db, today - timedelta(days=366), today)
+    db.commit()
+    print(f"parts={parts} sales_log={sales} sales_daily={db.scalar(select(func.count()).select_from(models.SalesDaily))} "
+          f"(rollup rebuild {secs:.1f}s)")
+
+    plan, plan_secs = timed(reorder_plan, db)
+    picked = {l["part_number"] for g in plan["suppliers"] for l in g["lines"]} | {l["part_number"] for l in plan["unassigned"]}
+
+    sample = random.Random(9).sample([f"PN-{i:07d}" for i in range(parts)], min(SAMPLE, parts))
+    want, naive_secs = timed(naive_due, db, sample)
+    assert want == picked & set(sample), (len(want), len(picked & set(sample)))
+    naive_total = naive_secs / len(sample) * parts
+
+    reorder_cache.get(db)
+    _, hit_secs = timed(reorder_cache.get, db)
+    print(f"per-part queries (est. from {len(sample)}): {naive_total * 1000:9.0f}ms   "
+          f"one pass: {plan_secs * 1000:7.0f}ms (load {plan['load_ms']:.0f}ms, compute {plan['compute_ms']:.0f}ms)   "
+          f"cached: {hit_secs * 1000:5.2f}ms")
+    print(f"parts with sales {plan['parts_with_sales']}, due {plan['parts_due']} "
+          f"across {len(plan['suppliers'])} suppliers (+{len(plan['unassigned'])} never ordered)   "
+          f"lead {DEFAULT_LEAD_TIME_DAYS}d safety {DEFAULT_SAFETY_DAYS}d cover {DEFAULT_COVER_DAYS}d")
+    db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000, int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000)
@@ -0,0 +1,92 @@
+"""Hot read endpoints with the response cache on vs off.
+
+    python -m bench.response_cache [rows] [concurrency] [seconds]
+
+The request mix mimics POS polling: GET /inventory/{part_number} over a skewed set of
+hot parts, the first few unfiltered /inventory pages and /suppliers.
+"""
+import asyncio
+import random
+import sys
+from time import perf_counter
+
+import httpx
+from sqlalchemy import insert
+
+from bench.common import migrate_db, seed_inventory
+
+migrate_db()
+
+from app import models  # noqa: E402
+from app.db import SessionLocal, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.response_cache import RESPONSE_CACHE_MAX_ENTRIES, response_cache  # noqa: E402
+
+HOT_PARTS = 2000
+
+
+def requests_for(rnd):
+    while True:
+        # ~80% of lookups land on 20% of the hot parts
+        hot = rnd.randrange(HOT_PARTS // 5) if rnd.random() < 0.8 else rnd.randrange(HOT_PARTS)
+        yield f"/inventory/PN-{hot:07d}"
+        yield f"/inventory?page={rnd.randint(1, 5)}&page_size=50"
+        yield "/suppliers"
+
+
+async def load(concurrency, seconds, revalidate):
+    rnd = random.Random(11)
+    paths = requests_for(rnd)
+    etags: dict[str, str] = {}
+    latencies = []
+    not_modified = 0
+    deadline = perf_counter() + seconds
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal not_modified
+            while perf_counter() < deadline:
+                path = next(paths)
+                headers = {"If-None-Match": etags[path]} if revalidate and path in etags else None
+                t = perf_counter()
+                r = await client.get(path, headers=headers)
+                latencies.append(perf_counter() - t)
+                assert r.status_code in (200, 304), r.text
+                if r.status_code == 304:
+                    not_modified += 1
+                etags[path] = r.headers["etag"]
+
+        started = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = perf_counter() - started
+    # pooled aiosqlite/asyncpg connections belong to this event loop
+    await async_engine.dispose()
+    latencies.sort()
+    return len(latencies) / elapsed, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.95)] * 1000, not_modified
+
+
+def main(n, concurrency, seconds):
+    db = SessionLocal()
+    if not db.query(models.Inventory).count():
+        seed_inventory(db, n)
+        db.execute(insert(models.Supplier), [
+            {"supplier_id": f"SUP-{i:08d}", "name": f"Supplier {i}", "active": True} for i in range(40)
+        ])
+        db.commit()
+    db.close()
+
+    runs = (("cache off", 0, False), ("cache on", RESPONSE_CACHE_MAX_ENTRIES or 10_000, False),
+            ("cache on + 304", RESPONSE_CACHE_MAX_ENTRIES or 10_000, True))
+    for label, max_entries, revalidate in runs:
+        response_cache.clear()
+        response_cache.max_entries = max_entries
+        response_cache.hits = response_cache.misses = 0
+        rps, p50, p95, not_modified = asyncio.run(load(concurrency, seconds, revalidate))
+        stats = response_cache.stats()
+        print(f"{label:<15} {rps:7.0f} req/s  p50={p50:6.2f}ms  p95={p95:6.2f}ms  "
+              f"hit_ratio={stats['hit_ratio']}  304s={not_modified}  cached={stats['bytes'] // 1024}KiB")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [50_000, 16, 8][len(args):]))
@@ -0,0 +1,63 @@
+"""p50/p95 search latency on a synthetic catalogue: plain ILIKE scans vs the trigram/FTS indexes.
+
+    python -m bench.search [rows]
+"""
+import random
+import statistics
+import sys
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+
+from bench.common import MODELS, migrate_db, seed_inventory
+
+migrate_db()
+
+from app import models, search  # noqa: E402
+from app.db import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+QUERIES = 200
+
+
+def percentiles(client, path, params_list):
+    lat = []
+    for params in params_list:
+        t = perf_counter()
+        r = client.get(path, params=params)
+        lat.append((perf_counter() - t) * 1000)
+        assert r.status_code == 200, r.text
+    lat.sort()
+    return statistics.median(lat), lat[int(len(lat) * 0.95) - 1]
+
+
+def main(n):
+    db = SessionLocal()
+    if not db.query(models.Inventory).count():
+        seed_inventory(db, n)
+        search.rebuild_model_index(db)
+        db.commit()
+    db.close()
+
+    rnd = random.Random(11)
+    pn_terms = [{"part_number": f"{rnd.randrange(n):07d}"[2:]} for _ in range(QUERIES)]
+    # chassis codes ("Corolla CO42") are the selective terms counter staff actually type
+    codes = [f"{m[:2].upper()}{rnd.randint(10, 99)}" for m in MODELS for _ in range(5)]
+    model_terms = [{"applicable_models": rnd.choice(codes)} for _ in range(QUERIES)]
+    ranked = [{"q": rnd.choice(codes + [p["part_number"] for p in pn_terms[:50]])} for _ in range(QUERIES)]
+
+    with TestClient(app) as client:
+        for label, path, params in (("part_number", "/inventory", pn_terms),
+                                    ("applicable_models", "/inventory", model_terms)):
+            search._fts_enabled = False
+            scan = percentiles(client, path, params)
+            search._fts_enabled = engine.dialect.name == "sqlite"
+            indexed = percentiles(client, path, params)
+            print(f"{label:>18}: ilike p50={scan[0]:7.2f}ms p95={scan[1]:7.2f}ms | "
+                  f"indexed p50={indexed[0]:7.2f}ms p95={indexed[1]:7.2f}ms")
+        p50, p95 = percentiles(client, "/inventory/search", ranked)
+        print(f"{'/inventory/search':>18}: p50={p50:7.2f}ms p95={p95:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
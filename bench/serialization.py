@@ -0,0 +1,59 @@
+"""GET /inventory page building: ORM rows + pydantic vs Core rows + orjson.
+
+    python -m bench.serialization [repeats]
+
+Reports CPU time per page (process_time, so waiting on the database is excluded)
+for fetching and serializing one page, at 50 / 500 / 5000 rows.
+"""
+import sys
+from time import process_time
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app import models, schemas
+from app.main import _dump_rows
+from app.queries import inventory_columns
+from bench.common import make_session, seed_inventory
+
+PARTS = 20_000
+PROJECTION = "part_number,part_type,car_make,available_qty,suggested_retail_bdt"
+
+_InventoryList = TypeAdapter(list[schemas.InventoryOut])
+
+
+def orm_page(db, size):
+    rows = db.scalars(select(models.Inventory).order_by(models.Inventory.part_number).limit(size)).all()
+    body = _InventoryList.dump_json(_InventoryList.validate_python(rows, from_attributes=True))
+    db.expunge_all()  # each request gets a fresh session in the app
+    return body
+
+
+def core_page(db, size, fields=None):
+    columns = inventory_columns(fields)
+    rows = db.execute(select(*columns).order_by(models.Inventory.part_number).limit(size)).all()
+    return _dump_rows([c.key for c in columns], rows)
+
+
+def cpu_ms(fn, repeats, *args):
+    fn(*args)  # warm up statement caches
+    t = process_time()
+    for _ in range(repeats):
+        body = fn(*args)
+    return (process_time() - t) / repeats * 1000, len(body)
+
+
+def main(repeats):
+    db = make_session()
+    seed_inventory(db, PARTS)
+    for size in (50, 500, 5000):
+        orm_ms, orm_bytes = cpu_ms(orm_page, repeats, db, size)
+        core_ms, _ = cpu_ms(core_page, repeats, db, size)
+        proj_ms, proj_bytes = cpu_ms(core_page, repeats, db, size, PROJECTION)
+        print(f"page_size={size:>5}  orm+pydantic {orm_ms:7.2f}ms  core+orjson {core_ms:6.2f}ms "
+              f"({orm_ms / core_ms:4.1f}x)  fields=5 {proj_ms:6.2f}ms ({proj_bytes / orm_bytes:.0%} of the bytes)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,43 @@
+"""POST /inventory latency with the Settings cache on vs off.
+
+    python -m bench.settings_cache [requests]
+"""
+import statistics
+import sys
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+
+from bench.common import migrate_db
+
+migrate_db()
+
+from app.main import app  # noqa: E402
+from app.settings_cache import settings_cache  # noqa: E402
+
+
+def run(client, prefix, n):
+    lat = []
+    for i in range(n):
+        t = perf_counter()
+        r = client.post("/inventory", json={"part_number": f"{prefix}-{i:06d}", "purchase_cost_yen": 1234.5, "weight_kg": 2.1})
+        lat.append((perf_counter() - t) * 1000)
+        assert r.status_code == 200, r.text
+    lat.sort()
+    return statistics.mean(lat), lat[int(len(lat) * 0.95) - 1]
+
+
+def main(n):
+    with TestClient(app) as client:
+        client.put("/settings", json={"exchange_rate_yen_to_bdt": 0.79, "shipping_cost_per_kg_bdt": 950})
+        settings_cache.ttl = 0
+        off = run(client, "OFF", n)
+        settings_cache.ttl = 5
+        on = run(client, "ON", n)
+        print(f"cache off: mean={off[0]:.3f}ms p95={off[1]:.3f}ms")
+        print(f"cache on:  mean={on[0]:.3f}ms p95={on[1]:.3f}ms  saved={off[0] - on[0]:.3f}ms/request")
+        print(settings_cache.stats())
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
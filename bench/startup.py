@@ -0,0 +1,88 @@
+"""Cold start: spawn the server and time how long until it answers.
+
+    python -m bench.startup [runs]
+
+Time to first response runs from process spawn to the first 200 from GET /inventory
+(a real query through the warmed pool). For two gunicorn workers, "all workers" is
+when GET /startup has been answered by both pids. The worker's own import/warmup
+split also comes from GET /startup. The schema is migrated once up front, as
+`python -m app.migrate` does per deploy.
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+from time import perf_counter, sleep
+
+import httpx
+
+from bench.common import make_session, migrate_db, seed_inventory, seed_settings
+
+TARGET_MS = 1000
+GUNICORN = [sys.executable, "-m", "gunicorn", "-k", "uvicorn.workers.UvicornWorker", "-w", "2", "--log-level", "warning"]
+SERVERS = {
+    "uvicorn": [sys.executable, "-m", "uvicorn", "app.main:app", "--log-level", "warning", "--port", "{port}"],
+    "gunicorn -w 2": GUNICORN + ["-b", "127.0.0.1:{port}", "app.main:app"],
+    "gunicorn -w 2 --preload": GUNICORN + ["--preload", "-b", "127.0.0.1:{port}", "app.main:app"],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url, proc):
+    """GET with a fresh connection (so gunicorn can hand it to any worker); None until the server is up."""
+    try:
+        return httpx.get(url, headers={"Connection": "close"})
+    except httpx.TransportError:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        sleep(0.005)
+        return None
+
+
+def cold_start(cmd, workers):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = perf_counter()
+    proc = subprocess.Popen([c.format(port=port) for c in cmd], env={**os.environ, "STOCK_SNAPSHOT_INTERVAL_SECONDS": "0"})
+    try:
+        while (r := get(f"{base}/inventory?page_size=10", proc)) is None or r.status_code != 200:
+            pass
+        first = perf_counter() - started
+        pids = {}
+        while len(pids) < workers:
+            if (r := get(f"{base}/startup", proc)) is not None and r.status_code == 200:
+                pids[r.json()["pid"]] = r.json()
+        ready = perf_counter() - started
+    finally:
+        proc.terminate()
+        proc.wait()
+    return first * 1000, ready * 1000, list(pids.values())[-1]
+
+
+def main(runs):
+    db = make_session()
+    seed_settings(db)
+    seed_inventory(db, 1000)
+    db.close()
+    migrate_db()  # no-op: already at head, like a redeploy
+
+    for name, cmd in SERVERS.items():
+        workers = 2 if "-w 2" in name else 1
+        results = [cold_start(cmd, workers) for _ in range(runs)]
+        first = [r[0] for r in results]
+        ready = [r[1] for r in results]
+        t = results[-1][2]
+        print(f"{name:<24} first response: median {statistics.median(first):5.0f}ms (max {max(first):5.0f})  "
+              f"all workers: median {statistics.median(ready):5.0f}ms   "
+              f"worker import {t['import_ms'] or 0:4.0f}ms, warmup {t['warmup_ms']:3.0f}ms")
+    print(f"target: first response < {TARGET_MS}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,271 @@
+"""End-to-end benchmark suite: the real app driven through an in-process ASGI client.
+
+    python -m bench.suite [--parts N] [--requests N] [--concurrency N] [--only a,b] [--out FILE]
+    python -m bench.suite --compare OLD.json NEW.json
+
+Seeds a synthetic catalogue with fixed seeds (the same --parts always gives the same
+data): inventory plus proportional suppliers, in-transit PO lines and a year of sales.
+Then each hot endpoint is hit with --requests requests from --concurrency concurrent
+clients, with the app's lifespan (pool prefill, caches, background jobs) running as in
+production. Recalc reprices the whole catalogue and runs a few times, one at a time.
+The inventory list/filter path runs twice: with the response cache (repeats of a hot
+page are hits, as in production) and with it off (every request runs the query).
+
+Data is seeded through app.db's own engine after a fresh migration, so the scenarios
+measure the same engine and pool settings the app uses in production.
+
+For every scenario the JSON report has p50/p95/p99 latency, throughput, SQL statements
+per request (both engines) and the number of non-2xx responses. Keep the reports from
+two runs and use --compare to see what a change did.
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+from datetime import datetime
+from time import perf_counter
+
+import httpx
+from sqlalchemy import select, update
+from sqlalchemy.engine import make_url
+
+from app import models
+from app.db import DATABASE_URL, SessionLocal, async_engine, engine
+from app.main import app
+from app.response_cache import response_cache
+from bench.common import CAR_MAKES, MODELS, PART_TYPES, QueryCounter, migrate_db, seed_catalogue
+
+SEED = 2024
+WARMUP = 5
+RECALC_RUNS = 3
+
+
+# ---------- Requests ----------
+# each builder returns (method, url, httpx request kwargs) for one request
+def search(rnd, ctx):
+    model = rnd.choice(MODELS)
+    q = rnd.choice((model[:4], f"{model[:2].upper()}{rnd.randint(10, 99)}", f"PN-{rnd.randrange(ctx['parts']):07d}"[:9]))
+    return "GET", "/inventory/search", {"params": {"q": q, "limit": 20}}
+
+
+def inventory(rnd, ctx):
+    # the list screen: browsing early pages, filtering by make/type, keyset paging from the start
+    params = rnd.choice((
+        {"page": rnd.randint(1, 20)},
+        {"car_make": rnd.choice(CAR_MAKES), "page": rnd.randint(1, 5)},
+        {"car_make": rnd.choice(CAR_MAKES), "part_type": rnd.choice(PART_TYPES)},
+        {"status": "In stock", "page": rnd.randint(1, 5)},
+        {"cursor": ""},
+    ))
+    return "GET", "/inventory", {"params": {**params, "page_size": 50}}
+
+
+def get_part(rnd, ctx):
+    return "GET", f"/inventory/PN-{rnd.randrange(ctx['parts']):07d}", {}
+
+
+def finalize(rnd, ctx):
+    items = [
+        {"part_number": f"PN-{rnd.randrange(ctx['parts']):07d}", "channel": rnd.choice(("Retail", "Wholesale")),
+         "quantity": rnd.randint(1, 3), "price_each_bdt": 1500.0}
+        for _ in range(rnd.randint(1, 8))
+    ]
+    return "POST", "/sales/finalize", {"json": {"items": items, "note": "bench"}}
+
+
+def create_po(rnd, ctx):
+    sup = rnd.randrange(ctx["suppliers"])
+    lines = [
+        {"part_number": f"PN-{rnd.randrange(ctx['parts']):07d}", "qty_ordered": rnd.randint(5, 50),
+         "purchase_cost_yen": round(rnd.uniform(100, 90000), 2), "weight_kg": round(rnd.uniform(0.05, 40), 3)}
+        for _ in range(rnd.randint(5, 40))
+    ]
+    return "POST", "/po", {"json": {"supplier_id": f"SUP-{sup:08d}", "supplier_name": f"Supplier {sup}", "lines": lines}}
+
+
+def receive(rnd, ctx):
+    row_id, qty = ctx["open_lines"].pop()
+    return "POST", f"/intransit/{row_id}/receive", {"params": {"qty_received": qty}}
+
+
+def recalc(rnd, ctx):
+    return "POST", "/settings/recalc", {}
+
+
+# name -> (request builder, fixed request count or None for --requests, run concurrently, response cache on)
+SCENARIOS = {
+    "inventory": (inventory, None, True, True),
+    "inventory_nocache": (inventory, None, True, False),
+    "search": (search, None, True, True),
+    "get_part": (get_part, None, True, True),
+    "finalize": (finalize, None, True, True),
+    "create_po": (create_po, None, True, True),
+    "receive": (receive, None, True, True),
+    "recalc": (recalc, RECALC_RUNS, False, True),
+}
+
+
+# ---------- Measurement ----------
+def percentile(sorted_values, p):
+    # nearest rank, so small samples report a latency that was actually observed
+    return sorted_values[max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))]
+
+
+async def run_scenario(client, build, requests, concurrency, warmup, rnd, ctx):
+    planned = [build(rnd, ctx) for _ in range(warmup + requests)]
+    for method, url, kwargs in planned[:warmup]:
+        await client.request(method, url, **kwargs)
+
+    pending = iter(planned[warmup:])
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for method, url, kwargs in pending:
+            t = perf_counter()
+            r = await client.request(method, url, **kwargs)
+            latencies.append((perf_counter() - t) * 1000)
+            errors += r.status_code >= 400
+
+    with QueryCounter(engine) as sync_q, QueryCounter(async_engine.sync_engine) as async_q:
+        started = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3),
+        "throughput_rps": round(requests / wall, 1),
+        "queries_per_request": round((sync_q.count + async_q.count) / requests, 2),
+    }
+
+
+def prepare(db, parts):
+    """Seed the catalogue and gather what the request builders need."""
+    started = perf_counter()
+    sizes = seed_catalogue(db, parts)
+    # plenty of stock, so finalize measures sales and not 400s
+    db.execute(update(models.Inventory).values(available_qty=1_000_000))
+    db.commit()
+    it = models.InTransit
+    open_lines = db.execute(
+        select(it.id, it.qty_ordered - it.qty_received).where(it.status == "Shipping").order_by(it.id)
+    ).all()
+    random.Random(SEED).shuffle(open_lines)
+    return sizes, round(perf_counter() - started, 1), {
+        "parts": parts, "suppliers": sizes["suppliers"], "open_lines": [tuple(r) for r in open_lines],
+    }
+
+
+async def run(args):
+    migrate_db(fresh=True)
+    db = SessionLocal()
+    sizes, seed_secs, ctx = prepare(db, args.parts)
+    db.close()
+
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in names:
+                build, fixed, concurrent, cached = SCENARIOS[name]
+                requests = fixed or args.requests
+                if name == "receive":
+                    requests = min(requests, len(ctx["open_lines"]) - WARMUP)
+                rnd = random.Random(f"{SEED}-{name}")
+                response_cache.clear()
+                max_entries = response_cache.max_entries
+                if not cached:
+                    response_cache.max_entries = 0
+                try:
+                    results[name] = await run_scenario(
+                        client, build, requests, args.concurrency if concurrent else 1,
+                        WARMUP if concurrent else 0, rnd, ctx,
+                    )
+                finally:
+                    response_cache.max_entries = max_entries
+                results[name]["response_cache"] = cached
+                print(f"{name:<18} {json.dumps(results[name])}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "database": make_url(DATABASE_URL).get_backend_name(),
+            "seed": SEED,
+            "rows": sizes,
+            "seed_seconds": seed_secs,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": results,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    label = lambda r, path: f"{r['meta']['commit'] or path} ({r['meta']['rows']['inventory']} parts, {r['meta']['database']})"
+    print(f"{'':<18} {label(old, old_path)} -> {label(new, new_path)}")
+    for name, n in new["scenarios"].items():
+        o = old["scenarios"].get(name)
+        if o is None:
+            continue
+        cols = [
+            f"{k[:-3]} {o[k]:8.2f} -> {n[k]:8.2f}ms ({n[k] / o[k]:4.2f}x)" if o[k] else f"{k[:-3]} n/a"
+            for k in ("p50_ms", "p95_ms", "p99_ms")
+        ]
+        print(f"{name:<18} " + "  ".join(cols) +
+              f"  rps {o['throughput_rps']:7.1f} -> {n['throughput_rps']:7.1f}"
+              f"  q/req {o['queries_per_request']:g} -> {n['queries_per_request']:g}")
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bench.suite")
+    p.add_argument("--parts", type=int, default=10_000, help="inventory rows (10k-1M)")
+    p.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    p.add_argument("--concurrency", type=int, default=8, help="concurrent in-process clients")
+    p.add_argument("--only", help="comma-separated scenarios: " + ",".join(SCENARIOS))
+    p.add_argument("--out", help="write the JSON report here instead of stdout")
+    p.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two reports and exit")
+    args = p.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.only and (unknown := set(args.only.split(",")) - set(SCENARIOS)):
+        p.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
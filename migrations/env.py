@@ -0,0 +1,52 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.db import DATABASE_URL, Base
+from app import models  # noqa: F401  (registers tables on Base.metadata)
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logging", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # the SQLite FTS5 side table and its shadow tables are managed by raw DDL in 0002
+    return not (type_ == "table" and name.startswith("inventory_fts"))
+
+
+def _url():
+    return config.attributes.get("url") or DATABASE_URL
+
+
+def run_migrations_offline():
+    context.configure(url=_url(), target_metadata=target_metadata, include_object=include_object,
+                      literal_binds=True, dialect_opts={"paramstyle": "named"}, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          include_object=include_object, render_as_batch=True)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          include_object=include_object, render_as_batch=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,124 @@
+"""baseline: the v1 schema previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "settings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("exchange_rate_yen_to_bdt", sa.Float()),
+        sa.Column("shipping_cost_per_kg_bdt", sa.Float()),
+        sa.Column("part_types", sa.JSON()),
+        sa.Column("part_subtypes", sa.JSON()),
+        sa.Column("car_makes", sa.JSON()),
+        sa.Column("manufacturers", sa.JSON()),
+        sa.Column("last_recalc", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_settings_id", "settings", ["id"])
+
+    op.create_table(
+        "suppliers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("supplier_id", sa.String()),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("contact", sa.String(), nullable=True),
+        sa.Column("notes", sa.String(), nullable=True),
+        sa.Column("active", sa.Boolean()),
+    )
+    op.create_index("ix_suppliers_id", "suppliers", ["id"])
+    op.create_index("ix_suppliers_supplier_id", "suppliers", ["supplier_id"], unique=True)
+
+    op.create_table(
+        "inventory",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("part_number", sa.String()),
+        sa.Column("photo_path", sa.String(), nullable=True),
+        sa.Column("quality", sa.String(), nullable=True),
+        sa.Column("part_type", sa.String(), nullable=True),
+        sa.Column("part_subtype", sa.String(), nullable=True),
+        sa.Column("car_make", sa.String(), nullable=True),
+        sa.Column("manufacturer", sa.String(), nullable=True),
+        sa.Column("applicable_models", sa.String(), nullable=True),
+        sa.Column("purchase_cost_yen", sa.Float()),
+        sa.Column("weight_kg", sa.Float()),
+        sa.Column("exchange_rate_used", sa.Float()),
+        sa.Column("shipping_per_kg_used", sa.Float()),
+        sa.Column("purchase_cost_bdt", sa.Float(), nullable=True),
+        sa.Column("shipping_cost_bdt", sa.Float(), nullable=True),
+        sa.Column("landed_cost_bdt", sa.Float(), nullable=True),
+        sa.Column("suggested_wholesale_bdt", sa.Float(), nullable=True),
+        sa.Column("suggested_retail_bdt", sa.Float(), nullable=True),
+        sa.Column("wholesale_actual_bdt", sa.Float(), nullable=True),
+        sa.Column("retail_actual_bdt", sa.Float(), nullable=True),
+        sa.Column("available_qty", sa.Integer()),
+        sa.Column("sold_wholesale_qty", sa.Integer()),
+        sa.Column("sold_retail_qty", sa.Integer()),
+        sa.Column("status", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_inventory_id", "inventory", ["id"])
+    op.create_index("ix_inventory_part_number", "inventory", ["part_number"], unique=True)
+
+    op.create_table(
+        "sales_log",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("part_number", sa.String()),
+        sa.Column("channel", sa.String()),
+        sa.Column("qty", sa.Integer()),
+        sa.Column("price_each_bdt", sa.Float()),
+        sa.Column("subtotal_bdt", sa.Float()),
+        sa.Column("notes", sa.String(), nullable=True),
+    )
+    op.create_index("ix_sales_log_id", "sales_log", ["id"])
+    op.create_index("ix_sales_log_part_number", "sales_log", ["part_number"])
+
+    op.create_table(
+        "intransit",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("po_id", sa.String()),
+        sa.Column("order_date", sa.DateTime()),
+        sa.Column("supplier_id", sa.String()),
+        sa.Column("supplier_name", sa.String()),
+        sa.Column("part_number", sa.String()),
+        sa.Column("quality", sa.String()),
+        sa.Column("part_type", sa.String()),
+        sa.Column("part_subtype", sa.String()),
+        sa.Column("car_make", sa.String()),
+        sa.Column("manufacturer", sa.String()),
+        sa.Column("qty_ordered", sa.Integer()),
+        sa.Column("purchase_cost_yen", sa.Float()),
+        sa.Column("weight_kg", sa.Float()),
+        sa.Column("exchange_rate_used", sa.Float()),
+        sa.Column("shipping_per_kg_used", sa.Float()),
+        sa.Column("landed_cost_bdt", sa.Float()),
+        sa.Column("status", sa.String()),
+        sa.Column("qty_received", sa.Integer()),
+        sa.Column("notes", sa.String(), nullable=True),
+        sa.Column("photo_path", sa.String(), nullable=True),
+    )
+    op.create_index("ix_intransit_id", "intransit", ["id"])
+    op.create_index("ix_intransit_po_id", "intransit", ["po_id"])
+    op.create_index("ix_intransit_part_number", "intransit", ["part_number"])
+
+
+def downgrade() -> None:
+    for name in ("intransit", "sales_log", "inventory", "suppliers", "settings"):
+        op.drop_table(name)
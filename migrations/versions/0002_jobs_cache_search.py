@@ -0,0 +1,135 @@
+"""recalc jobs, settings version, search indexes and the model lookup
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Databases that ran create_all after these features shipped already have some of
+these objects, so every step checks before creating.
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_FTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5(
+        part_number, applicable_models, content='inventory', content_rowid='id', tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS inventory_fts_ai AFTER INSERT ON inventory BEGIN
+        INSERT INTO inventory_fts(rowid, part_number, applicable_models)
+        VALUES (new.id, new.part_number, new.applicable_models);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS inventory_fts_ad AFTER DELETE ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, part_number, applicable_models)
+        VALUES ('delete', old.id, old.part_number, old.applicable_models);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS inventory_fts_au AFTER UPDATE OF part_number, applicable_models ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, part_number, applicable_models)
+        VALUES ('delete', old.id, old.part_number, old.applicable_models);
+        INSERT INTO inventory_fts(rowid, part_number, applicable_models)
+        VALUES (new.id, new.part_number, new.applicable_models);
+    END""",
+    "INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')",
+]
+
+POSTGRES_TRGM = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_inventory_part_number_trgm ON inventory USING gin (part_number gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_inventory_applicable_models_trgm ON inventory USING gin (applicable_models gin_trgm_ops)",
+]
+
+
+def _tokenize_models(applicable_models):
+    """'Corolla, Axio ,  Premio' -> ['corolla', 'axio', 'premio'] (deduplicated, order kept)."""
+    seen = {}
+    for part in applicable_models.split(","):
+        m = re.sub(r"\s+", " ", part).strip().lower()
+        if m:
+            seen.setdefault(m, None)
+    return list(seen)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if "version" not in {c["name"] for c in insp.get_columns("settings")}:
+        op.add_column("settings", sa.Column("version", sa.Integer(), server_default="1"))
+
+    if not insp.has_table("recalc_jobs"):
+        op.create_table(
+            "recalc_jobs",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("status", sa.String()),
+            sa.Column("exchange_rate_yen_to_bdt", sa.Float()),
+            sa.Column("shipping_cost_per_kg_bdt", sa.Float()),
+            sa.Column("rows_total", sa.Integer()),
+            sa.Column("rows_done", sa.Integer()),
+            sa.Column("last_id", sa.Integer()),
+            sa.Column("owner", sa.String(), nullable=True),
+            sa.Column("error", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_recalc_jobs_status", "recalc_jobs", ["status"])
+
+    if not insp.has_table("inventory_models"):
+        op.create_table(
+            "inventory_models",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("inventory_id", sa.Integer()),
+            sa.Column("model", sa.String()),
+        )
+        op.create_index("ix_inventory_models_id", "inventory_models", ["id"])
+        op.create_index("ix_inventory_models_inventory_id", "inventory_models", ["inventory_id"])
+        op.create_index("ix_inventory_models_model", "inventory_models", ["model"])
+
+    if bind.dialect.name == "postgresql":
+        for ddl in POSTGRES_TRGM:
+            op.execute(ddl)
+    elif bind.dialect.name == "sqlite":
+        for ddl in SQLITE_FTS:
+            op.execute(ddl)
+
+    # backfill the applicable_models lookup for existing parts; same normalization as
+    # app.search.tokenize_models at the time of writing, copied so later app changes
+    # can't alter what this revision does
+    bind.execute(sa.text("DELETE FROM inventory_models"))
+    insert_models = sa.text("INSERT INTO inventory_models (inventory_id, model) VALUES (:inventory_id, :model)")
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT id, applicable_models FROM inventory"
+            " WHERE id > :last_id AND applicable_models IS NOT NULL ORDER BY id LIMIT 5000"
+        ), {"last_id": last_id}).all()
+        if not rows:
+            break
+        params = [{"inventory_id": rid, "model": m} for rid, am in rows for m in _tokenize_models(am)]
+        if params:
+            bind.execute(insert_models, params)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_inventory_applicable_models_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_inventory_part_number_trgm")
+    elif bind.dialect.name == "sqlite":
+        for name in ("inventory_fts_au", "inventory_fts_ad", "inventory_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS inventory_fts")
+    op.drop_table("inventory_models")
+    op.drop_table("recalc_jobs")
+    with op.batch_alter_table("settings") as batch:
+        batch.drop_column("version")
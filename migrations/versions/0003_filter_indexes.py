@@ -0,0 +1,50 @@
+"""composite and partial indexes for the inventory, in-transit and sales filters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OUT_OF_STOCK = sa.text("status = 'Out of stock'")
+SHIPPING = sa.text("status = 'Shipping'")
+
+
+def upgrade() -> None:
+    op.create_index("ix_inventory_type_subtype_pn", "inventory", ["part_type", "part_subtype", "part_number"])
+    op.create_index("ix_inventory_make_type_pn", "inventory", ["car_make", "part_type", "part_number"])
+    op.create_index("ix_inventory_manufacturer_pn", "inventory", ["manufacturer", "part_number"])
+    op.create_index("ix_inventory_status_pn", "inventory", ["status", "part_number"])
+    op.create_index("ix_inventory_out_of_stock", "inventory", ["part_number"],
+                    postgresql_where=OUT_OF_STOCK, sqlite_where=OUT_OF_STOCK)
+
+    op.create_index("ix_sales_log_date", "sales_log", ["date"])
+    op.create_index("ix_sales_log_part_number_date", "sales_log", ["part_number", "date"])
+
+    op.create_index("ix_intransit_supplier_id", "intransit", ["supplier_id"])
+    op.create_index("ix_intransit_shipping", "intransit", ["part_number"],
+                    postgresql_where=SHIPPING, sqlite_where=SHIPPING)
+    op.create_index("ix_intransit_status_id", "intransit", ["status", "id"])
+
+
+def downgrade() -> None:
+    for name, tbl in (
+        ("ix_intransit_status_id", "intransit"), ("ix_intransit_shipping", "intransit"),
+        ("ix_intransit_supplier_id", "intransit"),
+        ("ix_sales_log_part_number_date", "sales_log"), ("ix_sales_log_date", "sales_log"),
+        ("ix_inventory_out_of_stock", "inventory"), ("ix_inventory_status_pn", "inventory"),
+        ("ix_inventory_manufacturer_pn", "inventory"), ("ix_inventory_make_type_pn", "inventory"),
+        ("ix_inventory_type_subtype_pn", "inventory"),
+    ):
+        op.drop_index(name, table_name=tbl)
@@ -0,0 +1,72 @@
+"""daily sales rollups (per part and per segment)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sales_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("part_number", sa.String(), primary_key=True),
+        sa.Column("channel", sa.String(), primary_key=True),
+        sa.Column("part_type", sa.String(), nullable=True),
+        sa.Column("car_make", sa.String(), nullable=True),
+        sa.Column("qty", sa.Integer()),
+        sa.Column("revenue_bdt", sa.Float()),
+        sa.Column("cost_bdt", sa.Float()),
+        sa.Column("lines", sa.Integer()),
+    )
+    op.create_index("ix_sales_daily_part_number_day", "sales_daily", ["part_number", "day"])
+    op.create_table(
+        "sales_daily_segments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("channel", sa.String(), nullable=False),
+        sa.Column("part_type", sa.String(), nullable=False),
+        sa.Column("car_make", sa.String(), nullable=False),
+        sa.Column("qty", sa.Integer()),
+        sa.Column("revenue_bdt", sa.Float()),
+        sa.Column("cost_bdt", sa.Float()),
+        sa.Column("lines", sa.Integer()),
+    )
+    op.create_index("ux_sales_daily_segments_key", "sales_daily_segments",
+                    ["day", "channel", "part_type", "car_make"], unique=True)
+
+    # backfill from the existing log; the tables are new, so the whole log in one pass.
+    # Same aggregation as app.analytics.rebuild_rollups at the time of writing, inlined
+    # so later app changes can't alter what this revision does (date() exists on both
+    # SQLite and PostgreSQL).
+    op.execute(
+        "INSERT INTO sales_daily (day, part_number, channel, part_type, car_make, qty, revenue_bdt, cost_bdt, lines)"
+        " SELECT date(sl.date), sl.part_number, sl.channel, max(inv.part_type), max(inv.car_make),"
+        " sum(sl.qty), sum(sl.subtotal_bdt), sum(sl.qty * coalesce(inv.landed_cost_bdt, 0.0)), count(*)"
+        " FROM sales_log sl LEFT OUTER JOIN inventory inv ON inv.part_number = sl.part_number"
+        " GROUP BY date(sl.date), sl.part_number, sl.channel"
+    )
+    op.execute(
+        "INSERT INTO sales_daily_segments (day, channel, part_type, car_make, qty, revenue_bdt, cost_bdt, lines)"
+        " SELECT day, channel, coalesce(part_type, ''), coalesce(car_make, ''),"
+        " sum(qty), sum(revenue_bdt), sum(cost_bdt), sum(lines)"
+        " FROM sales_daily GROUP BY day, channel, coalesce(part_type, ''), coalesce(car_make, '')"
+    )
+
+def downgrade() -> None:
+    op.drop_index("ux_sales_daily_segments_key", table_name="sales_daily_segments")
+    op.drop_table("sales_daily_segments")
+    op.drop_index("ix_sales_daily_part_number_day", table_name="sales_daily")
+    op.drop_table("sales_daily")
@@ -0,0 +1,31 @@
+"""per-part_type price multipliers on settings and frozen on recalc jobs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # an empty map keeps every part_type on the old fixed 2.5 / 3.5 markups
+    op.add_column("settings", sa.Column("price_multipliers", sa.JSON(), server_default=sa.text("'{}'")))
+    op.add_column("recalc_jobs", sa.Column("price_multipliers", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("recalc_jobs") as batch:
+        batch.drop_column("price_multipliers")
+    with op.batch_alter_table("settings") as batch:
+        batch.drop_column("price_multipliers")
@@ -0,0 +1,68 @@
+"""append-only stock movement ledger and stock snapshots
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_movements",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("at", sa.DateTime(), nullable=False),
+        sa.Column("part_number", sa.String(), nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("ref", sa.String(), nullable=True),
+        sa.Column("note", sa.String(), nullable=True),
+    )
+    op.create_index("ix_stock_movements_part_number_id", "stock_movements", ["part_number", "id"])
+    op.create_index("ix_stock_movements_at", "stock_movements", ["at"])
+    op.create_table(
+        "stock_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("parts", sa.Integer()),
+        sa.Column("units", sa.Integer()),
+    )
+    op.create_index("ix_stock_snapshots_taken_at", "stock_snapshots", ["taken_at"])
+    op.create_table(
+        "stock_snapshot_lines",
+        sa.Column("snapshot_id", sa.Integer(), primary_key=True),
+        sa.Column("part_number", sa.String(), primary_key=True),
+        sa.Column("qty", sa.Integer(), nullable=False),
+    )
+
+    # current stock becomes the opening balance; history before this point isn't reconstructable
+    from datetime import datetime
+    now = datetime.utcnow()
+    op.execute(
+        sa.text(
+            "INSERT INTO stock_movements (at, part_number, delta, source, note) "
+            "SELECT :now, part_number, available_qty, 'opening', 'ledger started' "
+            "FROM inventory WHERE available_qty IS NOT NULL AND available_qty <> 0"
+        ).bindparams(sa.bindparam("now", now, type_=sa.DateTime()))
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_snapshot_lines")
+    op.drop_index("ix_stock_snapshots_taken_at", table_name="stock_snapshots")
+    op.drop_table("stock_snapshots")
+    op.drop_index("ix_stock_movements_at", table_name="stock_movements")
+    op.drop_index("ix_stock_movements_part_number_id", table_name="stock_movements")
+    op.drop_table("stock_movements")
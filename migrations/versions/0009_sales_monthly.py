@@ -0,0 +1,49 @@
+"""monthly per-part sales rollup for long-range reports
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sales_monthly",
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("part_number", sa.String(), primary_key=True),
+        sa.Column("channel", sa.String(), primary_key=True),
+        sa.Column("part_type", sa.String(), nullable=True),
+        sa.Column("car_make", sa.String(), nullable=True),
+        sa.Column("qty", sa.Integer()),
+        sa.Column("revenue_bdt", sa.Float()),
+        sa.Column("cost_bdt", sa.Float()),
+        sa.Column("lines", sa.Integer()),
+    )
+
+    # backfill from the daily rollup
+    if op.get_bind().dialect.name == "sqlite":
+        month = "date(day, 'start of month')"
+    else:
+        month = "CAST(date_trunc('month', day) AS DATE)"
+    op.execute(
+        "INSERT INTO sales_monthly (month, part_number, channel, part_type, car_make, qty, revenue_bdt, cost_bdt, lines)"
+        f" SELECT {month}, part_number, channel, max(part_type), max(car_make),"
+        " sum(qty), sum(revenue_bdt), sum(cost_bdt), sum(lines)"
+        f" FROM sales_daily GROUP BY {month}, part_number, channel"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sales_monthly")
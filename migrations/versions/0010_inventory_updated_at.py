@@ -0,0 +1,25 @@
+"""index inventory.updated_at for the reorder cache's data version
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_inventory_updated_at", "inventory", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventory_updated_at", table_name="inventory")
@@ -0,0 +1,34 @@
+"""at most one queued or running recalc job
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # two jobs may already be active from before the constraint; keep the newest
+    op.execute(
+        "UPDATE recalc_jobs SET status = 'failed', error = 'superseded by a newer job'"
+        " WHERE status IN ('queued', 'running') AND id <> ("
+        "SELECT id FROM recalc_jobs WHERE status IN ('queued', 'running') ORDER BY created_at DESC LIMIT 1)"
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX ux_recalc_jobs_active ON recalc_jobs ((status IN ('queued', 'running')))"
+        " WHERE status IN ('queued', 'running')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_recalc_jobs_active", table_name="recalc_jobs")
@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+import pytest
+
+# Tests run the real app against a throwaway SQLite file migrated to head, never ./local.db.
+# Set before anything imports app.db, which reads DATABASE_URL at import time.
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("STOCK_SNAPSHOT_INTERVAL_SECONDS", "0")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.migrate import upgrade
+
+    upgrade(os.environ["DATABASE_URL"], configure_logging=False)
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def db(client):
+    from app.db import SessionLocal
+
+    s = SessionLocal()
+    try:
+        yield s
+    finally:
+        s.close()
@@ -0,0 +1,40 @@
+import base64
+
+import pytest
+
+from app.queries import decode_cursor, encode_cursor
+
+
+def b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_round_trip():
+    assert decode_cursor(encode_cursor("PN-0000001", 7)) == ("PN-0000001", 7)
+
+
+@pytest.mark.parametrize("cursor", [
+    "MQ",  # 1
+    "bnVsbA",  # null
+    b64(b'"PN-1"'),
+    b64(b'["PN-1"]'),
+    b64(b'["PN-1",1,2]'),
+    b64(b'{"a":1,"b":2}'),
+    b64(b'[1,"PN-1"]'),
+    b64(b'["PN-1",true]'),
+    b64(b"\xff\xfe"),  # not UTF-8
+    b64(b"not json"),
+    "!!!",  # not base64
+    "a",  # impossible base64 length
+    "é",
+])
+def test_malformed_cursor_is_value_error(cursor):
+    with pytest.raises(ValueError, match="malformed cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("cursor", ["MQ", "bnVsbA", "!!!", "a"])
+def test_inventory_rejects_malformed_cursor(client, cursor):
+    r = client.get("/inventory", params={"cursor": cursor})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
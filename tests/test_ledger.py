@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app import models
+from app.ledger import STOCK_SNAPSHOT_LAG
+
+
+def snapshots(db):
+    return db.scalar(select(func.count()).select_from(models.StockSnapshot))
+
+
+@pytest.mark.parametrize("ahead", [
+    timedelta(hours=1),  # in the future
+    timedelta(0),  # now
+    -STOCK_SNAPSHOT_LAG / 2,  # inside the lag window
+])
+def test_snapshot_rejects_at_inside_lag(client, db, ahead):
+    before = snapshots(db)
+    at = datetime.utcnow() + ahead
+    r = client.post("/stock/snapshots", params={"at": at.isoformat()})
+    assert r.status_code == 400
+    assert snapshots(db) == before
+
+
+def test_snapshot_rejects_aware_at_inside_lag(client):
+    r = client.post("/stock/snapshots", params={"at": (datetime.utcnow() + timedelta(hours=1)).isoformat() + "Z"})
+    assert r.status_code == 400
+
+
+def test_snapshot_accepts_at_before_lag(client):
+    at = datetime.utcnow() - STOCK_SNAPSHOT_LAG - timedelta(minutes=1)
+    r = client.post("/stock/snapshots", params={"at": at.isoformat()})
+    assert r.status_code == 200
+    assert datetime.fromisoformat(r.json()["taken_at"]) == at
+
+
+def test_snapshot_defaults_to_lagged_now(client):
+    r = client.post("/stock/snapshots")
+    assert r.status_code == 200
+    assert datetime.fromisoformat(r.json()["taken_at"]) <= datetime.utcnow() - STOCK_SNAPSHOT_LAG
@@ -0,0 +1,39 @@
+import re
+
+import pytest
+from sqlalchemy import delete, insert
+
+from app import models
+
+
+def rows_metric(client, route):
+    """(sum, count) of db_rows_per_request for GET `route`."""
+    text = client.get("/metrics").text
+    labels = re.escape(f'{{method="GET",route="{route}"}}')
+    found = {k: float(m.group(1)) for k in ("sum", "count")
+             if (m := re.search(rf"^db_rows_per_request_{k}{labels} (\S+)$", text, re.M))}
+    return found.get("sum", 0.0), found.get("count", 0.0)
+
+
+@pytest.fixture
+def parts(db):
+    db.execute(insert(models.Inventory), [
+        {"part_number": f"MET-{i:03d}", "part_type": "Engine", "available_qty": 1} for i in range(5)
+    ])
+    db.commit()
+    yield
+    db.execute(delete(models.Inventory).where(models.Inventory.part_number.like("MET-%")))
+    db.commit()
+
+
+@pytest.mark.parametrize("route, params", [
+    ("/inventory", {"part_type": "Engine", "page_size": 50}),
+    ("/export/inventory", {"part_type": "Engine"}),  # streamed
+])
+def test_reads_count_fetched_rows(client, parts, route, params):
+    rows, requests = rows_metric(client, route)
+    r = client.get(route, params=params)
+    assert r.status_code == 200
+    new_rows, new_requests = rows_metric(client, route)
+    assert new_requests == requests + 1
+    assert new_rows - rows >= 5
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import main, models
+from app.recalc import create_recalc_job
+
+
+@pytest.fixture
+def settings(db):
+    s = db.scalars(select(models.Settings)).first()
+    if s is None:
+        s = models.Settings(exchange_rate_yen_to_bdt=0.79, shipping_cost_per_kg_bdt=950.0, part_types=[],
+                            part_subtypes={}, car_makes=[], manufacturers=[])
+        db.add(s)
+        db.commit()
+    yield s
+    db.execute(update(models.RecalcJob).where(models.RecalcJob.status.in_(("queued", "running")))
+               .values(status="done"))
+    db.commit()
+
+
+def active_jobs(db):
+    return db.scalar(select(func.count()).select_from(models.RecalcJob)
+                     .where(models.RecalcJob.status.in_(("queued", "running"))))
+
+
+def test_second_active_job_is_rejected_by_the_database(db, settings):
+    create_recalc_job(db, settings)
+    with pytest.raises(IntegrityError):
+        create_recalc_job(db, settings)
+    db.rollback()
+    assert active_jobs(db) == 1
+
+
+def test_concurrent_start_gets_409(client, db, settings, monkeypatch):
+    # the other request queued its job after this one's active_recalc_job check
+    create_recalc_job(db, settings)
+    monkeypatch.setattr(main, "active_recalc_job", lambda db: None)
+    r = client.post("/settings/recalc/jobs")
+    assert r.status_code == 409
+    assert active_jobs(db) == 1
+
+
+def test_finished_jobs_do_not_block(db, settings):
+    job = create_recalc_job(db, settings)
+    db.execute(update(models.RecalcJob).where(models.RecalcJob.id == job.id).values(status="done"))
+    db.commit()
+    create_recalc_job(db, settings)
+    assert active_jobs(db) == 1
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, func, insert, select, update
+
+from app import models
+from app.reorder import reorder_cache
+
+
+@pytest.fixture
+def part(db):
+    today = datetime.utcnow().date()
+    db.execute(insert(models.Inventory), [{
+        "part_number": "REO-1", "part_type": "Engine", "available_qty": 0, "purchase_cost_yen": 100.0,
+        "updated_at": datetime.utcnow() - timedelta(days=1),
+    }])
+    db.execute(insert(models.SalesDaily), [
+        {"day": today, "part_number": "REO-1", "channel": "Retail", "qty": 10, "revenue_bdt": 0.0, "cost_bdt": 0.0,
+         "lines": 1},
+    ])
+    if db.scalar(select(func.count()).select_from(models.Settings)) == 0:
+        db.add(models.Settings(exchange_rate_yen_to_bdt=0.79, shipping_cost_per_kg_bdt=950.0, part_types=[],
+                               part_subtypes={}, car_makes=[], manufacturers=[]))
+    db.commit()
+    reorder_cache.clear()
+    yield "REO-1"
+    db.execute(delete(models.SalesDaily).where(models.SalesDaily.part_number == "REO-1"))
+    db.execute(delete(models.Inventory).where(models.Inventory.part_number == "REO-1"))
+    db.commit()
+
+
+def sold_7d(client, part_number):
+    plan = client.get("/reorder").json()
+    lines = [l for g in plan["suppliers"] for l in g["lines"]] + plan["unassigned"]
+    return next(l["sold"]["7"] for l in lines if l["part_number"] == part_number)
+
+
+def test_cached_plan_is_reused(client, part):
+    client.get("/reorder")
+    misses = reorder_cache.misses
+    client.get("/reorder")
+    assert reorder_cache.misses == misses
+
+
+def test_rollup_refresh_invalidates(client, db, part):
+    # with SALES_ROLLUP_INTERVAL_SECONDS > 0 the rollup catches up after the sale's movement
+    assert sold_7d(client, part) == 10
+    db.execute(insert(models.SalesDaily), [
+        {"day": datetime.utcnow().date() - timedelta(days=1), "part_number": part, "channel": "Retail", "qty": 5,
+         "revenue_bdt": 0.0, "cost_bdt": 0.0, "lines": 1},
+    ])
+    db.commit()
+    assert sold_7d(client, part) == 15
+
+
+def test_part_edit_invalidates(client, part):
+    client.get("/reorder")
+    misses = reorder_cache.misses
+    assert client.put(f"/inventory/{part}", json={"purchase_cost_yen": 250.0}).status_code == 200
+    client.get("/reorder")
+    assert reorder_cache.misses == misses + 1
+
+
+def test_settings_change_invalidates(client, db, part):
+    client.get("/reorder")
+    misses = reorder_cache.misses
+    db.execute(update(models.Settings).values(version=func.coalesce(models.Settings.version, 0) + 1))
+    db.commit()
+    client.get("/reorder")
+    assert reorder_cache.misses == misses + 1